@@ -1,6 +1,25 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from charts import render_chart
+
+
+def draw_donasi(kind, df, ax):
+    # Chart matplotlib halaman ini; dirender lewat render_chart supaya gambarnya di-cache
+    # dan tidak ada figure pyplot yang tertinggal di proses server
+    if kind in ("pie", "doughnut"):
+        ax.pie(df["Total Donasi (jt)"], labels=df["Kampanye"], autopct='%1.1f%%')
+        if kind == "doughnut":
+            from matplotlib.patches import Circle
+
+            ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+    elif kind == "kampanye_bar":
+        ax.bar(df["Kampanye"], df["Total Donasi (jt)"], color="green")
+        ax.set_ylabel("Donasi (jt)")
+    else:
+        ax.bar(df["Kampanye"], df["Donasi"], color="green")
+        ax.set_ylabel("donasi(jt)")
+
 
 st.title("Aplikasi visualisasi")
 st.write("welkom")
@@ -17,10 +36,8 @@ st.dataframe(data)
 st.bar_chart(data.set_index("Kampanye"))
 st.line_chart(data.set_index("Kampanye"))
 
-fig, ax = plt.subplots()
-ax.bar(data["Kampanye"], data["Total Donasi (jt)"], color="green")
-ax.set_ylabel("Donasi (jt)")
-st.pyplot(fig)
+png, _ = render_chart("kampanye_bar", data, draw=draw_donasi, figsize=(6.4, 4.8))
+st.image(png, use_container_width=True)
 
 # Visualization selector
 tipe = st.selectbox("Pilih visualisasi", ["bar", "pie", "line", "doughnut"])
@@ -30,12 +47,8 @@ if tipe == "bar":
 elif tipe == "line":
     st.line_chart(data.set_index("Kampanye"))
 elif tipe in ("pie", "doughnut"):
-    fig, ax = plt.subplots()
-    ax.pie(data["Total Donasi (jt)"], labels=data["Kampanye"], autopct='%1.1f%%')
-    if tipe == "doughnut":
-        centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-        fig.gca().add_artist(centre_circle)
-    st.pyplot(fig)
+    png, _ = render_chart(tipe, data, draw=draw_donasi, figsize=(6.4, 4.8))
+    st.image(png, use_container_width=True)
 
 # Filter slider
 nilai = st.slider("Tampilkan data donasi minimum:", 0, 500, 150)
@@ -65,10 +78,8 @@ row = data2[data2["Kampanye"] == kampanye].iloc[0]
 st.metric("Donasi saat ini", f"{row['Donasi']} juta", delta=row['Donasi'] - row['Target'])
 st.progress(row['Donasi'] / row['Target'])
 
-fig, ax = plt.subplots()
-ax.bar(data2["Kampanye"], data2["Donasi"], color="green")
-ax.set_ylabel("donasi(jt)")
-st.pyplot(fig)
+png, _ = render_chart("donasi_bar", data2, draw=draw_donasi, figsize=(6.4, 4.8))
+st.image(png, use_container_width=True)
 
 st.image("image.png", caption="Kegiatan penanaman")
 st.markdown(""" ### Tujuannya bagus """)
\ No newline at end of file
@@ -0,0 +1,331 @@
+"""Seeded synthetic data generator for the sales_db and multicultural_recipe schemas.
+
+Contoh:
+    # isi sales_db dengan 1 juta order
+    python benchmarks/datagen.py sales --orders 1000000 --dsn "dbname=sales_bench"
+
+    # isi multicultural_recipe dengan 100 ribu resep
+    python benchmarks/datagen.py recipe --recipes 100000 --dsn "dbname=recipe_bench"
+
+    # tanpa server Postgres: pakai Postgres embedded (paket opsional `pgserver`)
+    python benchmarks/datagen.py recipe --recipes 20000 --embedded .bench_pg
+
+Seed yang sama dan parameter yang sama selalu menghasilkan data yang sama persis.
+Data dimuat dengan COPY per chunk sehingga skala 10 juta order tetap muat di memori.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SALES_SCHEMA = REPO_ROOT / "database.sql"
+RECIPE_DB_SQL = REPO_ROOT / "final_project" / "db.sql"
+RECIPE_SUMMARY_MARKER = "-- Tabel ringkasan (summary)"
+
+CHUNK_ROWS = 200_000
+
+# DDL recipe schema: sama dengan final_project/db.sql, disusun ulang supaya bisa
+# dijalankan apa adanya (urutan foreign key, sequence, titik koma).
+RECIPE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS type_course_table (
+    type_course_id integer PRIMARY KEY,
+    type_course_name varchar(255)
+);
+CREATE TABLE IF NOT EXISTS type_cuisine_table (
+    type_cuisine_id integer PRIMARY KEY,
+    type_cuisine_name varchar(255)
+);
+CREATE TABLE IF NOT EXISTS type_diet_name (
+    type_diet_id integer PRIMARY KEY,
+    type_diet_name varchar(255)
+);
+CREATE TABLE IF NOT EXISTS ingredient_table (
+    ingredient_id integer PRIMARY KEY,
+    ingredient_name varchar(255)
+);
+CREATE TABLE IF NOT EXISTS recipe_table (
+    recipe_id integer PRIMARY KEY,
+    recipe_name varchar(255),
+    type_course_id integer REFERENCES type_course_table (type_course_id),
+    type_cuisine_id integer REFERENCES type_cuisine_table (type_cuisine_id),
+    type_diet_id integer REFERENCES type_diet_name (type_diet_id)
+);
+CREATE TABLE IF NOT EXISTS recipe_ingredient_table (
+    recipe_ingredient_id serial PRIMARY KEY,
+    ingredient_id integer REFERENCES ingredient_table (ingredient_id),
+    recipe_id integer REFERENCES recipe_table (recipe_id)
+);
+"""
+
+SALES_TABLES = ["order_details", "orders", "products", "customers", "revenue_daily", "revenue_monthly"]
+RECIPE_TABLES = [
+    "recipe_ingredient_table", "recipe_table", "ingredient_table",
+    "type_course_table", "type_cuisine_table", "type_diet_name",
+    "recipe_cuisine_summary", "recipe_diet_summary",
+    "ingredient_summary", "recipe_ingredient_pair_count",
+]
+RECIPE_SUMMARY_TRIGGERS = [
+    ("recipe_table", "trg_recipe_table_summary"),
+    ("recipe_ingredient_table", "trg_recipe_ingredient_summary"),
+]
+
+
+def recipe_summary_sql() -> str:
+    """Bagian tabel ringkasan + trigger dari final_project/db.sql (bagian itu bisa dijalankan apa adanya)."""
+    text = RECIPE_DB_SQL.read_text()
+    start = text.index(RECIPE_SUMMARY_MARKER)
+    return text[text.rindex("\n", 0, start) + 1:]
+
+COURSES = ["Appetizer", "Main Course", "Side Dish", "Dessert", "Snack", "Breakfast", "Soup", "Drink"]
+CUISINES = [
+    "Indonesian", "Indian", "Italian", "Mexican", "Chinese", "Japanese", "Thai", "French",
+    "Korean", "Vietnamese", "Greek", "Spanish", "Turkish", "Lebanese", "Moroccan", "American",
+    "Brazilian", "Peruvian", "Ethiopian", "German", "British", "Filipino", "Malaysian", "Caribbean",
+]
+DIETS = ["Vegetarian", "Vegan", "Non Vegetarian", "Eggetarian", "Gluten Free", "Diabetic Friendly"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _copy_frame(cur, table: str, df: pd.DataFrame) -> None:
+    """COPY one DataFrame chunk into `table` (columns taken from the frame)."""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    columns = ", ".join(df.columns)
+    cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _chunks(n: int, size: int = CHUNK_ROWS) -> Iterator[slice]:
+    for start in range(0, n, size):
+        yield slice(start, min(start + size, n))
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    """Popularity weights: a few items are very common, most are rare."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _next_id(cur, table: str, column: str) -> int:
+    """First free id in `table` (MAX + 1), so `--keep` appends instead of colliding."""
+    cur.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}")
+    return cur.fetchone()[0]
+
+
+def _drop_tables(cur, tables) -> None:
+    for table in tables:
+        cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+
+
+# ---------------------------------------------------------------------------
+# sales_db
+# ---------------------------------------------------------------------------
+
+
+def generate_sales(conn, orders: int, customers: Optional[int] = None, products: int = 1000,
+                   items_per_order: float = 3.0, seed: int = 42, reset: bool = True) -> dict:
+    """Isi schema sales_db (database.sql) dengan data sintetis yang deterministik."""
+    rng = np.random.default_rng(seed)
+    customers = customers or max(orders // 10, 10)
+
+    with conn.cursor() as cur:
+        if reset:
+            _drop_tables(cur, SALES_TABLES)
+            cur.execute(SALES_SCHEMA.read_text())
+        # Trigger rollup dimatikan selama load massal, rollup dibangun ulang di akhir
+        cur.execute("ALTER TABLE orders DISABLE TRIGGER trg_orders_revenue_rollup")
+        # Id baru dimulai setelah data yang sudah ada (relevan untuk reset=False)
+        first_customer = _next_id(cur, "customers", "customer_id")
+        first_product = _next_id(cur, "products", "product_id")
+        first_order = _next_id(cur, "orders", "order_id")
+        detail_id = _next_id(cur, "order_details", "order_detail_id") - 1
+        first_detail = detail_id
+
+        for part in _chunks(customers):
+            ids = np.arange(first_customer + part.start, first_customer + part.stop)
+            days_old = rng.integers(18 * 365, 80 * 365, size=len(ids))
+            _copy_frame(cur, "customers", pd.DataFrame({
+                "customer_id": ids,
+                "name": [f"Customer {i:08d}" for i in rng.permutation(ids)],
+                "email": [f"customer{i}@example.com" for i in ids],
+                "phone": [f"08{n:010d}" for n in rng.integers(0, 10**10, size=len(ids))],
+                "address": [f"Jl. Contoh No. {n}" for n in rng.integers(1, 500, size=len(ids))],
+                "birthdate": (pd.Timestamp("2025-01-01") - pd.to_timedelta(days_old, unit="D")).date,
+            }))
+
+        product_ids = np.arange(first_product, first_product + products)
+        prices = np.round(rng.uniform(5_000, 500_000, size=products), 2)
+        _copy_frame(cur, "products", pd.DataFrame({
+            "product_id": product_ids,
+            "name": [f"Product {i:05d}" for i in product_ids],
+            "description": "Produk sintetis",
+            "price": prices,
+            "stock": rng.integers(0, 1_000, size=products),
+        }))
+        product_weights = _zipf_weights(products, 0.9)
+
+        for part in _chunks(orders):
+            order_ids = np.arange(first_order + part.start, first_order + part.stop)
+            n_items = rng.poisson(items_per_order - 1, size=len(order_ids)) + 1
+            detail_order = np.repeat(order_ids, n_items)
+            detail_product = rng.choice(product_ids, size=len(detail_order), p=product_weights)
+            quantity = rng.integers(1, 10, size=len(detail_order))
+            unit_price = prices[detail_product - first_product]
+            subtotal = np.round(quantity * unit_price, 2)
+            totals = np.bincount(detail_order - order_ids[0], weights=subtotal, minlength=len(order_ids))
+
+            seconds = rng.integers(0, 3 * 365 * 24 * 3600, size=len(order_ids))
+            _copy_frame(cur, "orders", pd.DataFrame({
+                "order_id": order_ids,
+                "customer_id": rng.integers(first_customer, first_customer + customers, size=len(order_ids)),
+                "order_date": pd.Timestamp("2022-01-01") + pd.to_timedelta(seconds, unit="s"),
+                "total_amount": np.round(totals, 2),
+            }))
+            _copy_frame(cur, "order_details", pd.DataFrame({
+                "order_detail_id": np.arange(detail_id + 1, detail_id + len(detail_order) + 1),
+                "order_id": detail_order,
+                "product_id": detail_product,
+                "quantity": quantity,
+                "price": unit_price,
+            }))
+            detail_id += len(detail_order)
+
+        cur.execute("ALTER TABLE orders ENABLE TRIGGER trg_orders_revenue_rollup")
+        for table, column in [("customers", "customer_id"), ("products", "product_id"),
+                              ("orders", "order_id"), ("order_details", "order_detail_id")]:
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                        f"(SELECT COALESCE(MAX({column}), 1) FROM {table}))")
+        cur.execute("SELECT refresh_revenue_rollup()")
+        cur.execute("ANALYZE")
+    conn.commit()
+    return {"customers": customers, "products": products, "orders": orders, "order_details": detail_id - first_detail}
+
+
+# ---------------------------------------------------------------------------
+# multicultural_recipe
+# ---------------------------------------------------------------------------
+
+
+def generate_recipe(conn, recipes: int, ingredients: int = 5000, ingredients_per_recipe: float = 9.0,
+                    seed: int = 42, reset: bool = True) -> dict:
+    """Isi schema multicultural_recipe (final_project/db.sql) dengan data sintetis."""
+    rng = np.random.default_rng(seed)
+
+    with conn.cursor() as cur:
+        if reset:
+            _drop_tables(cur, RECIPE_TABLES)
+            cur.execute(RECIPE_SCHEMA)
+            cur.execute(recipe_summary_sql())
+        # Trigger ringkasan dimatikan selama load massal, ringkasan dibangun ulang di akhir
+        for table, trigger in RECIPE_SUMMARY_TRIGGERS:
+            cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}")
+
+        # Tabel lookup berisi daftar tetap (id 1..n): cukup diisi sekali
+        for table, id_col, name_col, names in [
+            ("type_course_table", "type_course_id", "type_course_name", COURSES),
+            ("type_cuisine_table", "type_cuisine_id", "type_cuisine_name", CUISINES),
+            ("type_diet_name", "type_diet_id", "type_diet_name", DIETS),
+        ]:
+            if _next_id(cur, table, id_col) == 1:
+                _copy_frame(cur, table, pd.DataFrame({id_col: np.arange(1, len(names) + 1), name_col: names}))
+
+        # Id baru dimulai setelah data yang sudah ada (relevan untuk reset=False)
+        first_ingredient = _next_id(cur, "ingredient_table", "ingredient_id")
+        first_recipe = _next_id(cur, "recipe_table", "recipe_id")
+        ingredient_ids = np.arange(first_ingredient, first_ingredient + ingredients)
+        _copy_frame(cur, "ingredient_table", pd.DataFrame({
+            "ingredient_id": ingredient_ids,
+            "ingredient_name": [f"ingredient {i:05d}" for i in ingredient_ids],
+        }))
+        ingredient_weights = _zipf_weights(ingredients, 0.8)
+        cuisine_weights = _zipf_weights(len(CUISINES), 0.7)
+
+        pairs = 0
+        for part in _chunks(recipes):
+            recipe_ids = np.arange(first_recipe + part.start, first_recipe + part.stop)
+            _copy_frame(cur, "recipe_table", pd.DataFrame({
+                "recipe_id": recipe_ids,
+                "recipe_name": [f"Recipe {i:07d}" for i in recipe_ids],
+                "type_course_id": rng.integers(1, len(COURSES) + 1, size=len(recipe_ids)),
+                "type_cuisine_id": rng.choice(len(CUISINES), size=len(recipe_ids), p=cuisine_weights) + 1,
+                "type_diet_id": rng.integers(1, len(DIETS) + 1, size=len(recipe_ids)),
+            }))
+
+            n_ing = rng.poisson(ingredients_per_recipe - 1, size=len(recipe_ids)) + 1
+            pair_recipe = np.repeat(recipe_ids, n_ing)
+            pair_ingredient = rng.choice(ingredients, size=len(pair_recipe), p=ingredient_weights)
+            # Ingredient yang sama tidak dipakai dua kali dalam satu resep
+            codes = np.unique(pair_recipe.astype(np.int64) * ingredients + pair_ingredient)
+            _copy_frame(cur, "recipe_ingredient_table", pd.DataFrame({
+                "recipe_id": codes // ingredients,
+                "ingredient_id": codes % ingredients + first_ingredient,
+            }))
+            pairs += len(codes)
+
+        for table, trigger in RECIPE_SUMMARY_TRIGGERS:
+            cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}")
+        cur.execute("SELECT refresh_recipe_summary()")
+        cur.execute("ANALYZE")
+    conn.commit()
+    return {"recipes": recipes, "ingredients": ingredients, "recipe_ingredient": pairs}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def connect(dsn: Optional[str] = None, embedded: Optional[str] = None):
+    """Connect to `dsn` (or the PG* environment), or to an embedded Postgres in `embedded`."""
+    if embedded:
+        try:
+            import pgserver
+        except ImportError:
+            sys.exit("--embedded membutuhkan paket opsional `pgserver` (pip install pgserver)")
+        server = pgserver.get_server(embedded)
+        return psycopg2.connect(server.get_uri())
+    return psycopg2.connect(dsn or "")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("schema", choices=["sales", "recipe"])
+    parser.add_argument("--dsn", help="libpq connection string (default: PG* environment variables)")
+    parser.add_argument("--embedded", metavar="DIR", help="pakai Postgres embedded (pgserver) di DIR")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--ingredients", type=int, default=5_000)
+    parser.add_argument("--keep", action="store_true", help="jangan drop tabel yang sudah ada")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.dsn, args.embedded)
+    try:
+        if args.schema == "sales":
+            counts = generate_sales(conn, args.orders, args.customers, args.products,
+                                    seed=args.seed, reset=not args.keep)
+        else:
+            counts = generate_recipe(conn, args.recipes, args.ingredients,
+                                     seed=args.seed, reset=not args.keep)
+    finally:
+        conn.close()
+    print(", ".join(f"{name}={count:,}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Suggest indexes from the plans of the dashboard queries.
+
+Contoh:
+    python benchmarks/index_advisor.py --schema recipe --recipe-db recipe_bench
+    python benchmarks/index_advisor.py --schema all --write-migration   # tulis saran sebagai migrasi
+
+Setiap fungsi query di kedua config.py dijalankan sekali, ditambah panggilan
+dengan argumen representatif (rentang usia, halaman keyset kedua, breakdown
+histogram) dan loader analytics/similarity milik dashboard resep. Query SQL yang
+dikirim ditangkap lewat `add_query_hook`, lalu di-`EXPLAIN (VERBOSE, FORMAT JSON)`.
+Dari rencana eksekusi itu advisor mencari:
+
+- Seq Scan pada tabel besar (>= --min-rows baris): kolom filter/join tabel itu
+  diusulkan sebagai index komposit, dengan kolom lain yang dibaca query sebagai
+  INCLUDE (covering, supaya bisa index-only scan);
+- index non-unik yang tidak dipakai oleh satu pun rencana query dashboard
+  (hanya menambah biaya INSERT/UPDATE). Index yang kolom pertamanya difilter
+  oleh query yang ditangkap tidak pernah dianggap tak terpakai, walau planner
+  memilih Seq Scan untuk parameter contoh.
+
+Dengan --write-migration saran ditulis sebagai file migrasi bernomor yang bisa
+dijalankan (dan diukur before/after) dengan benchmarks/migrate.py. DROP INDEX
+untuk index tak terpakai ditulis sebagai komentar kecuali --drop-unused.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import importlib
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from migrate import SCHEMAS, next_version  # noqa: E402
+from run import DEFAULT_DBNAMES, _consume, load_config, query_functions  # noqa: E402
+
+IDENTIFIER = re.compile(r"\b(?:(\w+)\.)?(\w+)\b")
+JOIN_CONDITIONS = ("Hash Cond", "Merge Cond", "Join Filter")
+MAX_INCLUDE_COLUMNS = 3
+
+# Key keyset dari baris terakhir sebuah halaman (sama dengan row_key di main.py)
+KEYSET_ROW_KEYS = {
+    "view_customers_page": lambda row: (row[1], row[0]),
+    "view_orders_page": lambda row: (row[1], row[0]),
+    "view_order_details_page": lambda row: (row[2], row[0]),
+}
+# Argumen lain yang dikirim dashboard selain default
+ARGUMENT_VARIANTS = {
+    "view_revenue_rollup": [{"granularity": "day"}],
+    "ingredient_count_histogram": [{"by": "cuisine"}, {"by": "diet"}],
+}
+# Loader di luar config.py yang menjalankan query lewat config yang sama (modul, atribut)
+MODULE_LOADERS = [
+    ("analytics", "RecipeAnalytics.load"),
+    ("similarity", "build_index"),
+]
+
+
+def _next_page(func: Callable[..., Any], row_key: Callable[[Any], Tuple], **kwargs) -> Any:
+    rows = func(**kwargs)
+    return func(after=row_key(rows[-1]), **kwargs) if rows else rows
+
+
+def query_calls(cfg) -> Dict[str, Callable[[], Any]]:
+    """Zero-argument functions plus calls with representative arguments, by label."""
+    functions = query_functions(cfg)
+    calls: Dict[str, Callable[[], Any]] = dict(functions)
+    for name, variants in ARGUMENT_VARIANTS.items():
+        for kwargs in variants if name in functions else []:
+            label = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
+            calls[f"{name}({label})"] = functools.partial(functions[name], **kwargs)
+
+    # Rentang usia yang dipersempit di slider: filter birthdate (idx_customers_birthdate)
+    age_range = None
+    if "customer_age_bounds" in functions:
+        min_age, max_age = functions["customer_age_bounds"]()
+        age_range = (min_age, min_age + max((max_age - min_age) // 4, 1))
+        for name in ("view_customers_page", "count_customers", "export_customers"):
+            if hasattr(cfg, name):
+                calls[f"{name}(age_range={age_range!r})"] = functools.partial(getattr(cfg, name), age_range=age_range)
+
+    # Halaman kedua keyset: predikat `after` baru muncul setelah halaman pertama
+    for name, row_key in KEYSET_ROW_KEYS.items():
+        if hasattr(cfg, name):
+            calls[f"{name}(after=...)"] = functools.partial(_next_page, getattr(cfg, name), row_key)
+    if age_range is not None and hasattr(cfg, "view_customers_page"):
+        calls["view_customers_page(after=..., age_range)"] = functools.partial(
+            _next_page, cfg.view_customers_page, KEYSET_ROW_KEYS["view_customers_page"], age_range=age_range
+        )
+
+    # Loader analytics/similarity (direktori config sudah di sys.path, lihat load_config)
+    config_dir = str(Path(cfg.__file__).resolve().parent)
+    for module_name, attribute in MODULE_LOADERS:
+        spec = importlib.util.find_spec(module_name)
+        if spec is None or spec.origin is None or str(Path(spec.origin).resolve().parent) != config_dir:
+            continue
+        target: Any = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            target = getattr(target, part)
+        calls[f"{module_name}.{attribute}"] = target
+    return calls
+
+
+def capture_queries(cfg) -> Dict[str, Tuple[str, Any, Set[str]]]:
+    """Run every query call once; return SQL text -> (query, params, function names)."""
+    captured: Dict[str, Tuple[str, Any, Set[str]]] = {}
+
+    def hook(name, query, params, elapsed_ms, rows):
+        if not query.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        key = " ".join(query.split()) + repr(params)
+        captured.setdefault(key, (query, params, set()))[2].add(name)
+
+    cfg.add_query_hook(hook)
+    try:
+        for name, func in sorted(query_calls(cfg).items()):
+            try:
+                _consume(func())
+            except Exception as exc:  # satu query gagal tidak menghentikan advisor
+                print(f"  {name}: gagal dijalankan ({type(exc).__name__}: {exc})")
+    finally:
+        cfg.remove_query_hook(hook)
+    return captured
+
+
+def explain(cfg, query: str, params, analyze: bool) -> Dict[str, Any]:
+    options = "ANALYZE, VERBOSE, FORMAT JSON" if analyze else "VERBOSE, FORMAT JSON"
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute(f"EXPLAIN ({options}) " + query, params)
+        return cur.fetchone()[0][0]["Plan"]
+
+
+def walk(plan: Dict[str, Any], parent: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+    """Yield (node, nearest join/parent node); a Hash node is skipped to reach its Hash Join."""
+    yield plan, parent
+    for child in plan.get("Plans", []):
+        yield from walk(child, parent if plan.get("Node Type") == "Hash" else plan)
+
+
+def table_columns(cfg) -> Dict[str, Set[str]]:
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+        """)
+        columns: Dict[str, Set[str]] = {}
+        for table, column in cur.fetchall():
+            columns.setdefault(table, set()).add(column)
+        return columns
+
+
+def table_rows(cfg) -> Dict[str, float]:
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname, c.reltuples
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r' AND n.nspname = current_schema()
+        """)
+        return dict(cur.fetchall())
+
+
+def existing_indexes(cfg) -> List[Dict[str, Any]]:
+    """Indexes in the current schema with their key columns and uniqueness."""
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT
+                t.relname AS table_name,
+                i.relname AS index_name,
+                ix.indisunique OR ix.indisprimary AS is_unique,
+                ARRAY(
+                    SELECT a.attname
+                    FROM unnest(ix.indkey[0:ix.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, ord)
+                    JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+                    ORDER BY k.ord
+                ) AS columns,
+                COALESCE(s.idx_scan, 0) AS idx_scan
+            FROM pg_index ix
+            JOIN pg_class t ON t.oid = ix.indrelid
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = ix.indexrelid
+            WHERE n.nspname = current_schema()
+        """)
+        names = [desc[0] for desc in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+
+def _columns_of(expressions: List[str], alias: str, columns: Set[str]) -> List[str]:
+    """Columns of the scanned table referenced in `expressions` (qualified by `alias` or bare)."""
+    found: List[str] = []
+    for expression in expressions:
+        for qualifier, name in IDENTIFIER.findall(expression):
+            if name in columns and qualifier in ("", alias) and name not in found:
+                found.append(name)
+    return found
+
+
+def advise(cfg, min_rows: float, analyze: bool) -> Dict[str, Any]:
+    captured = capture_queries(cfg)
+    columns = table_columns(cfg)
+    rows = table_rows(cfg)
+    indexes = existing_indexes(cfg)
+    used_indexes: Set[str] = set()
+    touched_tables: Set[str] = set()
+    suggestions: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+    seq_scans: List[Dict[str, Any]] = []
+    filtered: Set[Tuple[str, str]] = set()  # (tabel, kolom) yang difilter/di-join query mana pun
+
+    for query, params, names in captured.values():
+        try:
+            plan = explain(cfg, query, params, analyze)
+        except Exception as exc:
+            print(f"  EXPLAIN gagal untuk {sorted(names)}: {exc}")
+            continue
+        for node, parent in walk(plan):
+            if "Index Name" in node:
+                used_indexes.add(node["Index Name"])
+            if "Relation Name" in node:
+                touched_tables.add(node["Relation Name"])
+            if node.get("Node Type") != "Seq Scan":
+                continue
+            table, alias = node["Relation Name"], node.get("Alias", node["Relation Name"])
+            table_cols = columns.get(table, set())
+            keys = _columns_of([node.get("Filter", "")], alias, table_cols)
+            if parent is not None:
+                keys += [c for c in _columns_of([parent.get(k, "") for k in JOIN_CONDITIONS], alias, table_cols)
+                         if c not in keys]
+            filtered.update((table, c) for c in keys)
+            if rows.get(table, 0) < min_rows:
+                continue
+            output = [c for c in _columns_of(node.get("Output", []), alias, table_cols) if c not in keys]
+            seq_scans.append({"table": table, "rows": rows.get(table), "queries": sorted(names),
+                              "filter": node.get("Filter"), "keys": keys})
+            if not keys:
+                # Scan penuh untuk agregasi: covering index atas kolom yang dibaca
+                keys, output = output[:2], output[2:]
+            if not keys or any(ix["table_name"] == table and ix["columns"][:len(keys)] == keys for ix in indexes):
+                continue
+            include = output if len(output) <= MAX_INCLUDE_COLUMNS else []
+            suggestion = suggestions.setdefault((table, tuple(keys)), {
+                "table": table, "columns": keys, "include": include, "queries": set(),
+            })
+            suggestion["queries"].update(names)
+
+    # Hanya index di tabel yang memang dibaca dashboard; index unik/PK menjaga constraint.
+    # Index atas kolom yang difilter tetap dipertahankan: dengan parameter lain
+    # (rentang lebih sempit, tabel lebih besar) planner bisa memilihnya.
+    unused = [
+        ix for ix in indexes
+        if not ix["is_unique"] and ix["index_name"] not in used_indexes and ix["table_name"] in touched_tables
+        and not (ix["columns"] and (ix["table_name"], ix["columns"][0]) in filtered)
+    ]
+    return {
+        "queries": len(captured),
+        "seq_scans": seq_scans,
+        "suggestions": [dict(s, queries=sorted(s["queries"])) for s in suggestions.values()],
+        "unused_indexes": unused,
+    }
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    return f"idx_{table}_{'_'.join(columns)}"[:63]
+
+
+def migration_sql(report: Dict[str, Any], drop_unused: bool) -> str:
+    lines = ["-- Dibuat oleh benchmarks/index_advisor.py; tinjau sebelum dijalankan.", ""]
+    for s in report["suggestions"]:
+        include = f" INCLUDE ({', '.join(s['include'])})" if s["include"] else ""
+        lines.append(f"-- Dipakai oleh: {', '.join(s['queries'])}")
+        lines.append(f"CREATE INDEX IF NOT EXISTS {index_name(s['table'], s['columns'])} "
+                     f"ON {s['table']} ({', '.join(s['columns'])}){include};")
+    for ix in report["unused_indexes"]:
+        prefix = "" if drop_unused else "-- "
+        lines.append(f"-- Tidak dipakai query dashboard (idx_scan={ix['idx_scan']})")
+        lines.append(f"{prefix}DROP INDEX IF EXISTS {ix['index_name']};")
+    return "\n".join(lines) + "\n"
+
+
+def print_report(schema: str, report: Dict[str, Any]) -> None:
+    print(f"\n[{schema}] {report['queries']} query dianalisis")
+    print(f"  Seq Scan pada tabel besar: {len(report['seq_scans'])}")
+    for scan in report["seq_scans"]:
+        print(f"    {scan['table']:<28} ~{int(scan['rows'] or 0):>10} baris  {', '.join(scan['queries'])}")
+    print("  Saran index:")
+    for s in report["suggestions"]:
+        include = f" INCLUDE ({', '.join(s['include'])})" if s["include"] else ""
+        print(f"    {s['table']} ({', '.join(s['columns'])}){include}  <- {', '.join(s['queries'])}")
+    if not report["suggestions"]:
+        print("    (tidak ada)")
+    print("  Index tidak terpakai:")
+    for ix in report["unused_indexes"]:
+        print(f"    {ix['index_name']} ON {ix['table_name']} ({', '.join(ix['columns'])})")
+    if not report["unused_indexes"]:
+        print("    (tidak ada)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schema", choices=["sales", "recipe", "all"], default="all")
+    parser.add_argument("--sales-db", default=DEFAULT_DBNAMES["sales"], help="nama database sales (default: sales_db)")
+    parser.add_argument("--recipe-db", default=DEFAULT_DBNAMES["recipe"],
+                        help="nama database recipe (default: multicultural_recipe)")
+    parser.add_argument("--min-rows", type=float, default=10_000, help="abaikan Seq Scan pada tabel lebih kecil")
+    parser.add_argument("--analyze", action="store_true", help="pakai EXPLAIN ANALYZE (query dijalankan ulang)")
+    parser.add_argument("--write-migration", action="store_true", help="tulis saran sebagai file migrasi")
+    parser.add_argument("--drop-unused", action="store_true", help="DROP INDEX tak terpakai tidak dikomentari")
+    args = parser.parse_args(argv)
+
+    for schema, dbname in (("sales", args.sales_db), ("recipe", args.recipe_db)):
+        if args.schema not in (schema, "all"):
+            continue
+        config_path, directory, module_name = SCHEMAS[schema]
+        cfg = load_config(config_path, module_name, dbname)
+        try:
+            report = advise(cfg, args.min_rows, args.analyze)
+        finally:
+            cfg.close_pool()
+        print_report(schema, report)
+        if args.write_migration and (report["suggestions"] or report["unused_indexes"]):
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{next_version(directory):04d}_index_advisor.sql"
+            path.write_text(migration_sql(report, args.drop_unused))
+            print(f"  Migrasi ditulis ke {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
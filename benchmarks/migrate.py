@@ -0,0 +1,183 @@
+"""Apply versioned schema migrations and record before/after query timings.
+
+Contoh:
+    python benchmarks/migrate.py --schema recipe --recipe-db recipe_bench --status
+    python benchmarks/migrate.py --schema all --sales-db sales_bench --recipe-db recipe_bench
+
+Migrasi adalah file SQL bernomor (`NNNN_nama.sql`) di `migrations/` (sales_db)
+dan `final_project/migrations/` (multicultural_recipe). Versi yang sudah
+dijalankan dicatat di tabel `schema_migrations` beserta checksum file dan total
+median waktu semua fungsi query sebelum dan sesudah migrasi. Setiap migrasi
+dijalankan dalam satu transaksi. Timing lengkap per fungsi ditulis sebagai
+JSON (format sama dengan benchmarks/run.py) ke benchmarks/results/.
+
+Migrasi baru bisa dibuat dari saran benchmarks/index_advisor.py (`--write-migration`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run import (  # noqa: E402
+    DEFAULT_DBNAMES, REPO_ROOT, RESULTS_DIR, git_commit, load_config, query_functions, run_suite,
+)
+
+# schema -> (config.py, direktori migrasi, nama modul saat di-load)
+SCHEMAS = {
+    "sales": (REPO_ROOT / "config.py", REPO_ROOT / "migrations", "sales_config"),
+    "recipe": (REPO_ROOT / "final_project" / "config.py", REPO_ROOT / "final_project" / "migrations", "recipe_config"),
+}
+
+MIGRATION_FILE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        before_ms DOUBLE PRECISION, -- total median semua fungsi query sebelum migrasi
+        after_ms DOUBLE PRECISION   -- ... dan sesudahnya
+    )
+"""
+
+
+def discover(directory: Path) -> List[Tuple[int, str, Path]]:
+    """Migration files in `directory` as (version, name, path), sorted by version."""
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise SystemExit(f"Nomor versi migrasi duplikat di {directory}")
+    return migrations
+
+
+def next_version(directory: Path) -> int:
+    migrations = discover(directory) if directory.exists() else []
+    return (migrations[-1][0] + 1) if migrations else 1
+
+
+def checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def applied_versions(cfg) -> Dict[int, str]:
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute(MIGRATIONS_TABLE)
+        cur.execute("SELECT version, checksum FROM schema_migrations")
+        return dict(cur.fetchall())
+
+
+def pending(cfg, directory: Path) -> List[Tuple[int, str, Path]]:
+    applied = applied_versions(cfg)
+    migrations = discover(directory)
+    for version, _, path in migrations:
+        if version in applied and applied[version] != checksum(path):
+            print(f"  PERINGATAN: {path.name} berubah setelah dijalankan (checksum beda)")
+    return [m for m in migrations if m[0] not in applied]
+
+
+def apply_migration(cfg, version: int, name: str, path: Path) -> None:
+    with cfg.get_connection() as conn, conn.cursor() as cur:
+        cur.execute(path.read_text())
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (version, name, checksum(path)),
+        )
+        # Statistik planner untuk index baru
+        cur.execute("ANALYZE")
+
+
+def total_median_ms(results: List[Dict[str, Any]]) -> float:
+    return sum(r["median_s"] for r in results if not r.get("error")) * 1000
+
+
+def migrate_schema(schema: str, dbname: str, repeat: int, warmup: int,
+                   status_only: bool, timing: bool) -> List[Dict[str, Any]]:
+    config_path, directory, module_name = SCHEMAS[schema]
+    cfg = load_config(config_path, module_name, dbname)
+    try:
+        todo = pending(cfg, directory)
+        print(f"[{schema}] {len(todo)} migrasi belum dijalankan")
+        for version, name, _ in todo:
+            print(f"  {version:04d} {name}")
+        if status_only or not todo:
+            return []
+
+        benches = query_functions(cfg)
+        before = run_suite(f"{schema}:before", benches, repeat, warmup, None) if timing else []
+        for version, name, path in todo:
+            print(f"[{schema}] menjalankan {path.name}")
+            apply_migration(cfg, version, name, path)
+        after = run_suite(f"{schema}:after", benches, repeat, warmup, None) if timing else []
+
+        if timing:
+            before_ms, after_ms = total_median_ms(before), total_median_ms(after)
+            with cfg.get_connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE schema_migrations SET before_ms = %s, after_ms = %s WHERE version = ANY(%s)",
+                    (before_ms, after_ms, [version for version, _, _ in todo]),
+                )
+            print(f"[{schema}] total median {before_ms:.1f} ms -> {after_ms:.1f} ms")
+            after_by_name = {r["name"]: r for r in after}
+            for result in before:
+                new = after_by_name.get(result["name"])
+                if result.get("error") or not new or new.get("error") or not result["median_s"]:
+                    continue
+                print(f"  {result['name']:<45} {new['median_s'] / result['median_s']:6.2f}x")
+        return before + after
+    finally:
+        cfg.close_pool()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schema", choices=["sales", "recipe", "all"], default="all")
+    parser.add_argument("--sales-db", default=DEFAULT_DBNAMES["sales"], help="nama database sales (default: sales_db)")
+    parser.add_argument("--recipe-db", default=DEFAULT_DBNAMES["recipe"],
+                        help="nama database recipe (default: multicultural_recipe)")
+    parser.add_argument("--status", action="store_true", help="hanya tampilkan migrasi yang belum dijalankan")
+    parser.add_argument("--no-timing", action="store_true", help="jalankan migrasi tanpa benchmark before/after")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="file JSON hasil timing")
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    for schema, dbname in (("sales", args.sales_db), ("recipe", args.recipe_db)):
+        if args.schema in (schema, "all"):
+            results += migrate_schema(schema, dbname, args.repeat, args.warmup, args.status, not args.no_timing)
+
+    if results:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+            },
+            "results": results,
+        }
+        output = args.output or RESULTS_DIR / f"migrate-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, default=str))
+        print(f"\nHasil disimpan di {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""Benchmark every query function and dashboard section build of both apps.
+
+Contoh:
+    # isi data dulu (lihat benchmarks/datagen.py), lalu:
+    python benchmarks/run.py --sales-db sales_bench --recipe-db recipe_bench --repeat 5
+
+    # bandingkan dengan hasil sebelumnya; exit code 1 kalau ada yang lebih lambat > 20%
+    python benchmarks/run.py --schema recipe --recipe-db recipe_bench \\
+        --compare benchmarks/results/baseline.json --threshold 1.2
+
+Hasil ditulis sebagai JSON (default: benchmarks/results/<timestamp>.json) berisi
+statistik waktu per fungsi/section, jumlah baris, dan metadata run (commit git,
+versi Python, ukuran data) supaya bisa dibandingkan antar run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Fungsi query baca yang diukur, per config.py. Sengaja daftar eksplisit (bukan
+# "semua fungsi publik"): helper seperti reset_query_stats/query_stats, pool, cache,
+# atau refresh_* bukan query dashboard, dan sebagian malah mengubah state yang
+# sedang diukur. Fungsi query baru perlu ditambahkan di sini.
+QUERY_FUNCTIONS = {
+    "sales": (
+        "count_customers", "customer_age_bounds", "export_customers", "export_order_details", "export_orders",
+        "export_products", "iter_order_details_with_info", "order_details_summary", "orders_summary",
+        "products_summary", "top_products_by_quantity", "top_products_by_revenue", "top_products_by_stock",
+        "view_customers", "view_customers_page", "view_order_details_page", "view_order_details_with_info",
+        "view_order_details_with_info_df", "view_orders_page", "view_orders_with_customers", "view_products",
+        "view_revenue_rollup",
+    ),
+    "recipe": (
+        "ingredient_count_histogram", "ingredient_count_per_recipe", "ingredient_count_stats_by_cuisine",
+        "ingredient_recipe_stats", "ingredient_usage_distribution", "recipe_category_count_by_cuisine",
+        "recipe_count_by_cuisine", "recipe_count_by_diet", "recipe_overview_with_ingredient_count",
+        "recipe_overview_with_ingredient_count_df", "recipe_share_by_diet", "top_ingredients",
+        "view_ingredient", "view_recipe", "view_recipe_ingredient", "view_recipe_ingredient_df",
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Loading the two config modules side by side
+# ---------------------------------------------------------------------------
+
+
+# Database default per schema; sengaja tidak dibaca dari PGDATABASE supaya run
+# "--schema all" tidak mengarahkan kedua config ke database yang sama.
+DEFAULT_DBNAMES = {"sales": "sales_db", "recipe": "multicultural_recipe"}
+
+
+def load_config(path: Path, module_name: str, dbname: str):
+    """Import a config.py under a unique module name, pointed at `dbname`."""
+    # Direktori config.py tetap di sys.path: modul pendukungnya (query_cache, export)
+    # juga di-import secara lazy dari sana.
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Pool dibuat saat query pertama, jadi dbname cukup diset di DB_CONFIG modul ini
+    # (tanpa os.environ yang ikut terbaca oleh config berikutnya).
+    module.DB_CONFIG["dbname"] = dbname
+    # Modul pendukung di direktori yang sama (analytics, similarity, ...) memakai
+    # `from config import ...`; arahkan ke instance ini supaya query mereka memakai
+    # database, pool, dan hook statistik yang sama.
+    sys.modules[module_name] = module
+    sys.modules["config"] = module
+    return module
+
+
+def query_functions(module) -> Dict[str, Callable[[], Any]]:
+    """Allow-listed query functions of `module` (see QUERY_FUNCTIONS), by name."""
+    allowed = {name for names in QUERY_FUNCTIONS.values() for name in names}
+    functions = {}
+    for name, func in vars(module).items():
+        if name not in allowed or not inspect.isfunction(func):
+            continue
+        # Lewati cache hasil query supaya yang diukur benar-benar database
+        functions[name] = getattr(func, "__wrapped__", func)
+    return functions
+
+
+def _consume(result) -> Optional[int]:
+    """Materialize generators and return a row count where it makes sense."""
+    if inspect.isgenerator(result):
+        return sum(len(batch) for batch in result)
+    if isinstance(result, (bytes, bytearray)):
+        return result.count(b"\n")
+    if hasattr(result, "num_rows"):
+        return result.num_rows
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Dashboard sections (DataFrame + chart builds, tanpa Streamlit)
+# ---------------------------------------------------------------------------
+
+
+def sales_sections(cfg) -> Dict[str, Callable[[], Any]]:
+    """Replicate the DataFrame/chart preparation of the main.py sections."""
+
+    def customers():
+        min_age, max_age = cfg.customer_age_bounds.__wrapped__()
+        rows = cfg.view_customers_page.__wrapped__(None, cfg.PAGE_SIZE + 1, age_range=(min_age, max_age))
+        cfg.count_customers.__wrapped__((min_age, max_age))
+        return pd.DataFrame(rows, columns=["customer_id", "name", "email", "phone", "address", "birthdate", "Age"])
+
+    def products():
+        df = pd.DataFrame(cfg.view_products.__wrapped__(),
+                          columns=["product_id", "name", "description", "price", "stock"])
+        cfg.products_summary.__wrapped__()
+        top = pd.DataFrame(cfg.top_products_by_stock.__wrapped__(10), columns=["name", "stock"]).set_index("name")
+        return df, top
+
+    def orders():
+        cfg.orders_summary.__wrapped__()
+        df = pd.DataFrame(cfg.view_orders_page.__wrapped__(None, cfg.PAGE_SIZE + 1),
+                          columns=["order_id", "order_date", "total_amount", "customer_name", "phone"])
+        df_time = pd.DataFrame(cfg.view_revenue_rollup.__wrapped__("month"),
+                               columns=["order_date", "order_count", "total_amount"])
+        df_time["total_amount"] = cfg.to_money(df_time["total_amount"])
+        return df, df_time.set_index("order_date")["total_amount"]
+
+    def order_details():
+        columns = ["product_name", "total_quantity", "total_revenue"]
+        cfg.order_details_summary.__wrapped__()
+        rows = cfg.view_order_details_page.__wrapped__(None, cfg.PAGE_SIZE + 1)
+        top_qty = pd.DataFrame(cfg.top_products_by_quantity.__wrapped__(10), columns=columns)
+        top_rev = pd.DataFrame(cfg.top_products_by_revenue.__wrapped__(10), columns=columns)
+        return rows, top_qty, top_rev
+
+    return {
+        "section:customers": customers,
+        "section:products": products,
+        "section:orders": orders,
+        "section:order_details": order_details,
+    }
+
+
+def recipe_sections(cfg) -> Dict[str, Callable[[], Any]]:
+    """Replicate the DataFrame and plotly figure builds of final_project/app.py."""
+    try:
+        import plotly.express as px
+        plotting = importlib.import_module("plotting")  # final_project/plotting.py
+    except ImportError:
+        px = plotting = None
+
+    def figure(builder, df, **kwargs):
+        if px is None or df.empty:
+            return df
+        # to_json = payload yang dikirim ke browser
+        return getattr(px, builder)(df, **kwargs).to_json()
+
+    def cuisine():
+        df = pd.DataFrame(cfg.recipe_count_by_cuisine())
+        cat = pd.DataFrame(cfg.recipe_category_count_by_cuisine())
+        return figure("bar", df, x="cuisine", y="recipe_count"), figure("bar", cat, x="cuisine", y="category_count")
+
+    def ingredient():
+        top = pd.DataFrame(cfg.top_ingredients(10))
+        usage = pd.DataFrame(cfg.ingredient_usage_distribution())
+        # Histogram di-bin di database (ingredient_count_histogram), seperti app.py
+        binned = pd.DataFrame(cfg.ingredient_count_histogram(15))
+        stats = pd.DataFrame(cfg.ingredient_count_stats_by_cuisine())
+        return (
+            figure("bar", top, x="ingredient_name", y="usage_count"),
+            plotting.scatter(usage, "recipe_count", "total_usage", hover_name="ingredient_name").to_json()
+            if plotting and not usage.empty else usage,
+            plotting.histogram_from_bins(
+                [*binned["bin_start"], binned["bin_end"].iat[-1]], binned["recipe_count"], x="ingredient_count"
+            ).to_json()
+            if plotting and not binned.empty else binned,
+            figure("bar", stats, x="cuisine", y="avg_ingredient_per_recipe"),
+        )
+
+    def diet():
+        df = pd.DataFrame(cfg.recipe_count_by_diet())
+        share = pd.DataFrame(cfg.recipe_share_by_diet())
+        overview = cfg.recipe_overview_with_ingredient_count_df()
+        return figure("bar", df, x="diet", y="recipe_count"), figure("pie", share, names="diet", values="recipe_count"), overview
+
+    # Tahap prefetch app.py: sembilan loader serial vs paralel di thread pool
+    loaders = [
+        cfg.recipe_count_by_cuisine, cfg.recipe_category_count_by_cuisine, lambda: cfg.top_ingredients(10),
+        cfg.ingredient_usage_distribution, lambda: cfg.ingredient_count_histogram(15),
+        cfg.ingredient_count_stats_by_cuisine, cfg.recipe_count_by_diet, cfg.recipe_share_by_diet,
+        cfg.recipe_overview_with_ingredient_count_df,
+    ]
+
+    def prefetch_serial():
+        return [loader() for loader in loaders]
+
+    def prefetch_parallel():
+        workers = min(len(loaders), cfg.POOL_MAXCONN)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda loader: loader(), loaders))
+
+    # Engine single-scan (final_project/analytics.py): satu extract untuk semua agregat
+    analytics = importlib.import_module("analytics")
+
+    def analytics_all():
+        engine = analytics.RecipeAnalytics.load()
+        return [
+            engine.recipe_count_by_cuisine(), engine.recipe_category_count_by_cuisine(),
+            engine.top_ingredients(10), engine.ingredient_usage_distribution(),
+            engine.ingredient_count_per_recipe(), engine.ingredient_count_stats_by_cuisine(),
+            engine.recipe_count_by_diet(), engine.recipe_share_by_diet(), engine.ingredient_recipe_stats(),
+            engine.recipe_overview_with_ingredient_count_df(),
+        ]
+
+    # Relasi resep-ingredient: list tuple per pasangan vs matriks CSR milik engine analytics
+    # (final_project/recipe_matrix.py), termasuk derajat baris/kolom
+    def recipe_ingredient_rows():
+        return cfg.view_recipe_ingredient()
+
+    def recipe_ingredient_csr():
+        matrix = analytics.RecipeAnalytics.load().matrix
+        return matrix.row_degrees(weighted=True), matrix.col_degrees(), matrix.col_degrees(weighted=True)
+
+    # Histogram jumlah ingredient: satu baris per resep (binning di plotly) vs bin dari SQL
+    def histogram_client_side():
+        per_recipe = pd.DataFrame(cfg.ingredient_count_per_recipe())
+        return px.histogram(per_recipe, x="ingredient_count", nbins=15).to_json() if px else per_recipe
+
+    def histogram_sql_by_cuisine():
+        return cfg.ingredient_count_histogram(15, by="cuisine")
+
+    return {
+        "section:cuisine": cuisine,
+        "section:ingredient": ingredient,
+        "section:diet": diet,
+        "section:prefetch_serial": prefetch_serial,
+        "section:prefetch_parallel": prefetch_parallel,
+        "section:analytics_all": analytics_all,
+        "section:recipe_ingredient_rows": recipe_ingredient_rows,
+        "section:recipe_ingredient_csr": recipe_ingredient_csr,
+        "section:histogram_client_side": histogram_client_side,
+        "section:histogram_sql_by_cuisine": histogram_sql_by_cuisine,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+
+def time_call(func: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    """Run `func` warmup + repeat times and summarize wall-clock timings."""
+    for _ in range(warmup):
+        _consume(func())
+    timings: List[float] = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = _consume(func())
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_s": timings[0],
+        "median_s": statistics.median(timings),
+        "p95_s": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        "max_s": timings[-1],
+        "rows": rows,
+    }
+
+
+def run_suite(name: str, benchmarks: Dict[str, Callable[[], Any]], repeat: int, warmup: int,
+              only: Optional[str]) -> List[Dict[str, Any]]:
+    results = []
+    for bench_name, func in sorted(benchmarks.items()):
+        if only and only not in bench_name:
+            continue
+        try:
+            stats = time_call(func, repeat, warmup)
+            stats["error"] = None
+        except Exception as exc:  # satu query gagal tidak menghentikan seluruh suite
+            stats = {"error": f"{type(exc).__name__}: {exc}"}
+        stats.update({"suite": name, "name": bench_name})
+        results.append(stats)
+        status = stats["error"] or f"median {stats['median_s'] * 1000:9.2f} ms  rows={stats['rows']}"
+        print(f"[{name}] {bench_name:<45} {status}")
+    return results
+
+
+def table_sizes(cfg, tables: List[str]) -> Dict[str, int]:
+    sizes = {}
+    for table in tables:
+        try:
+            with cfg.get_connection() as conn, conn.cursor() as cur:
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                sizes[table] = cur.fetchone()[0]
+        except Exception:
+            sizes[table] = None
+    return sizes
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> bool:
+    """Print median ratios against a baseline run; return True if something regressed."""
+    baseline = {(r["suite"], r["name"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    regressed = False
+    print(f"\nPerbandingan dengan {baseline_path} (ambang {threshold:.2f}x):")
+    for result in results:
+        old = baseline.get((result["suite"], result["name"]))
+        if not old or old.get("error") or result.get("error"):
+            continue
+        ratio = result["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        flag = "REGRESI" if ratio > threshold else ""
+        regressed |= bool(flag)
+        print(f"  [{result['suite']}] {result['name']:<45} {ratio:6.2f}x {flag}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schema", choices=["sales", "recipe", "all"], default="all")
+    parser.add_argument("--sales-db", default=DEFAULT_DBNAMES["sales"], help="nama database sales (default: sales_db)")
+    parser.add_argument("--recipe-db", default=DEFAULT_DBNAMES["recipe"],
+                        help="nama database recipe (default: multicultural_recipe)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", help="hanya jalankan benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--output", type=Path, help="file JSON hasil")
+    parser.add_argument("--compare", type=Path, help="file JSON hasil run sebelumnya")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    data_sizes: Dict[str, Any] = {}
+    if args.schema in ("sales", "all"):
+        sales = load_config(REPO_ROOT / "config.py", "sales_config", args.sales_db)
+        data_sizes["sales"] = table_sizes(sales, ["customers", "products", "orders", "order_details"])
+        benches = query_functions(sales)
+        benches.update(sales_sections(sales))
+        results += run_suite("sales", benches, args.repeat, args.warmup, args.only)
+        sales.close_pool()
+    if args.schema in ("recipe", "all"):
+        recipe = load_config(REPO_ROOT / "final_project" / "config.py", "recipe_config", args.recipe_db)
+        data_sizes["recipe"] = table_sizes(recipe, ["recipe_table", "ingredient_table", "recipe_ingredient_table"])
+        benches = query_functions(recipe)
+        benches.update(recipe_sections(recipe))
+        results += run_suite("recipe", benches, args.repeat, args.warmup, args.only)
+        recipe.close_pool()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "data_sizes": data_sizes,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"\nHasil disimpan di {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
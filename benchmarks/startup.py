@@ -0,0 +1,147 @@
+"""Measure cold-start import time of the dashboard modules.
+
+Contoh:
+    python benchmarks/startup.py --repeat 10
+    python benchmarks/startup.py --importtime          # rincian `python -X importtime` per modul
+
+    # bandingkan dengan hasil sebelumnya (mis. sebelum perubahan lazy import)
+    python benchmarks/startup.py --compare benchmarks/results/startup-baseline.json
+
+Setiap pengukuran memakai proses Python baru, jadi cache modul tidak ikut
+terhitung. Import config.py tidak membuka koneksi database, sehingga benchmark
+ini tidak butuh Postgres. Hasil ditulis sebagai JSON dengan format yang sama
+dengan benchmarks/run.py (`meta` + `results`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run import REPO_ROOT, RESULTS_DIR, compare, git_commit  # noqa: E402
+
+# nama benchmark -> (direktori kerja, modul yang di-import)
+TARGETS = {
+    "config": (REPO_ROOT, "config"),
+    "export": (REPO_ROOT, "export"),
+    "restaurant_app": (REPO_ROOT, "restaurant_app"),
+    "main": (REPO_ROOT, "main"),
+    "final_project.config": (REPO_ROOT / "final_project", "config"),
+    "final_project.app": (REPO_ROOT / "final_project", "app"),
+}
+
+# Modul app Streamlit menjalankan UI saat di-import; tanpa `streamlit run` ini
+# hanya menghasilkan warning "missing ScriptRunContext", tetapi query tetap
+# dijalankan. Hanya modul tanpa efek samping yang diukur secara default.
+DEFAULT_TARGETS = ["config", "export", "restaurant_app", "final_project.config"]
+
+
+def time_import(cwd: Path, module: str) -> float:
+    """Wall time (detik) untuk `import module` di interpreter baru."""
+    code = (
+        "import sys, time; t = time.perf_counter(); "
+        f"import {module}; "
+        "sys.stdout.write(repr(time.perf_counter() - t))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def time_interpreter() -> float:
+    """Wall time proses Python kosong, sebagai pembanding overhead interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def import_breakdown(cwd: Path, module: str, top: int) -> List[Dict[str, Any]]:
+    """Modul dengan waktu import kumulatif terbesar menurut `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # format: "import time:  <self us> | <cumulative us> | <nama modul>"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    rows.sort(key=lambda r: r["cumulative_us"], reverse=True)
+    return rows[:top]
+
+
+def run_target(name: str, repeat: int, importtime: bool, top: int) -> Dict[str, Any]:
+    cwd, module = TARGETS[name]
+    result: Dict[str, Any] = {"suite": "startup", "name": name}
+    try:
+        times = [time_import(cwd, module) for _ in range(repeat)]
+    except subprocess.CalledProcessError as e:
+        result["error"] = (e.stderr or str(e)).strip().splitlines()[-1]
+        print(f"  {name:<25} ERROR {result['error']}")
+        return result
+    result.update(
+        repeat=repeat,
+        min_s=min(times),
+        median_s=statistics.median(times),
+        max_s=max(times),
+    )
+    print(f"  {name:<25} median {result['median_s'] * 1000:8.1f} ms   min {result['min_s'] * 1000:8.1f} ms")
+    if importtime:
+        result["importtime"] = import_breakdown(cwd, module, top)
+        for row in result["importtime"]:
+            print(f"      {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS),
+                        help="modul yang diukur (boleh diulang; default: modul tanpa efek samping)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="sertakan rincian -X importtime")
+    parser.add_argument("--top", type=int, default=10, help="jumlah modul di rincian importtime")
+    parser.add_argument("--output", type=Path, help="file JSON hasil")
+    parser.add_argument("--compare", type=Path, help="file JSON hasil run sebelumnya")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    interpreter_s = statistics.median(time_interpreter() for _ in range(args.repeat))
+    print(f"Interpreter kosong: {interpreter_s * 1000:.1f} ms")
+    results = [run_target(name, args.repeat, args.importtime, args.top)
+               for name in args.target or DEFAULT_TARGETS]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "interpreter_s": interpreter_s,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"\nHasil disimpan di {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from query_cache import QueryCache
+
+# Gambar chart menu Warung Nasi Padang ke sebuah matplotlib Axes, plus lapisan render ber-cache.
+# - draw_chart dipakai oleh dashboard (restaurant_app.py) dan laporan PDF (report.py)
+# - render_chart menyimpan hasil render (PNG/SVG bytes) per jenis chart + hash isi data,
+#   jadi filter yang kembali ke subset yang sama tidak menyentuh matplotlib sama sekali
+# - figure dibuat tanpa pyplot (tidak masuk registry figure global) dan dikosongkan
+#   setelah disimpan, sehingga memori proses server tidak bertambah tiap rerun
+# - matplotlib baru di-import saat render pertama
+
+CHART_KINDS = ["Bar - Revenue", "Pie - Share", "Line - Top 3 Trend", "Area - Orders"]
+CHART_CACHE_TTL = float(os.environ.get("CHART_CACHE_TTL", "3600"))
+
+chart_cache = QueryCache(max_bytes=int(os.environ.get("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+
+
+def frame_digest(df):
+    # Hash isi DataFrame (nilai, index, nama kolom, dan dtype) untuk kunci cache
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def simulate_trend(df, top_k=3, days=14, seed=None, end=None):
+    # Simulasi penjualan harian untuk `top_k` menu dengan revenue terbesar selama `days` hari.
+    # Mengembalikan DataFrame (index = tanggal, kolom = item), dibangkitkan sekaligus sebagai
+    # matriks item x hari dari satu Generator ber-seed. seed=None: seed diturunkan dari isi data,
+    # jadi input yang sama selalu memberi hasil yang sama (aman untuk cache chart).
+    if top_k < 1:
+        raise ValueError(f"top_k harus minimal 1, bukan {top_k}")
+    top = df.nlargest(top_k, "revenue")
+    if seed is None:
+        seed = int(frame_digest(top[["item", "sold_month"]])[:16], 16)
+    rng = np.random.default_rng([seed, top_k, days])
+    # Titik awal = rata-rata harian dari penjualan bulanan, lalu random walk langkah -2..4
+    base = (top["sold_month"].to_numpy() / 14).astype(np.int64)[:, None]
+    sales = np.clip(base + rng.integers(-2, 5, size=(len(top), days)).cumsum(axis=1), 0, None)
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    return pd.DataFrame(sales.T, index=pd.date_range(end=end, periods=days), columns=top["item"].tolist())
+
+
+def draw_chart(kind, df, ax, end=None):
+    # Gambar chart `kind` dari `df` ke `ax`; kembalikan (title, explanation).
+    # kind: salah satu CHART_KINDS (selain itu digambar sebagai area chart)
+    # end: tanggal terakhir simulasi tren (None = hari ini); pemanggil yang meng-cache
+    #      hasil gambar harus mengisinya supaya tanggal ikut jadi kunci cache
+    if kind == "Bar - Revenue":
+        ax.bar(df["item"], df["revenue"], color="#2b8cbe")
+        ax.set_ylabel("Revenue (IDR)")
+        ax.set_xticks(range(len(df)))
+        ax.set_xticklabels(df["item"], rotation=45, ha="right")
+        return "Revenue per Menu", "Bar chart menunjukkan kontribusi pendapatan tiap menu."
+    if kind == "Pie - Share":
+        ax.pie(df["revenue"], labels=df["item"], autopct="%1.1f%%")
+        return "Komposisi Revenue", "Pie chart menunjukkan persentase kontribusi pendapatan tiap menu."
+    if kind == "Line - Top 3 Trend":
+        sim = simulate_trend(df, top_k=3, days=14, end=end)
+        if sim.columns.empty:
+            # Tidak ada menu (df kosong): jangan gambar garis/legend kosong
+            ax.text(0.5, 0.5, "Tidak ada data menu", ha="center", va="center", transform=ax.transAxes)
+            ax.set_axis_off()
+        else:
+            ax.plot(sim.index, sim.to_numpy(), marker="o")
+            ax.set_ylabel("Simulated Daily Sales")
+            ax.legend(sim.columns)
+        return "Simulasi Tren Harian - Top 3", "Line chart simulasi untuk tiga menu teratas berdasarkan revenue."
+    ax.fill_between(df["item"], df["sold_month"], color="#fb9a99", alpha=0.6)
+    ax.plot(df["item"], df["sold_month"], marker="o", color="#fb9a99")
+    ax.set_ylabel("Jumlah Terjual (bulan)")
+    ax.set_xticks(range(len(df)))
+    ax.set_xticklabels(df["item"], rotation=45, ha="right")
+    return "Volume Orders per Menu", "Area chart menunjukkan volume pesanan per menu (bulanan)."
+
+
+def render_chart(kind, df, draw=draw_chart, fmt="png", figsize=(8, 4.5), dpi=200, **options):
+    # Render chart ke bytes; kembalikan (data, hasil `draw`) — untuk draw_chart: (title, explanation).
+    # draw(kind, df, ax, **options) menggambar ke Axes; kalau hasilnya tuple, elemen pertama jadi judul figure.
+    # Hasil di-cache per (kind, fungsi draw, isi df, fmt, ukuran, dpi, options) — misal end=tanggal tren.
+    key = (kind, f"{draw.__module__}.{draw.__qualname__}", frame_digest(df), fmt, tuple(figsize), dpi,
+           tuple(sorted(options.items())))
+    found, value = chart_cache.get(key)
+    if found:
+        return value
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    try:
+        info = draw(kind, df, fig.add_subplot(), **options)
+        if isinstance(info, tuple) and info:
+            fig.suptitle(info[0])
+        fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    finally:
+        # Lepas artist/canvas sekarang, tidak menunggu garbage collector
+        fig.clear()
+    value = (buf.getvalue(), info)
+    chart_cache.set(key, value, CHART_CACHE_TTL)
+    return value
+
+
+def chart_cache_stats():
+    # Hit/miss per jenis chart dan hit rate total (0..1, None kalau belum ada render)
+    stats = chart_cache.stats()
+    hits = sum(s["hits"] for s in stats["queries"].values())
+    misses = sum(s["misses"] for s in stats["queries"].values())
+    stats["hit_rate"] = hits / (hits + misses) if hits + misses else None
+    return stats
@@ -1,34 +1,386 @@
+import datetime
+import io
+import os
+
 import psycopg2
 
-# Koneksi ke database PostgreSQL
-conn = psycopg2.connect(
-    host="localhost",
-    port="5432",          # port default PostgreSQL
-    user="postgres",      # ganti sesuai user PostgreSQL kamu
-    password="0",  # ganti sesuai password PostgreSQL kamu
-    dbname="sales_db"     # nama database
+from pgpool import Database, caller_name
+from query_cache import QueryCache
+
+# Koneksi ke database PostgreSQL (bisa dioverride lewat environment variable)
+DB_CONFIG = {
+    "host": os.environ.get("PGHOST", "localhost"),
+    "port": os.environ.get("PGPORT", "5432"),          # port default PostgreSQL
+    "user": os.environ.get("PGUSER", "postgres"),      # ganti sesuai user PostgreSQL kamu
+    "password": os.environ.get("PGPASSWORD", "0"),     # ganti sesuai password PostgreSQL kamu
+    "dbname": os.environ.get("PGDATABASE", "sales_db"),  # nama database
+}
+
+# Ukuran pool koneksi: tiap query meminjam satu koneksi lalu mengembalikannya,
+# sehingga beberapa sesi Streamlit bisa query bersamaan.
+POOL_MINCONN = int(os.environ.get("PG_POOL_MIN", "1"))
+POOL_MAXCONN = int(os.environ.get("PG_POOL_MAX", "10"))
+# Koneksi yang menganggur lebih lama dari ini dicek dulu dengan `SELECT 1`.
+POOL_HEALTHCHECK_SECONDS = float(os.environ.get("PG_POOL_HEALTHCHECK", "30"))
+# Jumlah baris per batch untuk query streaming (server-side cursor).
+STREAM_BATCH_SIZE = int(os.environ.get("PG_STREAM_BATCH", "5000"))
+# Jumlah baris per halaman untuk tabel yang dipaginasi.
+PAGE_SIZE = int(os.environ.get("PG_PAGE_SIZE", "50"))
+
+# Cache hasil query (dipakai bersama semua sesi): batas memori dan TTL per jenis query
+QUERY_CACHE_MAX_MB = int(os.environ.get("QUERY_CACHE_MAX_MB", "64"))
+CACHE_TTL_ROWS = int(os.environ.get("QUERY_CACHE_TTL_ROWS", "60"))             # tabel / halaman
+CACHE_TTL_AGGREGATE = int(os.environ.get("QUERY_CACHE_TTL_AGGREGATE", "300"))  # metrik & chart
+
+# Instrumentasi query: query yang lebih lambat dari ini dianggap "lambat", dan kalau
+# PG_EXPLAIN_SLOW=1 rencana `EXPLAIN (ANALYZE, BUFFERS)`-nya disimpan (query dijalankan ulang).
+SLOW_QUERY_MS = float(os.environ.get("PG_SLOW_QUERY_MS", "500"))
+EXPLAIN_SLOW_QUERIES = os.environ.get("PG_EXPLAIN_SLOW", "0") == "1"
+
+# Konversi tipe saat fetch:
+# - NUMERIC -> "float" (float64, default), "cents" (int64 dalam sen), atau "decimal" (Decimal bawaan psycopg2)
+# - DATE -> datetime, supaya kolom DataFrame langsung bertipe datetime64 tanpa pd.to_datetime
+NUMERIC_AS = os.environ.get("PG_NUMERIC_AS", "float")
+MONEY_SCALE = 100 if NUMERIC_AS == "cents" else 1
+
+
+# ============================
+# Adaptasi tipe data
+# ============================
+
+def _cast_numeric_float(value, cur):
+    return None if value is None else float(value)
+
+def _cast_numeric_cents(value, cur):
+    return None if value is None else round(float(value) * 100)
+
+def _cast_date_datetime(value, cur):
+    date = psycopg2.extensions.DATE(value, cur)
+    if date is None:
+        return None
+    return datetime.datetime.combine(date, datetime.time())
+
+_NUMERIC_CASTERS = {"float": _cast_numeric_float, "cents": _cast_numeric_cents}
+
+
+def _register_types(conn):
+    # Daftarkan typecaster per koneksi (tidak mengubah psycopg2 secara global)
+    numeric_cast = _NUMERIC_CASTERS.get(NUMERIC_AS)
+    if numeric_cast is not None:
+        numeric_type = psycopg2.extensions.new_type(
+            psycopg2.extensions.DECIMAL.values, "NUMERIC_AS_" + NUMERIC_AS.upper(), numeric_cast
+        )
+        psycopg2.extensions.register_type(numeric_type, conn)
+    date_type = psycopg2.extensions.new_type(
+        psycopg2.extensions.DATE.values, "DATE_AS_DATETIME", _cast_date_datetime
+    )
+    psycopg2.extensions.register_type(date_type, conn)
+
+
+# OID tipe Postgres -> tipe kolom Parquet, sesuai hasil typecaster di atas; tipe lain
+# (varchar, text, ...) ditulis sebagai teks
+_ARROW_TYPES = {16: "bool", 20: "int64", 21: "int64", 23: "int64", 700: "float64", 701: "float64",
+                1082: "timestamp", 1114: "timestamp"}
+
+
+def _arrow_schema(description):
+    # Skema Parquet dari cursor.description, supaya tipe kolom tidak bergantung pada
+    # isi chunk pertama (kolom yang NULL semua) dan hasil kosong tetap punya kolom
+    import pyarrow as pa
+
+    def arrow_type(column):
+        kind = _ARROW_TYPES.get(column.type_code)
+        if column.type_code == 1700:  # NUMERIC
+            if NUMERIC_AS == "float":
+                return pa.float64()
+            if NUMERIC_AS == "cents":
+                return pa.int64()
+            return pa.decimal128(column.precision or 38, column.scale or 10)
+        if kind == "timestamp":
+            return pa.timestamp("us")
+        return getattr(pa, kind)() if kind else pa.string()
+
+    return pa.schema([(column.name, arrow_type(column)) for column in description])
+
+
+def to_money(value):
+    # Nilai uang hasil query -> satuan rupiah/float (membagi 100 kalau mode "cents").
+    # Bisa dipakai untuk angka tunggal maupun pandas Series.
+    if hasattr(value, "astype"):
+        return value.astype("float64") / MONEY_SCALE
+    return float(value) / MONEY_SCALE
+
+
+# Pool baru dibuat saat query pertama (bukan saat import), supaya import
+# config.py murah dan worker yang baru start tidak langsung membuka koneksi.
+# Pool, retry, dan statistik query ada di pgpool.py (dipakai juga oleh final_project).
+_db = Database(
+    DB_CONFIG, POOL_MINCONN, POOL_MAXCONN, healthcheck_seconds=POOL_HEALTHCHECK_SECONDS,
+    on_connect=_register_types, slow_query_ms=SLOW_QUERY_MS, explain_slow=EXPLAIN_SLOW_QUERIES,
 )
 
-print("Koneksi PostgreSQL berhasil!")
 
-# Membuat cursor
-c = conn.cursor()
+# ============================
+# Pool koneksi
+# ============================
+
+def get_connection():
+    # Pinjam satu koneksi dari pool (context manager). Commit kalau sukses,
+    # rollback kalau gagal supaya transaksi yang gagal tidak ikut terbawa.
+    return _db.connection()
+
+
+def close_pool():
+    # Tutup semua koneksi di pool (misal saat proses dihentikan)
+    _db.close()
+
+
+# ============================
+# Instrumentasi query
+# ============================
+
+def add_query_hook(hook):
+    # Daftarkan fungsi hook(name, query, params, elapsed_ms, rows) yang dipanggil
+    # setelah setiap query selesai (misal untuk logging atau index advisor)
+    _db.stats.add_hook(hook)
+
+
+def remove_query_hook(hook):
+    _db.stats.remove_hook(hook)
+
+
+# Helper publik yang menjalankan query atas nama fungsi lain; tidak dipakai sebagai nama statistik
+_QUERY_HELPERS = frozenset({'iter_query_frames', 'copy_query_csv', 'fetch_dataframe', 'export_query'})
+
+
+def _caller_name():
+    # Nama fungsi query publik di modul ini yang memicu query (misal "view_customers")
+    return caller_name(globals(), depth=2, skip=_QUERY_HELPERS)
+
+
+def query_stats():
+    # Ringkasan statistik per query, diurutkan dari total waktu terbesar
+    return _db.stats.summary()
+
+
+def export_query_stats():
+    # Statistik query dalam bentuk JSON (untuk diunduh / dibandingkan)
+    return _db.stats.export_json()
+
+
+def reset_query_stats():
+    _db.stats.reset()
+
+
+def _run_query(query, params=None):
+    # Jalankan query lalu kembalikan semua baris. Kalau koneksi putus di
+    # tengah jalan, coba sekali lagi dengan koneksi baru dari pool.
+    return _db.fetchall(_caller_name(), query, params)[1]
+
+
+# Helper di bawah menerima `name` untuk statistik query; default-nya fungsi publik
+# pemanggil di modul ini (misal "export_orders"), bukan nama helper-nya sendiri.
+
+
+def _iter_query_with_columns(query, params=None, batch_size=STREAM_BATCH_SIZE, name=None):
+    # Versi streaming dari _run_query: pakai named (server-side) cursor dan
+    # fetchmany, sehingga memori yang dipakai hanya sebesar satu batch.
+    # Koneksi dipinjam selama generator masih dibaca. Menghasilkan (kolom, baris).
+    return _db.stream(name or _caller_name(), query, params, batch_size)
+
+
+def _iter_query(query, params=None, batch_size=STREAM_BATCH_SIZE, name=None):
+    return (rows for _, rows in _iter_query_with_columns(query, params, batch_size, name))
+
+
+def iter_query_frames(query, params=None, batch_size=STREAM_BATCH_SIZE, name=None):
+    # Hasil query sebagai rangkaian DataFrame kecil (satu per batch)
+    import pandas as pd
+
+    return (
+        pd.DataFrame(rows, columns=columns)
+        for columns, rows in _iter_query_with_columns(query, params, batch_size, name)
+    )
+
+
+def copy_query_csv(query, params=None, out=None, name=None):
+    # Jalankan `COPY (query) TO STDOUT` dalam format CSV (dengan header).
+    # Postgres langsung mengirim teks CSV, tanpa membuat tuple Python per baris.
+    # Hasil ditulis ke `out` (file-like binary) atau dikembalikan sebagai bytes.
+    return _db.copy_csv(name or _caller_name(), query, params, out)
+
+
+def fetch_dataframe(query, params=None, parse_dates=None, as_arrow=False, name=None):
+    # Ambil hasil query lewat COPY langsung ke bentuk kolom (pandas DataFrame,
+    # atau pyarrow.Table kalau as_arrow=True). NUMERIC menjadi float64.
+    # pandas/pyarrow di-import saat dipanggil (bukan saat import config.py) supaya cold start cepat
+    return _db.fetch_frame(name or _caller_name(), query, params, parse_dates=parse_dates, as_arrow=as_arrow)
+
+
+def _select_columns(query, columns):
+    # Batasi kolom hasil query ke `columns` (misal kolom yang dipilih di UI)
+    if not columns:
+        return query
+    quoted = ', '.join('"' + col.replace('"', '""') + '"' for col in columns)
+    return f'SELECT {quoted} FROM ({query}) AS export_q'
+
+
+def export_query(query, params=None, fmt='csv', columns=None, name=None):
+    # Bangun file ekspor (bytes) langsung dari database:
+    # - csv / csv.gz: COPY ... TO STDOUT ditulis ke buffer (gzip di-stream sambil jalan)
+    # - parquet: batch dari server-side cursor ditulis sebagai row group
+    from export import open_compressed, write_parquet
+
+    query = _select_columns(query, columns)
+    buf = io.BytesIO()
+    if fmt == 'parquet':
+        schema = _arrow_schema(_db.describe(query, params))
+        write_parquet(iter_query_frames(query, params, name=name), buf, schema=schema)
+    else:
+        target = open_compressed(buf, fmt)
+        try:
+            copy_query_csv(query, params, out=target, name=name)
+        finally:
+            if target is not buf:
+                target.close()
+    return buf.getvalue()
+
+
+_query_cache = QueryCache(max_bytes=QUERY_CACHE_MAX_MB * 1024 * 1024)
+cached_query = _query_cache.cached
+
+
+def query_cache_stats():
+    # Statistik cache: jumlah entry, byte terpakai, eviction, hit/miss per query
+    return _query_cache.stats()
+
+
+def invalidate_query_cache(name=None):
+    # Kosongkan cache (semua, atau hanya milik fungsi `name`) setelah data berubah
+    _query_cache.invalidate(name)
+
 
 # ============================
 # Fungsi ambil data dari tabel
 # ============================
 
+_CUSTOMERS_QUERY = '''
+    SELECT customer_id, name, email, phone, address, birthdate
+    FROM customers
+    ORDER BY name ASC
+'''
+
+@cached_query(ttl=CACHE_TTL_ROWS)
 def view_customers():
+    return _run_query(_CUSTOMERS_QUERY)
+
+def _age_range_predicate(age_range):
+    # Ubah rentang usia (min, max) menjadi rentang birthdate supaya filter
+    # bisa memakai idx_customers_birthdate (index range scan).
+    # usia >= min  <=>  birthdate <= hari ini - min tahun
+    # usia <= max  <=>  birthdate >  hari ini - (max + 1) tahun
+    if age_range is None:
+        return [], []
+    min_age, max_age = age_range
+    conditions = [
+        'birthdate <= (CURRENT_DATE - make_interval(years => %s))::date',
+        'birthdate > (CURRENT_DATE - make_interval(years => %s))::date',
+    ]
+    return conditions, [int(min_age), int(max_age) + 1]
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def customer_age_bounds():
+    # (usia termuda, usia tertua); MIN/MAX birthdate cukup membaca kedua
+    # ujung idx_customers_birthdate, bukan seluruh tabel.
     query = '''
-        SELECT customer_id, name, email, phone, address, birthdate
+        SELECT
+            DATE_PART('year', AGE(MAX(birthdate)))::int AS min_age,
+            DATE_PART('year', AGE(MIN(birthdate)))::int AS max_age
+        FROM customers
+    '''
+    return _run_query(query)[0]
+
+@cached_query(ttl=CACHE_TTL_ROWS)
+def view_customers_page(after=None, limit=PAGE_SIZE, age_range=None):
+    # Keyset pagination lewat idx_customers_name.
+    # `after` = (name, customer_id) baris terakhir halaman sebelumnya,
+    # `age_range` = (usia min, usia max) dari slider.
+    conditions, params = _age_range_predicate(age_range)
+    if after is not None:
+        conditions.append('(name, customer_id) > (%s, %s)')
+        params.extend(after)
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    query = f'''
+        SELECT
+            customer_id, name, email, phone, address, birthdate,
+            DATE_PART('year', AGE(birthdate))::int AS age
         FROM customers
-        ORDER BY name ASC
+        {where}
+        ORDER BY name ASC, customer_id ASC
+        LIMIT %s
     '''
-    c.execute(query)
-    return c.fetchall()
+    return _run_query(query, (*params, limit))
 
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def count_customers(age_range=None):
+    conditions, params = _age_range_predicate(age_range)
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return _run_query(f'SELECT COUNT(*) FROM customers {where}', params)[0][0]
+
+def export_customers(fmt='csv', age_range=None, columns=None):
+    # Semua pelanggan yang lolos filter usia (bukan hanya satu halaman)
+    conditions, params = _age_range_predicate(age_range)
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    query = f'''
+        SELECT
+            customer_id, name, email, phone, address, birthdate,
+            DATE_PART('year', AGE(birthdate))::int AS age
+        FROM customers
+        {where}
+        ORDER BY name ASC, customer_id ASC
+    '''
+    return export_query(query, params, fmt=fmt, columns=columns)
+
+_ORDERS_QUERY = '''
+    SELECT 
+        o.order_id, 
+        o.order_date, 
+        o.total_amount, 
+        c.name AS customer_name, 
+        c.phone 
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    ORDER BY o.order_date DESC
+'''
+
+@cached_query(ttl=CACHE_TTL_ROWS)
 def view_orders_with_customers():
-    query = '''
+    return _run_query(_ORDERS_QUERY)
+
+def export_orders(fmt='csv'):
+    return export_query(_ORDERS_QUERY, fmt=fmt)
+
+# order_date boleh NULL: key keyset memakai COALESCE(order_date, '-infinity') supaya
+# urutannya total (order tanpa tanggal paling akhir) dan perbandingan baris tidak
+# pernah bernilai NULL. Ekspresi ini harus sama persis dengan idx_orders_keyset
+# (migrations/0002_orders_keyset_index.sql).
+_ORDER_DATE_KEY = "COALESCE(o.order_date, '-infinity'::timestamp)"
+
+def _keyset_after(id_column, after):
+    # Predikat "sesudah baris `after`" untuk urutan (_ORDER_DATE_KEY DESC, id DESC).
+    # `after` = (order_date, id) baris terakhir halaman sebelumnya; order_date None = NULL.
+    if after is None:
+        return '', []
+    order_date, row_id = after
+    where = f"WHERE ({_ORDER_DATE_KEY}, {id_column}) < (COALESCE(%s::timestamp, '-infinity'::timestamp), %s)"
+    return where, [order_date, row_id]
+
+@cached_query(ttl=CACHE_TTL_ROWS)
+def view_orders_page(after=None, limit=PAGE_SIZE):
+    # Keyset pagination lewat idx_orders_keyset (urutan terbaru dulu, tanpa tanggal di akhir).
+    # `after` = (order_date, order_id) baris terakhir halaman sebelumnya.
+    where, params = _keyset_after('o.order_id', after)
+    query = f'''
         SELECT 
             o.order_id, 
             o.order_date, 
@@ -37,22 +389,149 @@ def view_orders_with_customers():
             c.phone 
         FROM orders o
         JOIN customers c ON o.customer_id = c.customer_id
-        ORDER BY o.order_date DESC
+        {where}
+        ORDER BY {_ORDER_DATE_KEY} DESC, o.order_id DESC
+        LIMIT %s
+    '''
+    return _run_query(query, (*params, limit))
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def orders_summary():
+    # (jumlah order, total revenue, rata-rata order)
+    query = '''
+        SELECT COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(AVG(total_amount), 0)
+        FROM orders
     '''
-    c.execute(query)
-    return c.fetchall()
+    return _run_query(query)[0]
+
+_REVENUE_ROLLUP_TABLES = {'month': 'revenue_monthly', 'day': 'revenue_daily'}
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def view_revenue_rollup(granularity='month'):
+    # Pendapatan per bulan/hari dari tabel rollup (dijaga trigger di database.sql),
+    # jadi chart cukup membaca beberapa ratus baris yang sudah dijumlahkan.
+    table = _REVENUE_ROLLUP_TABLES[granularity]
+    query = f'''
+        SELECT period, order_count, revenue
+        FROM {table}
+        WHERE order_count > 0
+        ORDER BY period
+    '''
+    return _run_query(query)
+
+def refresh_revenue_rollup():
+    # Bangun ulang tabel rollup dari tabel orders (untuk perbaikan data)
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute('SELECT refresh_revenue_rollup()')
+    invalidate_query_cache('view_revenue_rollup')
 
+_PRODUCTS_QUERY = '''
+    SELECT product_id, name, description, price, stock
+    FROM products
+    ORDER BY name ASC
+'''
+
+@cached_query(ttl=CACHE_TTL_ROWS)
 def view_products():
+    return _run_query(_PRODUCTS_QUERY)
+
+def export_products(fmt='csv'):
+    return export_query(_PRODUCTS_QUERY, fmt=fmt)
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def products_summary():
+    # (jumlah produk, total stok, rata-rata harga)
     query = '''
-        SELECT product_id, name, description, price, stock
+        SELECT COUNT(*), COALESCE(SUM(stock), 0), COALESCE(AVG(price), 0)
         FROM products
-        ORDER BY name ASC
     '''
-    c.execute(query)
-    return c.fetchall()
+    return _run_query(query)[0]
 
-def view_order_details_with_info():
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def top_products_by_stock(limit=10):
     query = '''
+        SELECT name, stock
+        FROM products
+        ORDER BY stock DESC, name ASC
+        LIMIT %s
+    '''
+    return _run_query(query, (limit,))
+
+# ============================
+# Agregasi order details (dihitung di database)
+# ============================
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def order_details_summary():
+    # (jumlah baris detail, total quantity, total revenue)
+    query = '''
+        SELECT COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM(subtotal), 0)
+        FROM order_details
+    '''
+    return _run_query(query)[0]
+
+def _top_products(order_by, limit):
+    # Agregasi per product_id dulu (idx_order_details_product_id),
+    # baru join ke products untuk N baris teratas saja.
+    query = f'''
+        WITH per_product AS (
+            SELECT
+                product_id,
+                SUM(quantity) AS total_quantity,
+                SUM(subtotal) AS total_revenue
+            FROM order_details
+            GROUP BY product_id
+            ORDER BY {order_by} DESC, product_id ASC
+            LIMIT %s
+        )
+        SELECT p.name AS product_name, pp.total_quantity, pp.total_revenue
+        FROM per_product pp
+        JOIN products p ON pp.product_id = p.product_id
+        ORDER BY pp.{order_by} DESC, p.name ASC
+    '''
+    return _run_query(query, (limit,))
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def top_products_by_quantity(limit=10):
+    # (product_name, total_quantity, total_revenue) urut quantity terbanyak
+    return _top_products('total_quantity', limit)
+
+@cached_query(ttl=CACHE_TTL_AGGREGATE)
+def top_products_by_revenue(limit=10):
+    # (product_name, total_quantity, total_revenue) urut revenue terbesar
+    return _top_products('total_revenue', limit)
+
+_ORDER_DETAILS_QUERY = '''
+    SELECT 
+        od.order_detail_id,
+        o.order_id,
+        o.order_date,
+        c.customer_id,
+        c.name AS customer_name,
+        p.product_id,
+        p.name AS product_name,
+        p.price AS unit_price,
+        od.quantity,
+        od.subtotal,
+        o.total_amount AS order_total,
+        c.phone
+    FROM order_details od
+    JOIN orders o ON od.order_id = o.order_id
+    JOIN customers c ON o.customer_id = c.customer_id
+    JOIN products p ON od.product_id = p.product_id
+    ORDER BY o.order_date DESC
+'''
+
+@cached_query(ttl=CACHE_TTL_ROWS)
+def view_order_details_with_info():
+    return _run_query(_ORDER_DETAILS_QUERY)
+
+@cached_query(ttl=CACHE_TTL_ROWS)
+def view_order_details_page(after=None, limit=PAGE_SIZE):
+    # Keyset pagination untuk order details (urutan order terbaru dulu, tanpa tanggal di akhir).
+    # `after` = (order_date, order_detail_id) baris terakhir halaman sebelumnya.
+    where, params = _keyset_after('od.order_detail_id', after)
+    query = f'''
         SELECT 
             od.order_detail_id,
             o.order_id,
@@ -70,12 +549,22 @@ def view_order_details_with_info():
         JOIN orders o ON od.order_id = o.order_id
         JOIN customers c ON o.customer_id = c.customer_id
         JOIN products p ON od.product_id = p.product_id
-        ORDER BY o.order_date DESC
+        {where}
+        ORDER BY {_ORDER_DATE_KEY} DESC, od.order_detail_id DESC
+        LIMIT %s
     '''
-    c.execute(query)
-    return c.fetchall()
+    return _run_query(query, (*params, limit))
+
+@cached_query(ttl=CACHE_TTL_ROWS)
+def view_order_details_with_info_df():
+    # Versi DataFrame (lewat COPY) dari view_order_details_with_info
+    return fetch_dataframe(_ORDER_DETAILS_QUERY, parse_dates=['order_date'])
 
+def export_order_details(fmt='csv'):
+    # File lengkap order details langsung dari database (CSV tanpa lewat pandas)
+    return export_query(_ORDER_DETAILS_QUERY, fmt=fmt)
 
-    # Tutup koneksi
-    c.close()
-    conn.close()
\ No newline at end of file
+def iter_order_details_with_info(batch_size=STREAM_BATCH_SIZE):
+    # Sama seperti view_order_details_with_info, tapi hasilnya dikirim per
+    # batch (list of tuple) supaya tabel besar tidak dimuat sekaligus.
+    return _iter_query(_ORDER_DETAILS_QUERY, batch_size=batch_size)
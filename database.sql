@@ -52,6 +52,10 @@ CREATE INDEX idx_orders_order_date ON orders (order_date);
 CREATE INDEX idx_orders_customer_id ON orders (customer_id);
 -- Untuk agregasi berdasarkan total_amount
 CREATE INDEX idx_orders_total_amount ON orders (total_amount);
+-- Untuk keyset pagination orders (view_orders_page): key-nya
+-- COALESCE(order_date, '-infinity'), order_id supaya order tanpa tanggal ikut terurut
+-- (sama dengan migrations/0002_orders_keyset_index.sql untuk database lama)
+CREATE INDEX idx_orders_keyset ON orders ((COALESCE(order_date, '-infinity'::timestamp)), order_id);
 
 -- Tabel order_details
 CREATE TABLE IF NOT EXISTS order_details (
@@ -80,3 +84,82 @@ CREATE INDEX idx_order_details_product_id ON order_details (product_id);
 CREATE INDEX idx_order_details_quantity ON order_details (quantity);
 -- Untuk analisis harga per produk di detail pesanan
 CREATE INDEX idx_order_details_price ON order_details (price);
+
+
+-- ============================
+-- Rollup pendapatan harian & bulanan
+-- ============================
+-- Chart "Pendapatan per Bulan" membaca tabel kecil ini, bukan men-scan seluruh orders.
+-- Isinya dijaga oleh trigger di tabel orders (incremental), dan bisa dibangun ulang
+-- dengan SELECT refresh_revenue_rollup();
+CREATE TABLE IF NOT EXISTS revenue_daily (
+    period DATE PRIMARY KEY, -- tanggal order
+    order_count INT NOT NULL DEFAULT 0,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS revenue_monthly (
+    period DATE PRIMARY KEY, -- tanggal 1 tiap bulan
+    order_count INT NOT NULL DEFAULT 0,
+    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0
+);
+
+-- Tambahkan (atau kurangi, kalau p_count negatif) satu order ke rollup harian & bulanan
+CREATE OR REPLACE FUNCTION revenue_rollup_apply(p_date TIMESTAMP, p_count INT, p_amount NUMERIC)
+RETURNS void AS $$
+BEGIN
+    IF p_date IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO revenue_daily AS r (period, order_count, revenue)
+    VALUES (p_date::date, p_count, p_amount)
+    ON CONFLICT (period) DO UPDATE
+        SET order_count = r.order_count + EXCLUDED.order_count,
+            revenue = r.revenue + EXCLUDED.revenue;
+
+    INSERT INTO revenue_monthly AS r (period, order_count, revenue)
+    VALUES (date_trunc('month', p_date)::date, p_count, p_amount)
+    ON CONFLICT (period) DO UPDATE
+        SET order_count = r.order_count + EXCLUDED.order_count,
+            revenue = r.revenue + EXCLUDED.revenue;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION orders_revenue_rollup_trg()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM revenue_rollup_apply(OLD.order_date, -1, -OLD.total_amount);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM revenue_rollup_apply(NEW.order_date, 1, NEW.total_amount);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_orders_revenue_rollup
+    AFTER INSERT OR UPDATE OF order_date, total_amount OR DELETE ON orders
+    FOR EACH ROW EXECUTE FUNCTION orders_revenue_rollup_trg();
+
+-- Bangun ulang rollup dari nol (misal setelah import massal, TRUNCATE, atau untuk perbaikan)
+CREATE OR REPLACE FUNCTION refresh_revenue_rollup()
+RETURNS void AS $$
+BEGIN
+    TRUNCATE revenue_daily, revenue_monthly;
+
+    INSERT INTO revenue_daily (period, order_count, revenue)
+    SELECT order_date::date, COUNT(*), SUM(total_amount)
+    FROM orders
+    WHERE order_date IS NOT NULL
+    GROUP BY 1;
+
+    INSERT INTO revenue_monthly (period, order_count, revenue)
+    SELECT date_trunc('month', period)::date, SUM(order_count), SUM(revenue)
+    FROM revenue_daily
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_revenue_rollup();
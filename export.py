@@ -0,0 +1,114 @@
+import gzip
+import importlib.util
+import io
+
+import streamlit as st
+
+# Ekspor data untuk tombol download:
+# - file hanya dibuat kalau pengguna menekan tombol (bukan di setiap rerun)
+# - data ditulis per chunk (DataFrame kecil) ke buffer output, bukan satu string CSV besar
+# - format: CSV, CSV terkompresi gzip, dan Parquet
+
+# format -> (label, ekstensi file, mime type)
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    # pyarrow opsional (tanpa pyarrow hanya CSV); cukup dicek ada atau tidak, baru
+    # di-import saat file Parquet benar-benar dibuat supaya import modul ini murah
+    has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or has_pyarrow]
+
+
+def open_compressed(out, fmt):
+    # Bungkus `out` dengan GzipFile untuk format csv.gz; selain itu kembalikan apa adanya
+    if fmt == "csv.gz":
+        return gzip.GzipFile(fileobj=out, mode="wb")
+    return out
+
+
+def write_csv(frames, out, compress=False):
+    # Tulis iterable DataFrame ke `out` sebagai satu file CSV (header hanya sekali)
+    target = open_compressed(out, "csv.gz" if compress else "csv")
+    try:
+        for n, frame in enumerate(frames):
+            target.write(frame.to_csv(index=False, header=(n == 0)).encode("utf-8"))
+    finally:
+        if target is not out:
+            target.close()
+
+
+def write_parquet(frames, out, schema=None):
+    # Tulis iterable DataFrame ke `out` sebagai Parquet, satu row group per chunk.
+    # `schema` (misal dari tipe kolom query) langsung dipakai, juga kalau tidak ada
+    # chunk sama sekali. Tanpa `schema`, kolom yang NULL semua di chunk awal bertipe
+    # null di Arrow; chunk ditahan sampai semua kolom punya tipe, lalu skemanya
+    # digabung (null/int dipromosikan) dan chunk berikutnya di-cast ke skema itu.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Ekspor Parquet membutuhkan paket pyarrow") from exc
+
+    writer = pq.ParquetWriter(out, schema) if schema is not None else None
+    pending = []
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is not None:
+                writer.write_table(table.cast(writer.schema))
+                continue
+            pending.append(table)
+            merged = pa.unify_schemas([t.schema for t in pending], promote_options="permissive")
+            if not any(pa.types.is_null(field.type) for field in merged):
+                writer = pq.ParquetWriter(out, merged)
+                for chunk in pending:
+                    writer.write_table(chunk.cast(merged))
+                pending = []
+        if writer is None:
+            # Semua chunk masih punya kolom NULL penuh (atau hasilnya kosong)
+            merged = (pa.unify_schemas([t.schema for t in pending], promote_options="permissive")
+                      if pending else pa.schema([]))
+            writer = pq.ParquetWriter(out, merged)
+            for chunk in pending:
+                writer.write_table(chunk.cast(merged))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def build_export(frames, fmt):
+    # Bangun file ekspor (bytes) dari iterable DataFrame
+    out = io.BytesIO()
+    if fmt == "parquet":
+        write_parquet(frames, out)
+    else:
+        write_csv(frames, out, compress=(fmt == "csv.gz"))
+    return out.getvalue()
+
+
+def export_button(label, file_base, build, key):
+    # UI ekspor on-demand: pilih format, tekan tombol, baru file dibuat lewat
+    # `build(fmt) -> bytes` lalu tombol download muncul.
+    formats = available_formats()
+    col_fmt, col_btn = st.columns([1, 2])
+    with col_fmt:
+        fmt = st.selectbox(
+            "Format", formats, format_func=lambda f: EXPORT_FORMATS[f][0], key=f"{key}_format"
+        )
+    with col_btn:
+        if st.button(label, key=f"{key}_build"):
+            try:
+                with st.spinner("Menyiapkan file…"):
+                    data = build(fmt)
+            except Exception as e:
+                st.error(f"Gagal menyiapkan file: {e}")
+                return
+            _, ext, mime = EXPORT_FORMATS[fmt]
+            st.download_button(
+                "⬇️ Download", data=data, file_name=file_base + ext, mime=mime, key=f"{key}_download"
+            )
@@ -0,0 +1,285 @@
+"""Single-scan analytics engine for the recipe dashboard.
+
+Agregat di ``config.py`` masing-masing men-scan ulang join
+``recipe_ingredient_table`` x ``recipe_table`` x ``ingredient_table`` dengan
+``GROUP BY`` yang berbeda. Modul ini mengambil satu extract ringkas sekali saja:
+
+- fakta: pasangan integer (recipe_id, ingredient_id) dari ``recipe_ingredient_table``
+- dimensi resep: recipe_id, nama, dan course/cuisine/diet (disimpan sebagai kategori)
+- dimensi ingredient: ingredient_id dan nama
+
+Relasi fakta disimpan sebagai matriks CSR resep x ingredient (``recipe_matrix.py``),
+lalu semua agregat dihitung dengan operasi NumPy/pandas yang tervektorisasi.
+Fungsi publiknya punya nama, signature, dan bentuk hasil yang sama dengan
+fungsi di ``config.py`` sehingga bisa langsung dipakai sebagai pengganti.
+Snapshot dipakai bersama antar sesi dan dimuat ulang setelah
+``RECIPE_ANALYTICS_TTL`` detik (atau lewat ``invalidate()``).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import _fetch_df
+from recipe_matrix import RecipeIngredientMatrix
+
+ANALYTICS_TTL_SECONDS = float(os.environ.get("RECIPE_ANALYTICS_TTL", "300"))
+
+# NULL dikodekan sebagai -1 supaya kolom tetap integer di extract
+_FACT_QUERY = """
+        SELECT
+            COALESCE(ri.recipe_id, -1) AS recipe_id,
+            COALESCE(ri.ingredient_id, -1) AS ingredient_id
+        FROM recipe_ingredient_table ri
+"""
+
+_RECIPE_DIM_QUERY = """
+        SELECT
+            r.recipe_id,
+            r.recipe_name,
+            tc.type_course_name AS course,
+            tcu.type_cuisine_name AS cuisine,
+            td.type_diet_name AS diet,
+            COALESCE(tc.type_course_id, -1) AS course_id,
+            COALESCE(tcu.type_cuisine_id, -1) AS cuisine_id,
+            COALESCE(td.type_diet_id, -1) AS diet_id
+        FROM recipe_table r
+        LEFT JOIN type_course_table  tc  ON r.type_course_id  = tc.type_course_id
+        LEFT JOIN type_cuisine_table tcu ON r.type_cuisine_id = tcu.type_cuisine_id
+        LEFT JOIN type_diet_name    td  ON r.type_diet_id     = td.type_diet_id
+"""
+
+_INGREDIENT_DIM_QUERY = """
+        SELECT ingredient_id, ingredient_name
+        FROM ingredient_table
+"""
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return df.to_dict("records")
+
+
+def _sort(df: pd.DataFrame, by: List[str], ascending: List[bool]) -> pd.DataFrame:
+    return df.sort_values(by, ascending=ascending, kind="mergesort").reset_index(drop=True)
+
+
+class RecipeAnalytics:
+    """Semua agregat dashboard, dihitung dari satu extract fakta + dimensi."""
+
+    def __init__(self, facts: pd.DataFrame, recipes: pd.DataFrame, ingredients: pd.DataFrame):
+        self.loaded_at = time.monotonic()
+        recipes = recipes.reset_index(drop=True)
+        for column in ("course", "cuisine", "diet"):
+            # NULL ditentukan dari id hasil LEFT JOIN (-1), bukan dari nama: parser CSV
+            # pandas membaca nama "" sebagai NaN, sedangkan SQL tetap mengelompokkannya
+            # sebagai kategori "". Jadi nama kosong = "", join yang tidak cocok = NaN.
+            missing = recipes.pop(f"{column}_id").to_numpy() < 0
+            recipes[column] = recipes[column].fillna("").mask(missing).astype("category")
+        n_recipes = len(recipes)
+
+        recipe_id = facts["recipe_id"].to_numpy(dtype=np.int64)
+        ingredient_id = facts["ingredient_id"].to_numpy(dtype=np.int64)
+        # posisi baris dimensi untuk tiap fakta (-1 = NULL / tidak ada di dimensi)
+        recipe_pos = pd.Index(recipes["recipe_id"]).get_indexer(recipe_id)
+        ingredient_pos = pd.Index(ingredients["ingredient_id"]).get_indexer(ingredient_id)
+        n_ingredients = len(ingredients)
+
+        # Relasi resep x ingredient disimpan sebagai CSR (recipe_matrix.py), bukan dua
+        # array posisi sepanjang fakta; dipakai ulang oleh indeks pencarian (ingredient_search.py).
+        # Baris fakta dengan salah satu sisi NULL tidak masuk matriks dan dihitung terpisah di bawah.
+        self.matrix = RecipeIngredientMatrix.from_positions(recipe_pos, ingredient_pos, n_recipes, n_ingredients)
+        in_recipe = recipe_pos >= 0
+        in_ingredient = ingredient_pos >= 0
+
+        # Per resep: jumlah baris relasi (untuk semantik INNER JOIN) dan COUNT(ri.ingredient_id)
+        ingredient_count = self.matrix.row_degrees(weighted=True)
+        ri_rows = ingredient_count + np.bincount(recipe_pos[in_recipe & ~in_ingredient], minlength=n_recipes)
+        self.recipes = recipes
+        self.ingredients = ingredients.reset_index(drop=True)
+        self.per_recipe = recipes.assign(ingredient_count=ingredient_count)[ri_rows > 0]
+
+        # Per nama ingredient (GROUP BY i.ingredient_name): total pemakaian dan resep unik
+        name_codes, names = pd.factorize(ingredients["ingredient_name"], use_na_sentinel=False)
+        usage_by_column = self.matrix.col_degrees(weighted=True) + np.bincount(
+            ingredient_pos[in_ingredient & ~in_recipe], minlength=n_ingredients
+        )
+        total_usage = np.bincount(name_codes, weights=usage_by_column, minlength=len(names)).astype(np.int64)
+        # Resep unik per nama (ingredient_id berbeda bisa bernama sama)
+        stride = max(n_recipes, 1)
+        pairs = np.unique(name_codes[self.matrix.indices].astype(np.int64) * stride + self.matrix.row_positions())
+        recipe_count = np.bincount(pairs // stride, minlength=len(names))
+        usage = pd.DataFrame({
+            "ingredient_name": np.asarray(names, dtype=object),
+            "total_usage": total_usage,
+            "recipe_count": recipe_count,
+        })
+        self.ingredient_usage = usage[usage["total_usage"] > 0]
+
+    @classmethod
+    def load(cls) -> "RecipeAnalytics":
+        """Ambil extract dari database (lewat COPY) dan bangun engine-nya."""
+        return cls(
+            _fetch_df(_FACT_QUERY, name="analytics_facts"),
+            _fetch_df(_RECIPE_DIM_QUERY, name="analytics_recipes"),
+            _fetch_df(_INGREDIENT_DIM_QUERY, name="analytics_ingredients"),
+        )
+
+    def cuisine_matrix(self, cuisine: str) -> RecipeIngredientMatrix:
+        """Baris matriks CSR untuk resep satu cuisine (urutan baris = ``recipes[recipes.cuisine == cuisine]``)."""
+        return self.matrix.select_rows((self.recipes["cuisine"] == cuisine).to_numpy())
+
+    # -- agregat per resep --------------------------------------------------
+
+    def _count_by(self, column: str) -> pd.DataFrame:
+        counts = self.recipes.groupby(column, observed=True).size().reset_index(name="recipe_count")
+        return _sort(counts, ["recipe_count", column], [False, True])
+
+    def recipe_count_by_cuisine(self) -> List[Dict[str, Any]]:
+        return _records(self._count_by("cuisine"))
+
+    def recipe_category_count_by_cuisine(self) -> List[Dict[str, Any]]:
+        recipes = self.recipes.dropna(subset=["course"])
+        stats = recipes.groupby("cuisine", observed=True).agg(
+            category_count=("course", "nunique"), recipe_count=("course", "size")
+        ).reset_index()
+        return _records(_sort(stats, ["category_count", "cuisine"], [False, True]))
+
+    def recipe_count_by_diet(self) -> List[Dict[str, Any]]:
+        return _records(self._count_by("diet"))
+
+    def recipe_share_by_diet(self) -> List[Dict[str, Any]]:
+        counts = self._count_by("diet")
+        total = counts["recipe_count"].sum()
+        counts["percentage_share"] = (counts["recipe_count"] / total * 100).round(2) if total else None
+        return _records(counts)
+
+    def ingredient_count_per_recipe(self) -> List[Dict[str, Any]]:
+        df = self.per_recipe[["recipe_name", "ingredient_count"]]
+        return _records(_sort(df, ["ingredient_count", "recipe_name"], [False, True]))
+
+    def ingredient_count_stats_by_cuisine(self) -> List[Dict[str, Any]]:
+        stats = self.per_recipe.groupby("cuisine", observed=True)["ingredient_count"].agg(
+            avg_ingredient_per_recipe="mean",
+            min_ingredient_per_recipe="min",
+            max_ingredient_per_recipe="max",
+            recipe_count="size",
+        ).reset_index()
+        return _records(_sort(stats, ["avg_ingredient_per_recipe", "cuisine"], [False, True]))
+
+    def recipe_overview_with_ingredient_count_df(self, as_arrow: bool = False):
+        recipes = self.per_recipe.dropna(subset=["course", "cuisine", "diet"])
+        overview = recipes.groupby(
+            ["recipe_name", "course", "cuisine", "diet"], observed=True, dropna=False
+        )["ingredient_count"].sum().reset_index()
+        overview = overview.rename(columns={
+            "course": "type_course_name", "cuisine": "type_cuisine_name", "diet": "type_diet_name",
+        })
+        overview = _sort(overview, ["recipe_name"], [True])
+        if as_arrow:
+            import pyarrow as pa
+
+            return pa.Table.from_pandas(overview, preserve_index=False)
+        return overview
+
+    def recipe_overview_with_ingredient_count(self) -> List[Dict[str, Any]]:
+        return _records(self.recipe_overview_with_ingredient_count_df())
+
+    # -- agregat per ingredient ---------------------------------------------
+
+    def top_ingredients(self, limit: int = 10) -> List[Dict[str, Any]]:
+        top = _sort(self.ingredient_usage, ["total_usage", "ingredient_name"], [False, True]).head(limit)
+        return _records(top.rename(columns={"total_usage": "usage_count"})[["ingredient_name", "usage_count"]])
+
+    def ingredient_usage_distribution(self) -> List[Dict[str, Any]]:
+        return _records(_sort(self.ingredient_usage, ["total_usage", "ingredient_name"], [False, True]))
+
+    def ingredient_recipe_stats(self) -> List[Dict[str, Any]]:
+        total = len(self.recipes)
+        stats = self.ingredient_usage[["ingredient_name", "recipe_count", "total_usage"]].copy()
+        stats["recipe_coverage_pct"] = (stats["recipe_count"] / total * 100).round(2) if total else None
+        return _records(_sort(stats, ["recipe_count", "ingredient_name"], [False, True]))
+
+
+# ---------------------------------------------------------------------------
+# Snapshot bersama + fungsi pengganti config.py
+# ---------------------------------------------------------------------------
+
+_snapshot: Optional[RecipeAnalytics] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(max_age: float = ANALYTICS_TTL_SECONDS) -> RecipeAnalytics:
+    """Snapshot yang sedang dipakai; dimuat (sekali, walau dipanggil paralel) kalau belum ada/kedaluwarsa."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None or time.monotonic() - _snapshot.loaded_at > max_age:
+            _snapshot = RecipeAnalytics.load()
+        return _snapshot
+
+
+def invalidate() -> None:
+    """Buang snapshot; panggilan berikutnya mengambil extract baru dari database."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def recipe_count_by_cuisine() -> List[Dict[str, Any]]:
+    """Jumlah resep per cuisine."""
+    return get_snapshot().recipe_count_by_cuisine()
+
+
+def recipe_category_count_by_cuisine() -> List[Dict[str, Any]]:
+    """Jumlah kategori (type_course) dan resep per cuisine."""
+    return get_snapshot().recipe_category_count_by_cuisine()
+
+
+def top_ingredients(limit: int = 10) -> List[Dict[str, Any]]:
+    """Top-N ingredient yang paling sering dipakai."""
+    return get_snapshot().top_ingredients(limit)
+
+
+def ingredient_usage_distribution() -> List[Dict[str, Any]]:
+    """Distribusi penggunaan ingredient di seluruh resep."""
+    return get_snapshot().ingredient_usage_distribution()
+
+
+def ingredient_count_per_recipe() -> List[Dict[str, Any]]:
+    """Jumlah ingredient pada tiap resep."""
+    return get_snapshot().ingredient_count_per_recipe()
+
+
+def ingredient_count_stats_by_cuisine() -> List[Dict[str, Any]]:
+    """Statistik jumlah ingredient per resep untuk masing-masing cuisine."""
+    return get_snapshot().ingredient_count_stats_by_cuisine()
+
+
+def recipe_count_by_diet() -> List[Dict[str, Any]]:
+    """Jumlah resep per tipe diet."""
+    return get_snapshot().recipe_count_by_diet()
+
+
+def recipe_share_by_diet() -> List[Dict[str, Any]]:
+    """Persentase pembagian resep per tipe diet."""
+    return get_snapshot().recipe_share_by_diet()
+
+
+def ingredient_recipe_stats() -> List[Dict[str, Any]]:
+    """Statistik jumlah resep dan penggunaan per ingredient."""
+    return get_snapshot().ingredient_recipe_stats()
+
+
+def recipe_overview_with_ingredient_count() -> List[Dict[str, Any]]:
+    """Ringkasan resep beserta jumlah ingredient (berguna untuk tabel detail)."""
+    return get_snapshot().recipe_overview_with_ingredient_count()
+
+
+def recipe_overview_with_ingredient_count_df(as_arrow: bool = False):
+    """Sama seperti recipe_overview_with_ingredient_count, tapi sebagai DataFrame/Arrow."""
+    return get_snapshot().recipe_overview_with_ingredient_count_df(as_arrow=as_arrow)
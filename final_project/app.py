@@ -2,21 +2,40 @@
 
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Tuple
+
 import pandas as pd
 import plotly.express as px
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-from config import (
-    ingredient_count_per_recipe,
+# Agregat per resep/kategori dihitung dari satu extract bersama (analytics.py);
+# jumlah per cuisine/diet/ingredient dibaca dari tabel ringkasan (config.py, lihat db.sql)
+from analytics import (
+    get_snapshot,
     ingredient_count_stats_by_cuisine,
-    ingredient_usage_distribution,
     recipe_category_count_by_cuisine,
+    recipe_overview_with_ingredient_count_df,
+)
+from config import (
+    POOL_MAXCONN,
+    export_query_stats,
+    ingredient_count_histogram,
+    ingredient_usage_distribution,
+    query_stats,
     recipe_count_by_cuisine,
     recipe_count_by_diet,
-    recipe_overview_with_ingredient_count,
     recipe_share_by_diet,
+    reset_query_stats,
     top_ingredients,
 )
+# export.py ada di root repo (config.py sudah menambahkannya ke sys.path)
+from export import build_export, export_button
+from ingredient_search import IngredientIndex
+from plotting import histogram_from_bins, scatter
+from similarity import MinHashIndex, get_index
 
 
 st.set_page_config(
@@ -37,12 +56,18 @@ st.caption(
 # ---------------------------------------------------------------------------
 
 
-def _df_or_empty(loader, *, empty_message: str):
-    """Run loader (already cached) and convert to DataFrame with graceful errors."""
+def _df_or_empty(loader, *, empty_message: str, source: str | None = None):
+    """Run loader (already cached) and convert to DataFrame with graceful errors.
 
+    ``source`` is the prefetch loader behind the data; if that prefetch failed,
+    its error is already shown above the tabs and the loader is not re-run.
+    """
+
+    if source is not None and source in prefetch_errors:
+        return pd.DataFrame()
     try:
         data = loader()
-    except RuntimeError as exc:
+    except Exception as exc:
         st.error(f"Tidak bisa memuat data: {exc}")
         return pd.DataFrame()
 
@@ -68,8 +93,9 @@ def get_ingredient_usage_distribution_df():
 
 
 @st.cache_data(show_spinner=False)
-def get_ingredient_count_per_recipe_df():
-    return pd.DataFrame(ingredient_count_per_recipe())
+def get_ingredient_count_histogram_df(bins: int, by: str | None):
+    # Bin dihitung di database: `bins` baris per grup, bukan satu baris per resep
+    return pd.DataFrame(ingredient_count_histogram(bins, by))
 
 
 @st.cache_data(show_spinner=False)
@@ -89,7 +115,8 @@ def get_recipe_share_by_diet_df():
 
 @st.cache_data(show_spinner=False)
 def get_recipe_overview_df():
-    return pd.DataFrame(recipe_overview_with_ingredient_count())
+    # Tabel terbesar di dashboard: langsung sebagai DataFrame dari engine analytics
+    return recipe_overview_with_ingredient_count_df()
 
 
 @st.cache_data(show_spinner=False)
@@ -97,8 +124,23 @@ def get_top_ingredients_df(limit: int):
     return pd.DataFrame(top_ingredients(limit))
 
 
-def df_to_csv(df: pd.DataFrame) -> bytes:
-    return df.to_csv(index=False).encode("utf-8")
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _build_ingredient_index(loaded_at: float, _snapshot) -> IngredientIndex:
+    # Objek indeks dipakai bersama semua sesi (tidak di-pickle seperti cache_data).
+    # Kunci cache = loaded_at snapshot, jadi indeks dibangun ulang setiap snapshot
+    # dimuat ulang; `_snapshot` tidak ikut di-hash.
+    return IngredientIndex.from_snapshot(_snapshot)
+
+
+def get_ingredient_index() -> IngredientIndex:
+    snapshot = get_snapshot()
+    return _build_ingredient_index(snapshot.loaded_at, snapshot)
+
+
+@st.cache_resource(show_spinner=False, ttl=600)
+def get_similarity_index() -> MinHashIndex:
+    # Dimuat dari disk lalu disinkronkan incremental (lihat similarity.py)
+    return get_index()
 
 
 # Sidebar controls ---------------------------------------------------------
@@ -106,12 +148,72 @@ def df_to_csv(df: pd.DataFrame) -> bytes:
 st.sidebar.header("Pengaturan")
 top_n = st.sidebar.slider("Top ingredients", min_value=5, max_value=30, value=10, step=1)
 show_tables = st.sidebar.checkbox("Tampilkan tabel detail", value=True)
+histogram_bins = st.sidebar.slider("Jumlah bin histogram ingredient", min_value=5, max_value=100, value=15, step=1)
+histogram_by = st.sidebar.selectbox(
+    "Pecah histogram per",
+    [None, "cuisine", "diet"],
+    format_func=lambda by: "Tidak dipecah" if by is None else by.capitalize(),
+)
+
+# Prefetch ------------------------------------------------------------------
+
+
+def prefetch(loaders: Dict[str, Callable[[], object]]) -> Tuple[Dict[str, float], Dict[str, Exception]]:
+    """Jalankan query yang saling independen secara paralel sebelum tab dirender.
+
+    Hanya sumber data yang benar-benar terpisah yang diprefetch (snapshot
+    analytics, query tabel ringkasan, dan histogram SQL): loader turunan
+    snapshot berbagi ``_snapshot_lock`` sehingga paralelisasinya hanya saling
+    menunggu. Setiap loader memakai koneksinya sendiri dari pool, jadi pada
+    cache dingin latency halaman mendekati query paling lambat. Mengembalikan
+    (durasi, error) per loader.
+    """
+
+    ctx = get_script_run_ctx()
+    timings: Dict[str, float] = {}
+    errors: Dict[str, Exception] = {}
+
+    def run(name: str, loader: Callable[[], object]) -> None:
+        add_script_run_ctx(ctx=ctx)  # supaya cache_data/st.* bisa dipakai dari thread worker
+        start = time.perf_counter()
+        try:
+            loader()
+        except Exception as exc:  # psycopg2.Error dan sejenisnya; ditampilkan di thread utama
+            errors[name] = exc
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    workers = max(1, min(len(loaders), POOL_MAXCONN))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") as executor:
+        wait([executor.submit(run, name, loader) for name, loader in loaders.items()])
+    return timings, errors
+
+
+prefetch_start = time.perf_counter()
+with st.spinner("Memuat data…"):
+    prefetch_timings, prefetch_errors = prefetch({
+        "analytics_snapshot": get_snapshot,
+        "recipe_count_by_cuisine": get_recipe_count_by_cuisine_df,
+        "top_ingredients": lambda: get_top_ingredients_df(top_n),
+        "ingredient_usage_distribution": get_ingredient_usage_distribution_df,
+        "ingredient_count_histogram": lambda: get_ingredient_count_histogram_df(histogram_bins, histogram_by),
+        "recipe_count_by_diet": get_recipe_count_by_diet_df,
+        "recipe_share_by_diet": get_recipe_share_by_diet_df,
+    })
+for loader_name, exc in prefetch_errors.items():
+    st.error(f"Tidak bisa memuat data ({loader_name}): {exc}")
+st.sidebar.caption(
+    f"Data dimuat dalam {(time.perf_counter() - prefetch_start) * 1000:.0f} ms "
+    f"(total {sum(prefetch_timings.values()) * 1000:.0f} ms untuk {len(prefetch_timings)} loader)."
+)
 
 # Main tabs ---------------------------------------------------------------
-tab_cuisine, tab_ingredient, tab_diet = st.tabs([
+tab_cuisine, tab_ingredient, tab_diet, tab_search, tab_similar = st.tabs([
     "Cuisine Insights",
     "Ingredient Insights",
     "Diet Insights",
+    "Ingredient Search",
+    "Similar Recipes",
 ])
 
 # ---------------------------------------------------------------------------
@@ -123,6 +225,7 @@ with tab_cuisine:
     cuisine_df = _df_or_empty(
         get_recipe_count_by_cuisine_df,
         empty_message="Belum ada data resep untuk ditampilkan.",
+        source="recipe_count_by_cuisine",
     )
     if not cuisine_df.empty:
         fig = px.bar(
@@ -137,14 +240,19 @@ with tab_cuisine:
         fig.update_layout(showlegend=False, xaxis_title="Cuisine", yaxis_title="Jumlah Resep")
         st.plotly_chart(fig, use_container_width=True)
         st.caption("Visual ini menyoroti cuisine mana yang memiliki jumlah resep terbanyak sehingga mudah menentukan fokus eksplorasi.")
-        csv = df_to_csv(cuisine_df)
-        st.download_button("⬇️ Unduh data cuisine", csv, "recipe_per_cuisine.csv", "text/csv")
+        export_button(
+            "⬇️ Unduh data cuisine",
+            "recipe_per_cuisine",
+            lambda fmt: build_export([cuisine_df], fmt),
+            key="export_cuisine",
+        )
 
     st.divider()
     st.subheader("Jumlah Kategori Resep per Cuisine")
     category_df = _df_or_empty(
         get_recipe_category_count_by_cuisine_df,
         empty_message="Belum ada data kategori untuk cuisine.",
+        source="analytics_snapshot",
     )
     if not category_df.empty:
         fig = px.bar(
@@ -177,6 +285,7 @@ with tab_ingredient:
         top_ing_df = _df_or_empty(
             lambda: get_top_ingredients_df(top_n),
             empty_message="Belum ada data ingredient.",
+            source="top_ingredients",
         )
         if not top_ing_df.empty:
             fig = px.bar(
@@ -196,9 +305,11 @@ with tab_ingredient:
         usage_df = _df_or_empty(
             get_ingredient_usage_distribution_df,
             empty_message="Belum ada data penggunaan ingredient.",
+            source="ingredient_usage_distribution",
         )
         if not usage_df.empty:
-            fig = px.scatter(
+            # Otomatis WebGL / heatmap kepadatan kalau ingredient sangat banyak
+            fig = scatter(
                 usage_df,
                 x="recipe_count",
                 y="total_usage",
@@ -216,29 +327,45 @@ with tab_ingredient:
 
     st.divider()
     st.subheader("Jumlah Ingredient per Resep")
-    per_recipe_df = _df_or_empty(
-        get_ingredient_count_per_recipe_df,
+    histogram_df = _df_or_empty(
+        lambda: get_ingredient_count_histogram_df(histogram_bins, histogram_by),
         empty_message="Belum ada data jumlah ingredient tiap resep.",
+        source="ingredient_count_histogram",
     )
-    if not per_recipe_df.empty:
-        fig = px.histogram(
-            per_recipe_df,
-            x="ingredient_count",
-            nbins=15,
-            title="Distribusi Jumlah Ingredient per Resep",
-            color_discrete_sequence=["#f39c12"],
-        )
-        fig.update_layout(xaxis_title="Jumlah Ingredient", yaxis_title="Jumlah Resep")
+    if not histogram_df.empty:
+        if histogram_by is None:
+            edges = [*histogram_df["bin_start"], histogram_df["bin_end"].iat[-1]]
+            fig = histogram_from_bins(
+                edges,
+                histogram_df["recipe_count"],
+                x="ingredient_count",
+                title="Distribusi Jumlah Ingredient per Resep",
+                color_discrete_sequence=["#f39c12"],
+            )
+            fig.update_layout(yaxis_title="Jumlah Resep")
+        else:
+            histogram_df["ingredient_count"] = (histogram_df["bin_start"] + histogram_df["bin_end"]) / 2
+            fig = px.bar(
+                histogram_df,
+                x="ingredient_count",
+                y="recipe_count",
+                color=histogram_by,
+                hover_data={"bin_start": True, "bin_end": True},
+                title=f"Distribusi Jumlah Ingredient per Resep per {histogram_by.capitalize()}",
+            )
+            fig.update_layout(barmode="stack", bargap=0, yaxis_title="Jumlah Resep")
+        fig.update_layout(xaxis_title="Jumlah Ingredient")
         st.plotly_chart(fig, use_container_width=True)
         st.caption("Histogram ini membantu memahami kompleksitas rata-rata resep (sedikit vs banyak ingredient).")
         if show_tables:
-            st.dataframe(per_recipe_df, use_container_width=True)
+            st.dataframe(histogram_df, use_container_width=True)
 
     st.divider()
     st.subheader("Statistik Ingredient per Cuisine")
     stats_df = _df_or_empty(
         get_ingredient_count_stats_by_cuisine_df,
         empty_message="Belum ada statistik ingredient per cuisine.",
+        source="analytics_snapshot",
     )
     if not stats_df.empty:
         fig = px.bar(
@@ -265,6 +392,7 @@ with tab_diet:
     diet_df = _df_or_empty(
         get_recipe_count_by_diet_df,
         empty_message="Belum ada data diet untuk resep.",
+        source="recipe_count_by_diet",
     )
     if not diet_df.empty:
         total_recipes = int(diet_df["recipe_count"].sum())
@@ -289,6 +417,7 @@ with tab_diet:
     share_df = _df_or_empty(
         get_recipe_share_by_diet_df,
         empty_message="Belum ada data persentase diet.",
+        source="recipe_share_by_diet",
     )
     if not share_df.empty:
         fig = px.pie(
@@ -309,15 +438,152 @@ with tab_diet:
     overview_df = _df_or_empty(
         get_recipe_overview_df,
         empty_message="Belum ada ringkasan resep.",
+        source="analytics_snapshot",
     )
     if not overview_df.empty and show_tables:
         st.dataframe(overview_df, use_container_width=True)
-        csv = df_to_csv(overview_df)
-        st.download_button("⬇️ Download ringkasan resep", csv, "recipe_overview.csv", "text/csv")
+        export_button(
+            "⬇️ Download ringkasan resep",
+            "recipe_overview",
+            lambda fmt: build_export([overview_df], fmt),
+            key="export_overview",
+        )
         st.caption("Tabel detail ini merangkum kategori lengkap resep plus jumlah ingredient untuk analisis mendalam.")
 
+# ---------------------------------------------------------------------------
+# Ingredient search tab
+# ---------------------------------------------------------------------------
+
+with tab_search:
+    st.subheader("Cari Resep berdasarkan Ingredient")
+    index = None
+    # Snapshot yang gagal di prefetch sudah ditampilkan errornya; jangan query ulang
+    if "analytics_snapshot" not in prefetch_errors:
+        try:
+            index = get_ingredient_index()
+        except Exception as exc:
+            st.error(f"Tidak bisa memuat indeks ingredient: {exc}")
+
+    if index is not None:
+        col_all, col_any, col_none = st.columns(3)
+        with col_all:
+            all_of = st.multiselect("Harus memakai semua (AND)", index.ingredient_names, key="search_all")
+        with col_any:
+            any_of = st.multiselect("Memakai salah satu (OR)", index.ingredient_names, key="search_any")
+        with col_none:
+            none_of = st.multiselect("Tidak memakai (NOT)", index.ingredient_names, key="search_none")
+
+        if not (all_of or any_of or none_of):
+            st.info("Pilih minimal satu ingredient untuk mulai mencari.")
+        else:
+            result = index.query(all_of, any_of, none_of, limit=500)
+            st.metric("Resep ditemukan", f"{result['count']:,}")
+            st.caption(
+                f"Pencarian {result['search_ms']:.2f} ms, termasuk facet {result['total_ms']:.2f} ms "
+                f"(backend {index.backend}, {index.n_recipes:,} resep)."
+            )
+            if result["count"]:
+                facet_cols = st.columns(3)
+                for col, (facet, facet_df) in zip(facet_cols, result["facets"].items()):
+                    with col:
+                        fig = px.bar(
+                            facet_df.head(15),
+                            x="recipe_count",
+                            y=facet,
+                            orientation="h",
+                            title=f"Per {facet}",
+                        )
+                        fig.update_layout(yaxis={"categoryorder": "total ascending"}, xaxis_title="Jumlah Resep",
+                                          yaxis_title=None, height=360)
+                        st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(result["recipes"], use_container_width=True, hide_index=True)
+                if result["count"] > len(result["recipes"]):
+                    st.caption(f"Menampilkan {len(result['recipes'])} dari {result['count']:,} resep.")
+
+# ---------------------------------------------------------------------------
+# Similar recipes tab
+# ---------------------------------------------------------------------------
+
+with tab_similar:
+    st.subheader("Resep dengan Ingredient Serupa")
+    similarity_index = None
+    if "analytics_snapshot" not in prefetch_errors:
+        try:
+            recipes = get_snapshot().recipes
+            similarity_index = get_similarity_index()
+        except Exception as exc:
+            st.error(f"Tidak bisa memuat indeks kemiripan: {exc}")
+
+    if similarity_index is not None:
+        col_name, col_k = st.columns([3, 1])
+        with col_name:
+            name_filter = st.text_input("Cari nama resep", key="similar_filter")
+        with col_k:
+            k = st.number_input("Jumlah hasil", min_value=1, max_value=50, value=10, key="similar_k")
+        matches = recipes[recipes["recipe_name"].str.contains(name_filter, case=False, na=False, regex=False)]
+        if not name_filter:
+            st.info("Ketik sebagian nama resep untuk memilih resep acuan.")
+        elif matches.empty:
+            st.info("Tidak ada resep dengan nama tersebut.")
+        else:
+            options = matches.head(100)
+            choice = st.selectbox(
+                "Resep acuan",
+                options["recipe_id"].tolist(),
+                format_func=dict(zip(options["recipe_id"], options["recipe_name"])).get,
+                key="similar_recipe",
+            )
+            start = time.perf_counter()
+            similar_df = similarity_index.similar(int(choice), k=int(k))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if similar_df.empty:
+                st.info("Belum ada resep yang cukup mirip.")
+            else:
+                similar_df = similar_df.merge(
+                    recipes[["recipe_id", "recipe_name", "course", "cuisine", "diet"]], on="recipe_id", how="left"
+                )
+                st.dataframe(
+                    similar_df[["recipe_name", "similarity", "course", "cuisine", "diet"]].round({"similarity": 3}),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            st.caption(
+                f"Perkiraan Jaccard dari {similarity_index.num_perm} hash MinHash, "
+                f"{similarity_index.bands} band LSH; query {elapsed_ms:.1f} ms."
+            )
+
 
 # st.sidebar.caption(
 #     "Pastikan variabel lingkungan database (PGHOST, PGPORT, PGUSER, \n"
 #     "PGPASSWORD, PGDATABASE) sudah diisi sebelum menjalankan dashboard."
 # )
+
+
+# ---------------------------------------------------------------------------
+# Query performance panel
+# ---------------------------------------------------------------------------
+
+
+def render_query_stats_panel() -> None:
+    """Panel sidebar berisi latency, jumlah baris, dan ukuran hasil tiap query."""
+
+    with st.sidebar.expander("⏱️ Performa Query"):
+        stats = query_stats()
+        if not stats:
+            st.caption("Belum ada query yang tercatat (hasil mungkin masih dari cache).")
+            return
+        stats_df = pd.DataFrame(stats).drop(columns=["histogram", "plan"])
+        st.dataframe(stats_df.round(1), use_container_width=True, hide_index=True)
+        for stat in stats:
+            if stat["plan"]:
+                st.markdown(f"**EXPLAIN `{stat['query']}`** ({stat['max_ms']:.0f} ms)")
+                st.code(stat["plan"], language="text")
+        st.download_button(
+            "⬇️ Export statistik (JSON)", export_query_stats(), "query_stats.json", "application/json"
+        )
+        if st.button("Reset statistik"):
+            reset_query_stats()
+            st.rerun()
+
+
+render_query_stats_panel()
@@ -1,29 +1,117 @@
-from typing import List, Dict, Any
-import psycopg2
-
-# Koneksi ke database PostgreSQL
-conn = psycopg2.connect(
-    host="localhost",
-    port="5432",          # port default PostgreSQL
-    user="postgres",      # ganti sesuai user PostgreSQL kamu
-    password="0",  # ganti sesuai password PostgreSQL kamu
-    dbname="multicultural_recipe"     # nama database
+import os
+import sys
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+# Modul bersama (pgpool.py, query_cache.py) ada di root repo. Ditambahkan di
+# belakang sys.path supaya config/app milik final_project tetap yang dipakai.
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from pgpool import Database, caller_name  # noqa: E402
+
+# Koneksi ke database PostgreSQL (bisa dioverride lewat environment variable)
+DB_CONFIG = {
+    "host": os.environ.get("PGHOST", "localhost"),
+    "port": os.environ.get("PGPORT", "5432"),          # port default PostgreSQL
+    "user": os.environ.get("PGUSER", "postgres"),      # ganti sesuai user PostgreSQL kamu
+    "password": os.environ.get("PGPASSWORD", "0"),     # ganti sesuai password PostgreSQL kamu
+    "dbname": os.environ.get("PGDATABASE", "multicultural_recipe"),  # nama database
+}
+
+# Ukuran pool koneksi: setiap query meminjam satu koneksi lalu mengembalikannya.
+POOL_MINCONN = int(os.environ.get("PG_POOL_MIN", "1"))
+POOL_MAXCONN = int(os.environ.get("PG_POOL_MAX", "10"))
+# Koneksi yang menganggur lebih lama dari ini dicek dulu dengan `SELECT 1`.
+POOL_HEALTHCHECK_SECONDS = float(os.environ.get("PG_POOL_HEALTHCHECK", "30"))
+
+# Instrumentasi query: query yang lebih lambat dari ini dianggap "lambat", dan kalau
+# PG_EXPLAIN_SLOW=1 rencana `EXPLAIN (ANALYZE, BUFFERS)`-nya disimpan (query dijalankan ulang).
+SLOW_QUERY_MS = float(os.environ.get("PG_SLOW_QUERY_MS", "500"))
+EXPLAIN_SLOW_QUERIES = os.environ.get("PG_EXPLAIN_SLOW", "0") == "1"
+
+# Pool baru dibuat saat query pertama (bukan saat import) supaya cold start murah.
+# Pool, retry, dan statistik query ada di pgpool.py (root repo, dipakai bersama config.py sales).
+_db = Database(
+    DB_CONFIG, POOL_MINCONN, POOL_MAXCONN, healthcheck_seconds=POOL_HEALTHCHECK_SECONDS,
+    slow_query_ms=SLOW_QUERY_MS, explain_slow=EXPLAIN_SLOW_QUERIES,
 )
 
-print("Koneksi PostgreSQL berhasil!")
 
-# Membuat cursor
-c = conn.cursor()
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+def get_connection() -> ContextManager[Any]:
+    """Pinjam satu koneksi dari pool; commit kalau sukses, rollback kalau gagal."""
+    return _db.connection()
+
+
+def close_pool() -> None:
+    """Tutup semua koneksi di pool."""
+    _db.close()
+
+
+# ---------------------------------------------------------------------------
+# Query instrumentation
+# ---------------------------------------------------------------------------
+
+def add_query_hook(hook: Callable[..., None]) -> None:
+    """Daftarkan hook(name, query, params, elapsed_ms, rows) yang dipanggil setelah tiap query."""
+    _db.stats.add_hook(hook)
+
+
+def remove_query_hook(hook: Callable[..., None]) -> None:
+    _db.stats.remove_hook(hook)
+
+
+def _caller_name() -> str:
+    """Name of the public query function in this module that issued the query."""
+    return caller_name(globals(), depth=2)
+
+
+def query_stats() -> List[Dict[str, Any]]:
+    """Ringkasan statistik per query, diurutkan dari total waktu terbesar."""
+    return _db.stats.summary()
+
+
+def export_query_stats() -> str:
+    """Statistik query dalam format JSON."""
+    return _db.stats.export_json()
+
+
+def reset_query_stats() -> None:
+    _db.stats.reset()
+
+
+def _execute(
+    query: str, params: Optional[tuple] = None, name: Optional[str] = None
+) -> Tuple[List[str], List[tuple]]:
+    """Run a query on a pooled connection, retrying once if the connection dropped.
+
+    `name` labels the query in the stats; it defaults to the public function of
+    this module that issued it, so callers in other modules should pass one.
+    """
+    return _db.fetchall(name or _caller_name(), query, params if params is not None else ())
+
 
-def _fetchall(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+def _fetchall(query: str, params: tuple = None, name: Optional[str] = None) -> List[Dict[str, Any]]:
     """Execute a query and return results as a list of dicts."""
-    if params is None:
-        params = ()
-    c.execute(query, params)
-    rows = c.fetchall()
-    columns = [desc[0] for desc in c.description] if c.description else []
+    columns, rows = _execute(query, params, name)
     return [dict(zip(columns, row)) for row in rows]
 
+
+def _fetch_df(query: str, params: Optional[tuple] = None, as_arrow: bool = False, name: Optional[str] = None):
+    """Fetch a query through `COPY (...) TO STDOUT` straight into a columnar frame.
+
+    Postgres streams CSV text that is parsed in one pass by pyarrow (or pandas
+    as a fallback), skipping the per-row tuples and dicts of `_fetchall`.
+    Returns a pandas DataFrame, or a pyarrow Table when `as_arrow=True`.
+    `name` labels the query in the stats, as for `_execute`.
+    """
+    return _db.fetch_frame(name or _caller_name(), query, params, as_arrow=as_arrow)
+
+
 # ============================
 # Fungsi ambil data dari tabel
 # ============================
@@ -39,10 +127,7 @@ def view_ingredient() -> List[Dict[str, Any]]:
     return _fetchall(query)
 
 
-def view_recipe_ingredient() -> List[Dict[str, Any]]:
-    """List relasi resep-ingredient."""
-
-    query = """
+_RECIPE_INGREDIENT_QUERY = """
         SELECT
             ri.recipe_ingredient_id,
             r.recipe_name,
@@ -53,9 +138,24 @@ def view_recipe_ingredient() -> List[Dict[str, Any]]:
         JOIN ingredient_table i
           ON ri.ingredient_id = i.ingredient_id
         ORDER BY ri.recipe_ingredient_id
+"""
+
+
+def view_recipe_ingredient() -> List[tuple]:
+    """Relasi resep-ingredient, satu tuple (recipe_ingredient_id, recipe_name, ingredient_name) per baris.
+
+    Untuk analisis pakai ``analytics.get_snapshot().matrix`` (CSR, lihat recipe_matrix.py).
     """
-    c.execute(query)
-    return c.fetchall()
+
+    _, rows = _execute(_RECIPE_INGREDIENT_QUERY)
+    return rows
+
+
+def view_recipe_ingredient_df(as_arrow: bool = False):
+    """Relasi resep-ingredient sebagai DataFrame/Arrow (lewat COPY)."""
+
+    return _fetch_df(_RECIPE_INGREDIENT_QUERY, as_arrow=as_arrow)
+
 
 def view_recipe():
     query = """
@@ -77,6 +177,16 @@ def view_recipe():
 # ---------------------------------------------------------------------------
 # Aggregation helpers for dashboards/visualizations
 # ---------------------------------------------------------------------------
+# Jumlah per cuisine/diet/ingredient dibaca dari tabel ringkasan yang dijaga
+# trigger (lihat db.sql), bukan COUNT atas seluruh tabel resep.
+
+
+def refresh_recipe_summary() -> None:
+    """Bangun ulang tabel ringkasan dari tabel sumber (untuk perbaikan data)."""
+
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT refresh_recipe_summary()")
+
 
 def recipe_count_by_cuisine() -> List[Dict[str, Any]]:
     """Jumlah resep per cuisine."""
@@ -84,9 +194,10 @@ def recipe_count_by_cuisine() -> List[Dict[str, Any]]:
     query = """
         SELECT
             tcu.type_cuisine_name AS cuisine,
-            COUNT(*) AS recipe_count
-        FROM recipe_table r
-        JOIN type_cuisine_table tcu ON r.type_cuisine_id = tcu.type_cuisine_id
+            SUM(s.recipe_count) AS recipe_count
+        FROM recipe_cuisine_summary s
+        JOIN type_cuisine_table tcu ON s.type_cuisine_id = tcu.type_cuisine_id
+        WHERE s.recipe_count > 0
         GROUP BY tcu.type_cuisine_name
         ORDER BY recipe_count DESC, cuisine ASC
     """
@@ -110,15 +221,39 @@ def recipe_category_count_by_cuisine() -> List[Dict[str, Any]]:
     return _fetchall(query)
 
 
+# Pemakaian per nama ingredient dari tabel ringkasan. recipe_count = COUNT(DISTINCT recipe_id)
+# per nama: nama dengan satu ingredient_id langsung diambil dari ingredient_summary, nama
+# yang dipakai beberapa ingredient_id dihitung dari recipe_ingredient_pair_count supaya
+# resep yang memakai lebih dari satu id bernama sama tidak terhitung dua kali.
+_INGREDIENT_USAGE_CTE = """
+        ingredient_usage AS (
+            SELECT
+                i.ingredient_name,
+                SUM(s.total_usage) AS total_usage,
+                CASE WHEN COUNT(*) = 1 THEN SUM(s.recipe_count) ELSE (
+                    SELECT COUNT(DISTINCT p.recipe_id)
+                    FROM recipe_ingredient_pair_count p
+                    JOIN ingredient_table i2 ON p.ingredient_id = i2.ingredient_id
+                    WHERE i2.ingredient_name IS NOT DISTINCT FROM i.ingredient_name
+                ) END AS recipe_count
+            FROM ingredient_summary s
+            JOIN ingredient_table i ON s.ingredient_id = i.ingredient_id
+            WHERE s.total_usage > 0
+            GROUP BY i.ingredient_name
+        )
+"""
+
+
 def top_ingredients(limit: int = 10) -> List[Dict[str, Any]]:
     """Top-N ingredient yang paling sering dipakai."""
 
     query = """
         SELECT
             i.ingredient_name,
-            COUNT(*) AS usage_count
-        FROM recipe_ingredient_table ri
-        JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
+            SUM(s.total_usage) AS usage_count
+        FROM ingredient_summary s
+        JOIN ingredient_table i ON s.ingredient_id = i.ingredient_id
+        WHERE s.total_usage > 0
         GROUP BY i.ingredient_name
         ORDER BY usage_count DESC, i.ingredient_name ASC
         LIMIT %s
@@ -129,14 +264,10 @@ def top_ingredients(limit: int = 10) -> List[Dict[str, Any]]:
 def ingredient_usage_distribution() -> List[Dict[str, Any]]:
     """Distribusi penggunaan ingredient di seluruh resep."""
 
-    query = """
-        SELECT
-            i.ingredient_name,
-            COUNT(*) AS total_usage,
-            COUNT(DISTINCT ri.recipe_id) AS recipe_count
-        FROM recipe_ingredient_table ri
-        JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
-        GROUP BY i.ingredient_name
+    query = f"""
+        WITH {_INGREDIENT_USAGE_CTE}
+        SELECT ingredient_name, total_usage, recipe_count
+        FROM ingredient_usage
         ORDER BY total_usage DESC
     """
     return _fetchall(query)
@@ -157,6 +288,78 @@ def ingredient_count_per_recipe() -> List[Dict[str, Any]]:
     return _fetchall(query)
 
 
+# Breakdown yang didukung ingredient_count_histogram: nama -> (kolom grup, join tambahan)
+_HISTOGRAM_BREAKDOWNS = {
+    None: ("NULL::text", ""),
+    "cuisine": ("tcu.type_cuisine_name", "JOIN type_cuisine_table tcu ON r.type_cuisine_id = tcu.type_cuisine_id"),
+    "diet": ("td.type_diet_name", "JOIN type_diet_name td ON r.type_diet_id = td.type_diet_id"),
+}
+
+
+def ingredient_count_histogram(bins: int = 15, by: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Histogram jumlah ingredient per resep, di-bin di database dengan `width_bucket`.
+
+    Mengembalikan satu baris per bin (dan per cuisine/diet kalau `by` diisi):
+    bucket (1..bins), bin_start, bin_end, recipe_count. Bin kosong tetap ikut
+    dengan recipe_count 0, jadi hasilnya selalu `bins` baris per grup.
+    """
+
+    if by not in _HISTOGRAM_BREAKDOWNS:
+        raise ValueError(f"by harus salah satu dari {sorted(k for k in _HISTOGRAM_BREAKDOWNS if k)} atau None")
+    if not 1 <= bins <= 1000:
+        raise ValueError("bins harus di antara 1 dan 1000")
+    group_expr, group_join = _HISTOGRAM_BREAKDOWNS[by]
+    query = f"""
+        WITH per_recipe AS (
+            SELECT
+                {group_expr} AS grp,
+                COUNT(ri.ingredient_id) AS ingredient_count
+            FROM recipe_table r
+            JOIN recipe_ingredient_table ri ON r.recipe_id = ri.recipe_id
+            {group_join}
+            GROUP BY r.recipe_id, grp
+        ), bounds AS (
+            -- semua resep sama jumlah ingredient-nya: bin selebar 1 mulai dari nilai itu,
+            -- supaya tepi bin tidak runtuh menjadi lebar 0
+            SELECT
+                MIN(ingredient_count)::numeric AS lo,
+                CASE WHEN MAX(ingredient_count) = MIN(ingredient_count)
+                     THEN MIN(ingredient_count) + %(bins)s
+                     ELSE MAX(ingredient_count)
+                END::numeric AS hi
+            FROM per_recipe
+        ), binned AS (
+            SELECT
+                p.grp,
+                -- nilai maksimum masuk bin terakhir (width_bucket memberi bins + 1)
+                LEAST(width_bucket(p.ingredient_count::numeric, b.lo, b.hi, %(bins)s), %(bins)s) AS bucket,
+                COUNT(*) AS recipe_count
+            FROM per_recipe p CROSS JOIN bounds b
+            GROUP BY 1, 2
+        ), groups AS (
+            SELECT DISTINCT grp FROM per_recipe
+        )
+        SELECT
+            g.grp,
+            s.bucket,
+            b.lo + (s.bucket - 1) * (b.hi - b.lo) / %(bins)s AS bin_start,
+            b.lo + s.bucket * (b.hi - b.lo) / %(bins)s AS bin_end,
+            COALESCE(x.recipe_count, 0) AS recipe_count
+        FROM groups g
+        CROSS JOIN bounds b
+        CROSS JOIN generate_series(1, %(bins)s) AS s(bucket)
+        LEFT JOIN binned x ON x.grp IS NOT DISTINCT FROM g.grp AND x.bucket = s.bucket
+        ORDER BY g.grp, s.bucket
+    """
+    rows = _fetchall(query, {"bins": bins})
+    for row in rows:
+        grp = row.pop("grp")
+        if by:
+            row[by] = grp
+        row["bin_start"], row["bin_end"] = float(row["bin_start"]), float(row["bin_end"])
+    return rows
+
+
 def ingredient_count_stats_by_cuisine() -> List[Dict[str, Any]]:
     """Statistik jumlah ingredient per resep untuk masing-masing cuisine."""
 
@@ -190,9 +393,10 @@ def recipe_count_by_diet() -> List[Dict[str, Any]]:
     query = """
         SELECT
             td.type_diet_name AS diet,
-            COUNT(*) AS recipe_count
-        FROM recipe_table r
-        JOIN type_diet_name td ON r.type_diet_id = td.type_diet_id
+            SUM(s.recipe_count) AS recipe_count
+        FROM recipe_diet_summary s
+        JOIN type_diet_name td ON s.type_diet_id = td.type_diet_id
+        WHERE s.recipe_count > 0
         GROUP BY td.type_diet_name
         ORDER BY recipe_count DESC, diet ASC
     """
@@ -206,9 +410,10 @@ def recipe_share_by_diet() -> List[Dict[str, Any]]:
         WITH counts AS (
             SELECT
                 td.type_diet_name AS diet,
-                COUNT(*) AS recipe_count
-            FROM recipe_table r
-            JOIN type_diet_name td ON r.type_diet_id = td.type_diet_id
+                SUM(s.recipe_count) AS recipe_count
+            FROM recipe_diet_summary s
+            JOIN type_diet_name td ON s.type_diet_id = td.type_diet_id
+            WHERE s.recipe_count > 0
             GROUP BY td.type_diet_name
         ), total AS (
             SELECT SUM(recipe_count) AS total_recipes FROM counts
@@ -226,18 +431,10 @@ def recipe_share_by_diet() -> List[Dict[str, Any]]:
 def ingredient_recipe_stats() -> List[Dict[str, Any]]:
     """Statistik jumlah resep dan penggunaan per ingredient."""
 
-    query = """
+    query = f"""
         WITH total_recipe AS (
-            SELECT COUNT(*) AS total FROM recipe_table
-        ), ingredient_usage AS (
-            SELECT
-                i.ingredient_name,
-                COUNT(DISTINCT ri.recipe_id) AS recipe_count,
-                COUNT(*) AS total_usage
-            FROM recipe_ingredient_table ri
-            JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
-            GROUP BY i.ingredient_name
-        )
+            SELECT SUM(recipe_count) AS total FROM recipe_cuisine_summary
+        ), {_INGREDIENT_USAGE_CTE}
         SELECT
             iu.ingredient_name,
             iu.recipe_count,
@@ -250,10 +447,7 @@ def ingredient_recipe_stats() -> List[Dict[str, Any]]:
     return _fetchall(query)
 
 
-def recipe_overview_with_ingredient_count() -> List[Dict[str, Any]]:
-    """Ringkasan resep beserta jumlah ingredient (berguna untuk tabel detail)."""
-
-    query = """
+_RECIPE_OVERVIEW_QUERY = """
         SELECT
             r.recipe_name,
             tc.type_course_name,
@@ -267,5 +461,16 @@ def recipe_overview_with_ingredient_count() -> List[Dict[str, Any]]:
         JOIN type_diet_name    td  ON r.type_diet_id     = td.type_diet_id
         GROUP BY r.recipe_name, tc.type_course_name, tcu.type_cuisine_name, td.type_diet_name
         ORDER BY r.recipe_name ASC
-    """
-    return _fetchall(query)
\ No newline at end of file
+"""
+
+
+def recipe_overview_with_ingredient_count() -> List[Dict[str, Any]]:
+    """Ringkasan resep beserta jumlah ingredient (berguna untuk tabel detail)."""
+
+    return _fetchall(_RECIPE_OVERVIEW_QUERY)
+
+
+def recipe_overview_with_ingredient_count_df(as_arrow: bool = False):
+    """Sama seperti recipe_overview_with_ingredient_count, tapi lewat COPY ke DataFrame/Arrow."""
+
+    return _fetch_df(_RECIPE_OVERVIEW_QUERY, as_arrow=as_arrow)
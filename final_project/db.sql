@@ -1,30 +1,34 @@
 -- Active: 1763450965107@@127.0.0.1@5432@multicultural_recipe
 
-CREATE DATABASE multicultural_recipe
+CREATE DATABASE multicultural_recipe;
     
+CREATE TABLE IF NOT EXISTS public.type_course_table
+(
+    type_course_id integer NOT NULL,
+    type_course_name character varying(255) COLLATE pg_catalog."default",
+    CONSTRAINT type_course_table_pkey PRIMARY KEY (type_course_id)
+);
+
+CREATE TABLE IF NOT EXISTS public.type_cuisine_table
+(
+    type_cuisine_id integer NOT NULL,
+    type_cuisine_name character varying(255) COLLATE pg_catalog."default",
+    CONSTRAINT type_cuisine_table_pkey PRIMARY KEY (type_cuisine_id)
+);
+
+CREATE TABLE IF NOT EXISTS public.type_diet_name
+(
+    type_diet_id integer NOT NULL,
+    type_diet_name character varying(255) COLLATE pg_catalog."default",
+    CONSTRAINT type_diet_name_pkey PRIMARY KEY (type_diet_id)
+);
+
 CREATE TABLE IF NOT EXISTS public.ingredient_table
 (
     ingredient_id integer NOT NULL,
     ingredient_name character varying(255) COLLATE pg_catalog."default",
     CONSTRAINT ingredient_table_pkey PRIMARY KEY (ingredient_id)
-)
-
-CREATE TABLE IF NOT EXISTS public.recipe_ingredient_table
-(
-    recipe_ingredient_id integer NOT NULL DEFAULT nextval('recipe_ingredient_table_recipe_ingredient_id_seq'::regclass),
-    ingredient_id integer,
-    recipe_id integer,
-    CONSTRAINT recipe_ingredient_table_pkey PRIMARY KEY (recipe_ingredient_id),
-    CONSTRAINT recipe_ingredient_table_ingredient_id_fkey FOREIGN KEY (ingredient_id)
-        REFERENCES public.ingredient_table (ingredient_id) MATCH SIMPLE
-        ON UPDATE NO ACTION
-        ON DELETE NO ACTION,
-    CONSTRAINT recipe_ingredient_table_recipe_id_fkey FOREIGN KEY (recipe_id)
-        REFERENCES public.recipe_table (recipe_id) MATCH SIMPLE
-        ON UPDATE NO ACTION
-        ON DELETE NO ACTION
-)
-
+);
 
 CREATE TABLE IF NOT EXISTS public.recipe_table
 (
@@ -46,25 +50,181 @@ CREATE TABLE IF NOT EXISTS public.recipe_table
         REFERENCES public.type_diet_name (type_diet_id) MATCH SIMPLE
         ON UPDATE NO ACTION
         ON DELETE NO ACTION
-)
+);
 
-CREATE TABLE IF NOT EXISTS public.type_course_table
-(
-    type_course_id integer NOT NULL,
-    type_course_name character varying(255) COLLATE pg_catalog."default",
-    CONSTRAINT type_course_table_pkey PRIMARY KEY (type_course_id)
-)
+CREATE SEQUENCE IF NOT EXISTS public.recipe_ingredient_table_recipe_ingredient_id_seq;
 
-CREATE TABLE IF NOT EXISTS public.type_cuisine_table
+CREATE TABLE IF NOT EXISTS public.recipe_ingredient_table
 (
-    type_cuisine_id integer NOT NULL,
-    type_cuisine_name character varying(255) COLLATE pg_catalog."default",
-    CONSTRAINT type_cuisine_table_pkey PRIMARY KEY (type_cuisine_id)
-)
+    recipe_ingredient_id integer NOT NULL DEFAULT nextval('recipe_ingredient_table_recipe_ingredient_id_seq'::regclass),
+    ingredient_id integer,
+    recipe_id integer,
+    CONSTRAINT recipe_ingredient_table_pkey PRIMARY KEY (recipe_ingredient_id),
+    CONSTRAINT recipe_ingredient_table_ingredient_id_fkey FOREIGN KEY (ingredient_id)
+        REFERENCES public.ingredient_table (ingredient_id) MATCH SIMPLE
+        ON UPDATE NO ACTION
+        ON DELETE NO ACTION,
+    CONSTRAINT recipe_ingredient_table_recipe_id_fkey FOREIGN KEY (recipe_id)
+        REFERENCES public.recipe_table (recipe_id) MATCH SIMPLE
+        ON UPDATE NO ACTION
+        ON DELETE NO ACTION
+);
 
-CREATE TABLE IF NOT EXISTS public.type_diet_name
-(
-    type_diet_id integer NOT NULL,
-    type_diet_name character varying(255) COLLATE pg_catalog."default",
-    CONSTRAINT type_diet_name_pkey PRIMARY KEY (type_diet_id)
-)
+
+-- ============================
+-- Tabel ringkasan (summary) per cuisine, diet, dan ingredient
+-- ============================
+-- Query persentase/jumlah di dashboard membaca tabel kecil ini (O(jumlah kategori)),
+-- bukan COUNT(*) / COUNT(DISTINCT) atas seluruh recipe_table & recipe_ingredient_table.
+-- Isinya dijaga incremental oleh trigger, dan bisa dibangun ulang (misal setelah
+-- import massal, TRUNCATE, atau untuk perbaikan) dengan SELECT refresh_recipe_summary();
+-- Resep tanpa cuisine dicatat di baris type_cuisine_id = NULL (satu baris, karena
+-- NULLS NOT DISTINCT; butuh PostgreSQL 15+), sehingga total resep = SUM(recipe_count)
+-- tabel ini (tanpa satu baris total yang dikunci setiap insert). Baris NULL itu tidak
+-- ikut di chart per cuisine karena tidak cocok dengan join ke type_cuisine_table.
+CREATE TABLE IF NOT EXISTS recipe_cuisine_summary (
+    type_cuisine_id INT UNIQUE NULLS NOT DISTINCT,
+    recipe_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS recipe_diet_summary (
+    type_diet_id INT PRIMARY KEY,
+    recipe_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ingredient_summary (
+    ingredient_id INT PRIMARY KEY,
+    recipe_count INT NOT NULL DEFAULT 0, -- jumlah resep berbeda yang memakai ingredient ini
+    total_usage INT NOT NULL DEFAULT 0   -- jumlah baris di recipe_ingredient_table
+);
+
+-- Jumlah baris per pasangan (recipe, ingredient): dibutuhkan supaya recipe_count di
+-- ingredient_summary (COUNT DISTINCT) bisa dijaga incremental saat ada baris duplikat.
+CREATE TABLE IF NOT EXISTS recipe_ingredient_pair_count (
+    recipe_id INT NOT NULL,
+    ingredient_id INT NOT NULL,
+    usage_count INT NOT NULL,
+    PRIMARY KEY (ingredient_id, recipe_id)
+);
+
+-- Tambahkan (atau kurangi, kalau p_delta negatif) satu resep ke ringkasan cuisine/diet
+CREATE OR REPLACE FUNCTION recipe_summary_apply(p_cuisine INT, p_diet INT, p_delta INT)
+RETURNS void AS $$
+BEGIN
+    INSERT INTO recipe_cuisine_summary AS s (type_cuisine_id, recipe_count)
+    VALUES (p_cuisine, p_delta)
+    ON CONFLICT (type_cuisine_id) DO UPDATE
+        SET recipe_count = s.recipe_count + EXCLUDED.recipe_count;
+
+    IF p_diet IS NOT NULL THEN
+        INSERT INTO recipe_diet_summary AS s (type_diet_id, recipe_count)
+        VALUES (p_diet, p_delta)
+        ON CONFLICT (type_diet_id) DO UPDATE
+            SET recipe_count = s.recipe_count + EXCLUDED.recipe_count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tambahkan (atau kurangi) satu baris recipe_ingredient ke ringkasan ingredient
+CREATE OR REPLACE FUNCTION ingredient_summary_apply(p_recipe INT, p_ingredient INT, p_delta INT)
+RETURNS void AS $$
+DECLARE
+    v_usage INT;
+    v_recipe_delta INT := 0;
+BEGIN
+    IF p_ingredient IS NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_recipe IS NOT NULL THEN
+        INSERT INTO recipe_ingredient_pair_count AS p (recipe_id, ingredient_id, usage_count)
+        VALUES (p_recipe, p_ingredient, p_delta)
+        ON CONFLICT (ingredient_id, recipe_id) DO UPDATE
+            SET usage_count = p.usage_count + EXCLUDED.usage_count
+        RETURNING usage_count INTO v_usage;
+
+        -- pasangan baru muncul (0 -> 1) atau hilang (1 -> 0)
+        IF p_delta > 0 AND v_usage = p_delta THEN
+            v_recipe_delta := 1;
+        ELSIF p_delta < 0 AND v_usage <= 0 THEN
+            v_recipe_delta := -1;
+            DELETE FROM recipe_ingredient_pair_count
+            WHERE ingredient_id = p_ingredient AND recipe_id = p_recipe;
+        END IF;
+    END IF;
+
+    INSERT INTO ingredient_summary AS s (ingredient_id, recipe_count, total_usage)
+    VALUES (p_ingredient, v_recipe_delta, p_delta)
+    ON CONFLICT (ingredient_id) DO UPDATE
+        SET recipe_count = s.recipe_count + EXCLUDED.recipe_count,
+            total_usage = s.total_usage + EXCLUDED.total_usage;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION recipe_table_summary_trg()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM recipe_summary_apply(OLD.type_cuisine_id, OLD.type_diet_id, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM recipe_summary_apply(NEW.type_cuisine_id, NEW.type_diet_id, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_recipe_table_summary
+    AFTER INSERT OR UPDATE OF type_cuisine_id, type_diet_id OR DELETE ON recipe_table
+    FOR EACH ROW EXECUTE FUNCTION recipe_table_summary_trg();
+
+CREATE OR REPLACE FUNCTION recipe_ingredient_summary_trg()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM ingredient_summary_apply(OLD.recipe_id, OLD.ingredient_id, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM ingredient_summary_apply(NEW.recipe_id, NEW.ingredient_id, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_recipe_ingredient_summary
+    AFTER INSERT OR UPDATE OF recipe_id, ingredient_id OR DELETE ON recipe_ingredient_table
+    FOR EACH ROW EXECUTE FUNCTION recipe_ingredient_summary_trg();
+
+-- Bangun ulang semua tabel ringkasan dari nol
+CREATE OR REPLACE FUNCTION refresh_recipe_summary()
+RETURNS void AS $$
+BEGIN
+    TRUNCATE recipe_cuisine_summary, recipe_diet_summary,
+             ingredient_summary, recipe_ingredient_pair_count;
+
+    INSERT INTO recipe_cuisine_summary (type_cuisine_id, recipe_count)
+    SELECT type_cuisine_id, COUNT(*)
+    FROM recipe_table
+    GROUP BY 1;
+
+    INSERT INTO recipe_diet_summary (type_diet_id, recipe_count)
+    SELECT type_diet_id, COUNT(*)
+    FROM recipe_table
+    WHERE type_diet_id IS NOT NULL
+    GROUP BY 1;
+
+    INSERT INTO recipe_ingredient_pair_count (recipe_id, ingredient_id, usage_count)
+    SELECT recipe_id, ingredient_id, COUNT(*)
+    FROM recipe_ingredient_table
+    WHERE recipe_id IS NOT NULL AND ingredient_id IS NOT NULL
+    GROUP BY 1, 2;
+
+    INSERT INTO ingredient_summary (ingredient_id, recipe_count, total_usage)
+    SELECT ingredient_id, COUNT(DISTINCT recipe_id), COUNT(*)
+    FROM recipe_ingredient_table
+    WHERE ingredient_id IS NOT NULL
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_recipe_summary();
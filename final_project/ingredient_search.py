@@ -0,0 +1,158 @@
+"""Inverted-index ingredient search over the whole recipe catalog.
+
+Indeks terbalik ingredient -> bitmap recipe dibangun dari matriks CSR snapshot
+``analytics.py`` (tanpa query tambahan ke database). Query berbentuk:
+
+- ``all_of``: resep harus memakai semua ingredient ini (AND)
+- ``any_of``: resep memakai minimal satu ingredient ini (OR)
+- ``none_of``: resep tidak boleh memakai ingredient ini (NOT)
+
+Backend bawaan adalah NumPy: posting list disimpan sebagai array posisi resep
+(int32) berurutan dan digabung lewat mask boolean, cukup untuk menjawab query
+dalam hitungan milidetik pada 100k+ resep. ``pyroaring`` sengaja tidak ada di
+requirements.txt; kalau kebetulan terpasang, posting list disimpan sebagai
+roaring bitmap (hasilnya sama, lihat ``backend``).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analytics import RecipeAnalytics
+
+try:
+    from pyroaring import BitMap
+except ImportError:  # pyroaring opsional, fallback ke posting list NumPy
+    BitMap = None
+
+FACETS = ("cuisine", "course", "diet")
+
+
+class IngredientIndex:
+    """Indeks ingredient -> resep dengan query AND/OR/NOT dan facet count."""
+
+    def __init__(self, snapshot: RecipeAnalytics):
+        self.recipes = snapshot.recipes
+        self.n_recipes = len(snapshot.recipes)
+        names = snapshot.ingredients["ingredient_name"].fillna("").astype(str)
+
+        # Posting list = transpose matriks CSR snapshot: posisi resep unik dan
+        # berurutan per ingredient
+        postings = snapshot.matrix.transpose()
+        self._postings = postings.indices
+        self._offsets = postings.indptr
+
+        # Nama ingredient (case-insensitive) -> posisi; nama kembar digabung saat query
+        self._by_name: Dict[str, List[int]] = {}
+        for pos, name in enumerate(names):
+            self._by_name.setdefault(name.strip().lower(), []).append(pos)
+        counts = np.diff(self._offsets)
+        self.ingredient_names = sorted(
+            {names.iat[pos] for pos in np.flatnonzero(counts)}, key=str.lower
+        )
+        self._bitmaps = (
+            [BitMap(self._postings[self._offsets[i]:self._offsets[i + 1]].tolist()) for i in range(len(names))]
+            if BitMap is not None else None
+        )
+        # Kode kategori per resep untuk facet count (-1 = NULL)
+        self._facet_codes = {
+            facet: self.recipes[facet].cat.codes.to_numpy() for facet in FACETS
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Optional[RecipeAnalytics] = None) -> "IngredientIndex":
+        if snapshot is None:
+            from analytics import get_snapshot
+
+            snapshot = get_snapshot()
+        return cls(snapshot)
+
+    @property
+    def backend(self) -> str:
+        return "roaring" if self._bitmaps is not None else "numpy"
+
+    def _positions(self, names: Iterable[str]) -> List[List[int]]:
+        # Satu grup posisi per nama; nama yang tidak dikenal -> grup kosong
+        return [self._by_name.get(name.strip().lower(), []) for name in names]
+
+    # -- backend roaring ----------------------------------------------------
+
+    def _union_bitmap(self, positions: List[int]):
+        return BitMap.union(*[self._bitmaps[p] for p in positions]) if positions else BitMap()
+
+    def _search_roaring(self, all_of, any_of, none_of) -> np.ndarray:
+        terms = sorted((self._union_bitmap(p) for p in all_of), key=len)
+        if any_of:
+            terms.append(BitMap.union(*[self._union_bitmap(p) for p in any_of]))
+        result = BitMap.intersection(*terms) if terms else BitMap(range(self.n_recipes))
+        for positions in none_of:
+            result -= self._union_bitmap(positions)
+        return np.asarray(result.to_array(), dtype=np.int64)
+
+    # -- backend NumPy ------------------------------------------------------
+
+    def _mask(self, positions: List[int]) -> np.ndarray:
+        mask = np.zeros(self.n_recipes, dtype=bool)
+        for p in positions:
+            mask[self._postings[self._offsets[p]:self._offsets[p + 1]]] = True
+        return mask
+
+    def _search_numpy(self, all_of, any_of, none_of) -> np.ndarray:
+        result = np.ones(self.n_recipes, dtype=bool)
+        # Ingredient paling jarang dulu: hasil AND cepat kosong
+        for positions in sorted(all_of, key=lambda ps: sum(self._offsets[p + 1] - self._offsets[p] for p in ps)):
+            result &= self._mask(positions)
+            if not result.any():
+                return np.empty(0, dtype=np.int64)
+        if any_of:
+            result &= self._mask([p for positions in any_of for p in positions])
+        for positions in none_of:
+            result &= ~self._mask(positions)
+        return np.flatnonzero(result)
+
+    # -- API ----------------------------------------------------------------
+
+    def search(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+               none_of: Iterable[str] = ()) -> np.ndarray:
+        """Posisi (baris di ``recipes``) resep yang cocok, berurutan."""
+        all_of, any_of, none_of = self._positions(all_of), self._positions(any_of), self._positions(none_of)
+        if self._bitmaps is not None:
+            return self._search_roaring(all_of, any_of, none_of)
+        return self._search_numpy(all_of, any_of, none_of)
+
+    def facets(self, positions: np.ndarray) -> Dict[str, pd.DataFrame]:
+        """Jumlah resep hasil pencarian per cuisine, course, dan diet."""
+        result = {}
+        for facet, codes in self._facet_codes.items():
+            selected = codes[positions]
+            categories = self.recipes[facet].cat.categories
+            counts = np.bincount(selected[selected >= 0], minlength=len(categories))
+            df = pd.DataFrame({facet: categories, "recipe_count": counts})
+            result[facet] = df[df["recipe_count"] > 0].sort_values(
+                ["recipe_count", facet], ascending=[False, True], kind="mergesort"
+            ).reset_index(drop=True)
+        return result
+
+    def recipes_at(self, positions: np.ndarray, limit: Optional[int] = None) -> pd.DataFrame:
+        """Baris resep untuk posisi hasil pencarian (dibatasi `limit` baris)."""
+        positions = positions[:limit] if limit is not None else positions
+        return self.recipes.iloc[positions][["recipe_id", "recipe_name", *FACETS]].reset_index(drop=True)
+
+    def query(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+              none_of: Iterable[str] = (), limit: int = 200) -> Dict[str, object]:
+        """Pencarian + facet + daftar resep sekaligus, dengan latency dalam milidetik."""
+        start = time.perf_counter()
+        positions = self.search(all_of, any_of, none_of)
+        search_ms = (time.perf_counter() - start) * 1000
+        facets = self.facets(positions)
+        return {
+            "count": len(positions),
+            "search_ms": search_ms,
+            "total_ms": (time.perf_counter() - start) * 1000,
+            "facets": facets,
+            "recipes": self.recipes_at(positions, limit),
+        }
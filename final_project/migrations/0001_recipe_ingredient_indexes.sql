@@ -0,0 +1,9 @@
+-- recipe_ingredient_table belum punya index di recipe_id / ingredient_id padahal
+-- semua agregat men-join lewat kolom itu.
+-- (ingredient_id, recipe_id): jumlah pemakaian dan COUNT(DISTINCT recipe_id) per
+-- ingredient bisa dihitung lewat index-only scan.
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredient_table_ingredient_id_recipe_id
+    ON recipe_ingredient_table (ingredient_id, recipe_id);
+-- (recipe_id, ingredient_id): jumlah ingredient per resep dan join ke recipe_table.
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredient_table_recipe_id_ingredient_id
+    ON recipe_ingredient_table (recipe_id, ingredient_id);
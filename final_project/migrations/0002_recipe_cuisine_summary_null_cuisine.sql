@@ -0,0 +1,58 @@
+-- recipe_cuisine_summary mencatat resep tanpa cuisine sebagai type_cuisine_id = 0,
+-- yang tertukar dengan cuisine ber-id 0. Sekarang dicatat sebagai NULL (satu baris,
+-- UNIQUE NULLS NOT DISTINCT; butuh PostgreSQL 15+), sama dengan final_project/db.sql.
+ALTER TABLE recipe_cuisine_summary DROP CONSTRAINT IF EXISTS recipe_cuisine_summary_pkey;
+ALTER TABLE recipe_cuisine_summary ALTER COLUMN type_cuisine_id DROP NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS recipe_cuisine_summary_type_cuisine_id_key
+    ON recipe_cuisine_summary (type_cuisine_id) NULLS NOT DISTINCT;
+
+CREATE OR REPLACE FUNCTION recipe_summary_apply(p_cuisine INT, p_diet INT, p_delta INT)
+RETURNS void AS $$
+BEGIN
+    INSERT INTO recipe_cuisine_summary AS s (type_cuisine_id, recipe_count)
+    VALUES (p_cuisine, p_delta)
+    ON CONFLICT (type_cuisine_id) DO UPDATE
+        SET recipe_count = s.recipe_count + EXCLUDED.recipe_count;
+
+    IF p_diet IS NOT NULL THEN
+        INSERT INTO recipe_diet_summary AS s (type_diet_id, recipe_count)
+        VALUES (p_diet, p_delta)
+        ON CONFLICT (type_diet_id) DO UPDATE
+            SET recipe_count = s.recipe_count + EXCLUDED.recipe_count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Baris 0 lama dibuang: isi ulang semua ringkasan dari tabel sumber
+CREATE OR REPLACE FUNCTION refresh_recipe_summary()
+RETURNS void AS $$
+BEGIN
+    TRUNCATE recipe_cuisine_summary, recipe_diet_summary,
+             ingredient_summary, recipe_ingredient_pair_count;
+
+    INSERT INTO recipe_cuisine_summary (type_cuisine_id, recipe_count)
+    SELECT type_cuisine_id, COUNT(*)
+    FROM recipe_table
+    GROUP BY 1;
+
+    INSERT INTO recipe_diet_summary (type_diet_id, recipe_count)
+    SELECT type_diet_id, COUNT(*)
+    FROM recipe_table
+    WHERE type_diet_id IS NOT NULL
+    GROUP BY 1;
+
+    INSERT INTO recipe_ingredient_pair_count (recipe_id, ingredient_id, usage_count)
+    SELECT recipe_id, ingredient_id, COUNT(*)
+    FROM recipe_ingredient_table
+    WHERE recipe_id IS NOT NULL AND ingredient_id IS NOT NULL
+    GROUP BY 1, 2;
+
+    INSERT INTO ingredient_summary (ingredient_id, recipe_count, total_usage)
+    SELECT ingredient_id, COUNT(DISTINCT recipe_id), COUNT(*)
+    FROM recipe_ingredient_table
+    WHERE ingredient_id IS NOT NULL
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_recipe_summary();
@@ -0,0 +1,106 @@
+"""Plotly helpers that stay fast when charts have tens of thousands of points.
+
+Mode render dipilih otomatis dari jumlah titik:
+
+- <= ``WEBGL_THRESHOLD`` titik: chart plotly biasa (SVG)
+- <= ``BINNING_THRESHOLD`` titik: trace WebGL (``scattergl``), titik tetap dikirim satu per satu
+- di atas itu: titik diagregasi di server menjadi bin 2D (heatmap kepadatan),
+  ditambah ``TOP_POINTS`` titik terbesar sebagai overlay supaya outlier tetap bisa
+  di-hover. Ukuran JSON yang dikirim ke browser tetap kira-kira konstan.
+
+Histogram di atas ``WEBGL_THRESHOLD`` baris juga dihitung di server (``np.histogram``)
+dan dikirim sebagai bar, bukan satu nilai per baris.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+WEBGL_THRESHOLD = int(os.environ.get("RECIPE_WEBGL_THRESHOLD", "5000"))
+BINNING_THRESHOLD = int(os.environ.get("RECIPE_BINNING_THRESHOLD", "50000"))
+DENSITY_BINS = 80
+TOP_POINTS = 300
+
+
+def render_mode(n_points: int) -> str:
+    """"svg", "webgl", atau "binned" untuk jumlah titik ini."""
+    if n_points > BINNING_THRESHOLD:
+        return "binned"
+    if n_points > WEBGL_THRESHOLD:
+        return "webgl"
+    return "svg"
+
+
+def _density_heatmap(x: np.ndarray, y: np.ndarray, bins: int) -> go.Heatmap:
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    # Bin kosong -> NaN supaya transparan; warna skala log karena distribusinya miring
+    z = np.where(counts > 0, np.round(np.log10(np.maximum(counts, 1)), 2), np.nan).T
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        customdata=counts.T.astype(np.int64),
+        hovertemplate="x≈%{x:.0f}<br>y≈%{y:.0f}<br>%{customdata:.0f} titik<extra></extra>",
+        colorscale="Turbo",
+        colorbar={"title": "log10(n)"},
+    )
+
+
+def scatter(df: pd.DataFrame, x: str, y: str, *, hover_name: Optional[str] = None,
+            color: Optional[str] = None, title: Optional[str] = None,
+            color_continuous_scale: Optional[str] = None) -> go.Figure:
+    """px.scatter yang otomatis pindah ke WebGL / bin 2D untuk data besar."""
+    mode = render_mode(len(df))
+    if mode != "binned":
+        fig = px.scatter(
+            df, x=x, y=y, hover_name=hover_name, color=color, title=title,
+            color_continuous_scale=color_continuous_scale,
+            render_mode="webgl" if mode == "webgl" else "svg",
+        )
+    else:
+        fig = go.Figure(_density_heatmap(df[x].to_numpy(float), df[y].to_numpy(float), DENSITY_BINS))
+        top = df.nlargest(TOP_POINTS, y)
+        fig.add_trace(go.Scattergl(
+            x=top[x], y=top[y], mode="markers",
+            text=top[hover_name] if hover_name else None,
+            hovertemplate="%{text}<br>%{x}, %{y}<extra></extra>" if hover_name else None,
+            marker={"color": "white", "size": 5, "line": {"color": "black", "width": 1}},
+            name=f"Top {TOP_POINTS}",
+            showlegend=False,
+        ))
+        fig.update_layout(title=f"{title} ({len(df):,} titik, diagregasi)" if title else None)
+    fig.update_layout(meta={"render_mode": mode})
+    return fig
+
+
+def histogram(df: pd.DataFrame, x: str, *, nbins: int = 15, title: Optional[str] = None,
+              color_discrete_sequence=None) -> go.Figure:
+    """px.histogram; di atas ambang, bin dihitung di server dan dikirim sebagai bar."""
+    if len(df) <= WEBGL_THRESHOLD:
+        return px.histogram(df, x=x, nbins=nbins, title=title, color_discrete_sequence=color_discrete_sequence)
+    counts, edges = np.histogram(df[x].dropna().to_numpy(float), bins=nbins)
+    return histogram_from_bins(edges, counts, x=x, title=title, color_discrete_sequence=color_discrete_sequence)
+
+
+def histogram_from_bins(edges, counts, *, x: str, title: Optional[str] = None,
+                        color_discrete_sequence=None) -> go.Figure:
+    """Bar chart histogram dari tepi bin (n+1) dan jumlah per bin (n) yang sudah dihitung."""
+    edges = np.asarray(edges, dtype=float)
+    binned = pd.DataFrame({
+        x: (edges[:-1] + edges[1:]) / 2,
+        "count": np.asarray(counts),
+        "range": [f"{lo:g} – {hi:g}" for lo, hi in zip(edges[:-1], edges[1:])],
+    })
+    fig = px.bar(binned, x=x, y="count", hover_data={"range": True, x: False}, title=title,
+                 color_discrete_sequence=color_discrete_sequence)
+    # Tepi bin yang runtuh (lebar 0) tetap digambar selebar 1 supaya bar terlihat
+    widths = np.diff(edges)
+    fig.update_traces(width=np.where(widths > 0, widths, 1.0))
+    fig.update_layout(bargap=0)
+    return fig
@@ -0,0 +1,105 @@
+"""Compact CSR representation of the recipe x ingredient relation.
+
+``view_recipe_ingredient`` mengembalikan satu tuple per pasangan (resep,
+ingredient) lengkap dengan nama sebagai string. ``RecipeAnalytics``
+(analytics.py) menyimpan relasi yang sama sebagai matriks sparse CSR:
+
+- baris = posisi resep di dimensi resep, kolom = posisi ingredient di dimensi ingredient
+- ``indptr`` (int64) dan ``indices`` (int32), ``data`` = jumlah baris relasi per pasangan
+- label dan nama tetap di DataFrame dimensi milik ``RecipeAnalytics``
+
+sehingga distribusi ingredient per resep, statistik pemakaian ingredient, dan
+posting list indeks pencarian (ingredient_search.py, lewat ``transpose()``)
+menjadi operasi array (``np.diff``, ``np.bincount``) dengan memori jauh lebih kecil.
+``to_scipy()`` mengonversi ke ``scipy.sparse.csr_matrix`` kalau scipy terpasang.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple, Union
+
+import numpy as np
+
+
+class RecipeIngredientMatrix:
+    """Matriks CSR resep x ingredient (posisi integer, tanpa label)."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_cols = n_cols
+
+    @classmethod
+    def from_positions(cls, rows: np.ndarray, cols: np.ndarray, n_rows: int, n_cols: int) -> "RecipeIngredientMatrix":
+        """Bangun CSR dari pasangan posisi (baris, kolom); posisi negatif (NULL) diabaikan."""
+        valid = (rows >= 0) & (cols >= 0)
+        # Satu sort atas kode gabungan; pasangan duplikat dijumlahkan ke `data`
+        stride = max(n_cols, 1)
+        codes, counts = np.unique(rows[valid].astype(np.int64) * stride + cols[valid], return_counts=True)
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes // stride, minlength=n_rows), out=indptr[1:])
+        return cls(indptr, (codes % stride).astype(np.int32), counts.astype(np.int32), n_cols)
+
+    # -- informasi dasar ----------------------------------------------------
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.indptr) - 1, self.n_cols
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    def row(self, position: int) -> np.ndarray:
+        """Posisi kolom (ingredient) yang dipakai satu baris (resep)."""
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    def row_positions(self) -> np.ndarray:
+        """Posisi baris untuk setiap entri nnz (pasangan dari ``indices``)."""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    # -- derajat baris/kolom --------------------------------------------------
+
+    def row_degrees(self, weighted: bool = False) -> np.ndarray:
+        """Jumlah ingredient per resep (weighted=True: termasuk baris relasi duplikat)."""
+        if not weighted:
+            return np.diff(self.indptr)
+        return np.bincount(self.row_positions(), weights=self.data, minlength=self.shape[0]).astype(np.int64)
+
+    def col_degrees(self, weighted: bool = False) -> np.ndarray:
+        """Jumlah resep per ingredient (weighted=True: total pemakaian)."""
+        return np.bincount(self.indices, weights=self.data if weighted else None,
+                           minlength=self.shape[1]).astype(np.int64)
+
+    # -- slicing / transpose --------------------------------------------------
+
+    def select_rows(self, rows: Union[np.ndarray, slice]) -> "RecipeIngredientMatrix":
+        """Sub-matriks untuk baris terpilih (mask boolean atau array posisi)."""
+        positions = np.arange(self.shape[0])[rows]
+        starts, ends = self.indptr[positions], self.indptr[positions + 1]
+        lengths = ends - starts
+        indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # Indeks nnz semua baris terpilih tanpa loop Python
+        take = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return RecipeIngredientMatrix(indptr, self.indices[take], self.data[take], self.n_cols)
+
+    def transpose(self) -> "RecipeIngredientMatrix":
+        """Matriks ingredient x resep (CSR dari transpose = CSC dari matriks ini)."""
+        order = np.argsort(self.indices, kind="stable")  # baris tetap berurutan di tiap kolom
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=indptr[1:])
+        return RecipeIngredientMatrix(
+            indptr, self.row_positions()[order].astype(np.int32), self.data[order], self.shape[0]
+        )
+
+    def to_scipy(self):
+        """Konversi ke ``scipy.sparse.csr_matrix`` (butuh scipy)."""
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
@@ -0,0 +1,244 @@
+"""Similar-recipe search with MinHash signatures and LSH buckets.
+
+Setiap resep diringkas menjadi signature MinHash (``RECIPE_MINHASH_PERM`` nilai
+uint32) atas himpunan ingredient-nya; kecocokan dua signature memperkirakan
+Jaccard similarity kedua himpunan. Signature dipotong menjadi ``LSH_BANDS`` band
+dan resep dengan band yang sama masuk ke bucket yang sama, sehingga query hanya
+membandingkan kandidat sebucket (bukan semua pasangan resep).
+
+Signature disimpan ke disk (``RECIPE_MINHASH_PATH``, format ``.npz``) bersama
+watermark ``recipe_ingredient_id`` terakhir dan sidik jari (jumlah baris + checksum)
+baris relasi sampai watermark itu. Saat dimuat ulang, kalau sidik jarinya masih sama
+hanya resep yang punya baris relasi baru di atas watermark yang dihitung ulang;
+kalau berubah (ada baris yang dihapus/diubah) indeks dibangun ulang penuh.
+Perubahan yang sudah diketahui resepnya bisa juga disinkronkan langsung lewat
+``MinHashIndex.update(recipe_ids)``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import _fetch_df, _fetchall
+
+MINHASH_PERMUTATIONS = int(os.environ.get("RECIPE_MINHASH_PERM", "128"))
+LSH_BANDS = int(os.environ.get("RECIPE_LSH_BANDS", "32"))
+MINHASH_SEED = 1
+MINHASH_PATH = Path(os.environ.get(
+    "RECIPE_MINHASH_PATH", Path(__file__).resolve().parent / ".cache" / "minhash.npz"
+))
+
+_PRIME = (1 << 31) - 1           # hash universal (a * x + b) mod p
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_PERM_CHUNK = 8                  # batasi memori: nnz x 8 hash sekaligus
+
+_PAIRS_QUERY = """
+        SELECT recipe_id, ingredient_id
+        FROM recipe_ingredient_table
+        WHERE recipe_id IS NOT NULL AND ingredient_id IS NOT NULL
+"""
+
+_PAIRS_FOR_RECIPES_QUERY = _PAIRS_QUERY + "  AND recipe_id = ANY(%s)\n"
+
+# Watermark + sidik jari baris relasi: jumlah baris dan checksum isinya, sampai
+# watermark lama (untuk mendeteksi hapus/ubah) dan untuk seluruh tabel (state baru).
+_STATE_QUERY = """
+        SELECT
+            COALESCE(MAX(recipe_ingredient_id), 0) AS watermark,
+            COUNT(*) FILTER (WHERE recipe_ingredient_id <= %s) AS row_count,
+            COALESCE(SUM(row_hash) FILTER (WHERE recipe_ingredient_id <= %s), 0) AS checksum,
+            COUNT(*) AS total_count,
+            COALESCE(SUM(row_hash), 0) AS total_checksum
+        FROM (
+            SELECT
+                recipe_ingredient_id,
+                hashtext(concat_ws(',', recipe_ingredient_id, recipe_id, ingredient_id)) AS row_hash
+            FROM recipe_ingredient_table
+        ) ri
+"""
+
+_CHANGED_RECIPES_QUERY = """
+        SELECT DISTINCT recipe_id
+        FROM recipe_ingredient_table
+        WHERE recipe_ingredient_id > %s AND recipe_id IS NOT NULL
+"""
+
+
+def _hash_params(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, _PRIME, size=num_perm), rng.integers(0, _PRIME, size=num_perm)
+
+
+def minhash_signatures(recipe_ids: np.ndarray, ingredient_ids: np.ndarray, num_perm: int = MINHASH_PERMUTATIONS,
+                       seed: int = MINHASH_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """Signature MinHash per resep dari pasangan (recipe_id, ingredient_id).
+
+    Mengembalikan (recipe_id unik berurutan, matriks signature uint32 [resep x num_perm]).
+    """
+    order = np.argsort(recipe_ids, kind="stable")
+    recipes = np.asarray(recipe_ids)[order]
+    ingredients = np.asarray(ingredient_ids, dtype=np.int64)[order]
+    if not len(recipes):
+        return recipes.astype(np.int64), np.empty((0, num_perm), dtype=np.uint32)
+    starts = np.flatnonzero(np.r_[True, recipes[1:] != recipes[:-1]])
+    a, b = _hash_params(num_perm, seed)
+    signatures = np.empty((len(starts), num_perm), dtype=np.uint32)
+    for lo in range(0, num_perm, _PERM_CHUNK):
+        hashes = (np.multiply.outer(ingredients % _PRIME, a[lo:lo + _PERM_CHUNK]) + b[lo:lo + _PERM_CHUNK]) % _PRIME
+        signatures[:, lo:lo + _PERM_CHUNK] = np.minimum.reduceat(hashes, starts, axis=0)
+    return recipes[starts].astype(np.int64), signatures
+
+
+class MinHashIndex:
+    """Signature MinHash + bucket LSH untuk mencari resep dengan ingredient mirip."""
+
+    def __init__(self, recipe_ids: np.ndarray, signatures: np.ndarray, bands: int = LSH_BANDS,
+                 seed: int = MINHASH_SEED, watermark: int = 0, row_count: int = 0, checksum: int = 0):
+        if signatures.shape[1] % bands:
+            raise ValueError(f"Jumlah permutasi ({signatures.shape[1]}) harus habis dibagi jumlah band ({bands})")
+        self.recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.signatures = signatures
+        self.bands = bands
+        self.seed = seed
+        self.watermark = watermark
+        self.row_count = row_count
+        self.checksum = checksum
+        self._build_buckets()
+
+    @property
+    def num_perm(self) -> int:
+        return self.signatures.shape[1]
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        # Satu kunci uint64 per (resep, band); overflow uint64 disengaja (hash)
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        keys = np.zeros(rows.shape[:2], dtype=np.uint64)
+        for j in range(rows.shape[2]):
+            keys = keys * _BAND_MULTIPLIER + rows[:, :, j]
+        return keys
+
+    def _build_buckets(self) -> None:
+        # Per band: kunci terurut + posisi resep, dicari dengan searchsorted
+        keys = self._band_keys(self.signatures)
+        self._bucket_members = np.argsort(keys, axis=0, kind="stable").T
+        self._bucket_keys = np.take_along_axis(keys, self._bucket_members.T, axis=0).T
+        self._position = pd.Index(self.recipe_ids)
+
+    def candidates(self, position: int) -> np.ndarray:
+        keys = self._band_keys(self.signatures[position:position + 1])[0]
+        found = []
+        for band, key in enumerate(keys):
+            lo, hi = np.searchsorted(self._bucket_keys[band], key, side="left"), \
+                np.searchsorted(self._bucket_keys[band], key, side="right")
+            found.append(self._bucket_members[band, lo:hi])
+        members = np.unique(np.concatenate(found))
+        return members[members != position]
+
+    def similar(self, recipe_id: int, k: int = 10) -> pd.DataFrame:
+        """Top-k resep paling mirip (perkiraan Jaccard) untuk satu recipe_id."""
+        columns = ["recipe_id", "similarity"]
+        if recipe_id not in self._position:
+            return pd.DataFrame(columns=columns)
+        position = self._position.get_loc(recipe_id)
+        candidates = self.candidates(position)
+        if not len(candidates):
+            return pd.DataFrame(columns=columns)
+        scores = (self.signatures[candidates] == self.signatures[position]).mean(axis=1)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return pd.DataFrame({"recipe_id": self.recipe_ids[candidates[top]], "similarity": scores[top]})
+
+    def update(self, recipe_ids: Iterable[int], pairs: Optional[pd.DataFrame] = None) -> None:
+        """Hitung ulang signature untuk `recipe_ids` (resep tanpa ingredient dihapus dari indeks)."""
+        recipe_ids = np.unique(np.asarray(list(recipe_ids), dtype=np.int64))
+        if not len(recipe_ids):
+            return
+        if pairs is None:
+            pairs = _fetch_df(_PAIRS_FOR_RECIPES_QUERY, (recipe_ids.tolist(),), name="similarity_changed_pairs")
+        changed, signatures = minhash_signatures(
+            pairs["recipe_id"].to_numpy(), pairs["ingredient_id"].to_numpy(), self.num_perm, self.seed
+        )
+        keep = ~np.isin(self.recipe_ids, recipe_ids)
+        all_ids = np.concatenate([self.recipe_ids[keep], changed])
+        order = np.argsort(all_ids, kind="stable")
+        self.recipe_ids = all_ids[order]
+        self.signatures = np.concatenate([self.signatures[keep], signatures])[order]
+        self._build_buckets()
+
+    def sync(self) -> int:
+        """Sinkronkan dengan database; kembalikan jumlah resep yang dihitung ulang.
+
+        Baris baru di atas watermark cukup diperbarui per resep. Kalau baris sampai
+        watermark tidak lagi sama (ada yang dihapus/diubah), indeks dibangun ulang penuh.
+        """
+        state = _fetchall(_STATE_QUERY, (self.watermark,) * 2, name="similarity_state")[0]
+        if (state["row_count"], state["checksum"]) != (self.row_count, self.checksum):
+            state, self.recipe_ids, self.signatures = _full_extract(self.num_perm, self.seed)
+            self._build_buckets()
+            changed = len(self.recipe_ids)
+        elif state["watermark"] > self.watermark:
+            rows = _fetchall(_CHANGED_RECIPES_QUERY, (self.watermark,), name="similarity_changed_recipes")
+            changed = len(rows)
+            self.update(row["recipe_id"] for row in rows)
+        else:
+            return 0
+        self.watermark = state["watermark"]
+        self.row_count, self.checksum = state["total_count"], state["total_checksum"]
+        return changed
+
+    def save(self, path: Path = MINHASH_PATH) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, recipe_ids=self.recipe_ids, signatures=self.signatures,
+                     meta=np.array([self.bands, self.seed, self.watermark, self.row_count, self.checksum],
+                                   dtype=np.int64))
+        os.replace(tmp, path)  # file lama tetap utuh kalau proses mati di tengah penulisan
+
+    @classmethod
+    def load(cls, path: Path = MINHASH_PATH) -> "MinHashIndex":
+        with np.load(path) as data:
+            # File lama tanpa sidik jari -> ValueError saat unpack, get_index membangun ulang
+            bands, seed, watermark, row_count, checksum = (int(v) for v in data["meta"])
+            return cls(data["recipe_ids"], data["signatures"], bands=bands, seed=seed,
+                       watermark=watermark, row_count=row_count, checksum=checksum)
+
+
+def _full_extract(num_perm: int, seed: int):
+    """State database + signature semua resep dari recipe_ingredient_table."""
+    # State dibaca sebelum data: baris yang masuk di antaranya ikut di sync berikutnya
+    state = _fetchall(_STATE_QUERY, (0, 0), name="similarity_state")[0]
+    pairs = _fetch_df(_PAIRS_QUERY, name="similarity_pairs")
+    recipe_ids, signatures = minhash_signatures(
+        pairs["recipe_id"].to_numpy(), pairs["ingredient_id"].to_numpy(), num_perm, seed
+    )
+    return state, recipe_ids, signatures
+
+
+def build_index(num_perm: int = MINHASH_PERMUTATIONS, bands: int = LSH_BANDS,
+                seed: int = MINHASH_SEED) -> MinHashIndex:
+    """Bangun indeks penuh dari recipe_ingredient_table."""
+    state, recipe_ids, signatures = _full_extract(num_perm, seed)
+    return MinHashIndex(recipe_ids, signatures, bands=bands, seed=seed, watermark=state["watermark"],
+                        row_count=state["total_count"], checksum=state["total_checksum"])
+
+
+def get_index(path: Path = MINHASH_PATH) -> MinHashIndex:
+    """Muat indeks dari disk lalu sinkronkan; bangun penuh kalau belum ada atau parameternya beda."""
+    index = None
+    if Path(path).exists():
+        try:
+            index = MinHashIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            index = None
+    if index is None or (index.num_perm, index.bands, index.seed) != (MINHASH_PERMUTATIONS, LSH_BANDS, MINHASH_SEED):
+        index = build_index()
+        index.save(path)
+    elif index.sync():
+        index.save(path)
+    return index
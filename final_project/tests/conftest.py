@@ -0,0 +1,53 @@
+import itertools
+import os
+import sys
+
+import psycopg2
+import pytest
+
+# Modul final_project (config.py, analytics.py, ...) di-import langsung oleh test.
+# Disisipkan di depan supaya `config` yang terpakai adalah config milik final_project.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR in sys.path:
+    sys.path.remove(PROJECT_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+_counter = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def make_database():
+    """Factory: buat database sementara, jalankan script SQL-nya, kembalikan `pgpool.Database`.
+
+    Test di-skip kalau PostgreSQL tidak tersedia; semua database dihapus di akhir modul.
+    """
+    import config
+    from pgpool import Database
+
+    server = {key: value for key, value in config.DB_CONFIG.items() if key != "dbname"}
+    server["password"] = os.environ.get("PGPASSWORD", server["password"])
+    try:
+        admin = psycopg2.connect(dbname="postgres", **server)
+    except psycopg2.OperationalError as exc:
+        pytest.skip(f"PostgreSQL tidak tersedia: {exc}")
+    admin.autocommit = True
+    created = []
+
+    def make(*scripts):
+        dbname = f"recipe_test_{os.getpid()}_{next(_counter)}"
+        with admin.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {dbname}")
+            cur.execute(f"CREATE DATABASE {dbname}")
+        database = Database(dict(server, dbname=dbname), 1, 2)
+        created.append((dbname, database))
+        for script in scripts:
+            with database.connection() as conn, conn.cursor() as cur:
+                cur.execute(script)
+        return database
+
+    yield make
+    for dbname, database in created:
+        database.close()
+        with admin.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {dbname}")
+    admin.close()
@@ -0,0 +1,197 @@
+import math
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import analytics
+import config
+
+pytest.importorskip("pyarrow")
+
+# Fixture kecil dengan kasus tepi: nama kategori "", course/cuisine/diet NULL,
+# ingredient bernama sama, resep tanpa ingredient, baris relasi duplikat dan NULL.
+FIXTURE_SQL = """
+    CREATE TABLE type_course_table (type_course_id integer PRIMARY KEY, type_course_name varchar(255));
+    CREATE TABLE type_cuisine_table (type_cuisine_id integer PRIMARY KEY, type_cuisine_name varchar(255));
+    CREATE TABLE type_diet_name (type_diet_id integer PRIMARY KEY, type_diet_name varchar(255));
+    CREATE TABLE ingredient_table (ingredient_id integer PRIMARY KEY, ingredient_name varchar(255));
+    CREATE TABLE recipe_table (
+        recipe_id integer PRIMARY KEY,
+        recipe_name varchar(255),
+        type_course_id integer REFERENCES type_course_table,
+        type_cuisine_id integer REFERENCES type_cuisine_table,
+        type_diet_id integer REFERENCES type_diet_name
+    );
+    CREATE TABLE recipe_ingredient_table (
+        recipe_ingredient_id serial PRIMARY KEY,
+        ingredient_id integer REFERENCES ingredient_table,
+        recipe_id integer REFERENCES recipe_table
+    );
+
+    INSERT INTO type_course_table VALUES (1, 'Main'), (2, ''), (3, 'Dessert');
+    INSERT INTO type_cuisine_table VALUES (0, 'Fusion'), (1, 'Indian'), (2, ''), (3, 'Thai');
+    INSERT INTO type_diet_name VALUES (1, 'Vegetarian'), (2, '');
+    INSERT INTO ingredient_table VALUES (1, 'salt'), (2, 'salt'), (3, ''), (4, 'pepper'), (5, NULL);
+    INSERT INTO recipe_table VALUES
+        (1, 'Dal', 1, 1, 1),
+        (2, 'Kheer', 2, 1, 2),
+        (3, 'Curry', NULL, 2, 1),
+        (4, 'Mango Rice', 3, NULL, NULL),
+        (5, 'Dal', 1, 3, 1),
+        (6, 'Plain', 1, 1, 1),
+        (7, '', 3, 3, 2),
+        (8, 'Taco Pizza', 1, 0, 1);
+    INSERT INTO recipe_ingredient_table (recipe_id, ingredient_id) VALUES
+        (1, 1), (1, 2), (1, 3), (2, 1), (2, 1), (3, 3), (4, 2),
+        (5, 1), (5, 5), (7, 4), (8, 4), (NULL, 1), (2, NULL);
+"""
+
+# Bagian tabel ringkasan + trigger dari db.sql (bisa dijalankan apa adanya)
+DB_SQL = Path(__file__).resolve().parent.parent / "db.sql"
+_DB_TEXT = DB_SQL.read_text()
+SUMMARY_SQL = _DB_TEXT[_DB_TEXT.index("-- ============================\n-- Tabel ringkasan"):]
+
+# Perubahan data setelah ringkasan dibangun: harus diikuti trigger
+SUMMARY_DML = """
+    INSERT INTO recipe_table VALUES (9, 'Soup', 1, NULL, 2), (10, 'Stew', 1, 0, NULL);
+    INSERT INTO recipe_ingredient_table (recipe_id, ingredient_id) VALUES (9, 1), (9, 1), (10, 3);
+    UPDATE recipe_table SET type_cuisine_id = NULL, type_diet_id = 1 WHERE recipe_id = 8;
+    DELETE FROM recipe_ingredient_table WHERE recipe_id = 2 AND ingredient_id = 1;
+    UPDATE recipe_ingredient_table SET ingredient_id = 2 WHERE recipe_id = 5 AND ingredient_id = 5;
+"""
+
+# Query per-chart sebelum engine analytics (fungsi yang kini dibaca dari tabel ringkasan)
+OLD_QUERIES = {
+    "recipe_count_by_cuisine": """
+        SELECT tcu.type_cuisine_name AS cuisine, COUNT(*) AS recipe_count
+        FROM recipe_table r
+        JOIN type_cuisine_table tcu ON r.type_cuisine_id = tcu.type_cuisine_id
+        GROUP BY tcu.type_cuisine_name
+    """,
+    "recipe_count_by_diet": """
+        SELECT td.type_diet_name AS diet, COUNT(*) AS recipe_count
+        FROM recipe_table r
+        JOIN type_diet_name td ON r.type_diet_id = td.type_diet_id
+        GROUP BY td.type_diet_name
+    """,
+    "recipe_share_by_diet": """
+        WITH counts AS (
+            SELECT td.type_diet_name AS diet, COUNT(*) AS recipe_count
+            FROM recipe_table r
+            JOIN type_diet_name td ON r.type_diet_id = td.type_diet_id
+            GROUP BY td.type_diet_name
+        ), total AS (
+            SELECT SUM(recipe_count) AS total_recipes FROM counts
+        )
+        SELECT counts.diet, counts.recipe_count,
+               ROUND(counts.recipe_count::numeric / NULLIF(total.total_recipes, 0) * 100, 2) AS percentage_share
+        FROM counts CROSS JOIN total
+    """,
+    "top_ingredients": """
+        SELECT i.ingredient_name, COUNT(*) AS usage_count
+        FROM recipe_ingredient_table ri
+        JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
+        GROUP BY i.ingredient_name
+    """,
+    "ingredient_usage_distribution": """
+        SELECT i.ingredient_name, COUNT(*) AS total_usage, COUNT(DISTINCT ri.recipe_id) AS recipe_count
+        FROM recipe_ingredient_table ri
+        JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
+        GROUP BY i.ingredient_name
+    """,
+    "ingredient_recipe_stats": """
+        WITH total_recipe AS (
+            SELECT COUNT(*) AS total FROM recipe_table
+        ), ingredient_usage AS (
+            SELECT i.ingredient_name, COUNT(DISTINCT ri.recipe_id) AS recipe_count, COUNT(*) AS total_usage
+            FROM recipe_ingredient_table ri
+            JOIN ingredient_table i ON ri.ingredient_id = i.ingredient_id
+            GROUP BY i.ingredient_name
+        )
+        SELECT iu.ingredient_name, iu.recipe_count, iu.total_usage,
+               ROUND(iu.recipe_count::numeric / NULLIF(tr.total, 0) * 100, 2) AS recipe_coverage_pct
+        FROM ingredient_usage iu CROSS JOIN total_recipe tr
+    """,
+}
+
+# Fungsi yang masih berupa query langsung di config.py
+DIRECT_FUNCTIONS = (
+    "recipe_category_count_by_cuisine",
+    "ingredient_count_per_recipe",
+    "ingredient_count_stats_by_cuisine",
+    "recipe_overview_with_ingredient_count",
+)
+
+
+def _normalize(rows):
+    # Bandingkan sebagai multiset: urutan baris yang seri (dan collation) boleh berbeda
+    def value(v):
+        if v is None or (isinstance(v, float) and math.isnan(v)):
+            return None
+        if isinstance(v, (Decimal, float)):
+            return round(float(v), 6)
+        if hasattr(v, "item"):  # skalar numpy
+            return value(v.item())
+        return v
+
+    return sorted((tuple(sorted((k, value(v)) for k, v in row.items())) for row in rows), key=repr)
+
+
+@pytest.fixture(scope="module")
+def fixture_db(make_database):
+    return make_database(FIXTURE_SQL)
+
+
+@pytest.fixture
+def engine(fixture_db, monkeypatch):
+    monkeypatch.setattr(config, "_db", fixture_db)
+    return analytics.RecipeAnalytics.load()
+
+
+def test_null_and_empty_categories(engine):
+    recipes = engine.recipes.set_index("recipe_id")
+    assert recipes.loc[2, "course"] == ""
+    assert recipes.loc[3, "cuisine"] == ""
+    assert recipes.isna().loc[3, "course"]
+    assert recipes.isna().loc[4, "cuisine"] and recipes.isna().loc[4, "diet"]
+
+
+def test_empty_name_read_as_nan_stays_a_category():
+    # Parser CSV pandas (tanpa pyarrow) membaca "" sebagai NaN; id join-nya yang menentukan NULL
+    recipes = pd.DataFrame({
+        "recipe_id": [1, 2], "recipe_name": ["a", "b"],
+        "course": [float("nan"), float("nan")], "cuisine": ["Thai", "Thai"], "diet": ["Vegan", "Vegan"],
+        "course_id": [2, -1], "cuisine_id": [1, 1], "diet_id": [1, 1],
+    })
+    facts = pd.DataFrame({"recipe_id": [1, 2], "ingredient_id": [1, 1]})
+    ingredients = pd.DataFrame({"ingredient_id": [1], "ingredient_name": ["salt"]})
+    engine = analytics.RecipeAnalytics(facts, recipes, ingredients)
+    assert engine.recipes["course"].tolist()[0] == ""
+    assert pd.isna(engine.recipes["course"].tolist()[1])
+    assert engine.recipe_category_count_by_cuisine() == [
+        {"cuisine": "Thai", "category_count": 1, "recipe_count": 1}
+    ]
+
+
+@pytest.mark.parametrize("name", sorted(OLD_QUERIES))
+def test_parity_with_old_chart_queries(engine, fixture_db, name):
+    columns, rows = fixture_db.fetchall(name, OLD_QUERIES[name])
+    expected = [dict(zip(columns, row)) for row in rows]
+    assert _normalize(getattr(engine, name)()) == _normalize(expected)
+
+
+@pytest.mark.parametrize("name", DIRECT_FUNCTIONS)
+def test_parity_with_config_queries(engine, name):
+    assert _normalize(getattr(engine, name)()) == _normalize(getattr(config, name)())
+
+
+@pytest.mark.parametrize("after_dml", [False, True], ids=["refresh", "triggers"])
+def test_summary_tables_match_old_chart_queries(make_database, monkeypatch, after_dml):
+    database = make_database(FIXTURE_SQL, SUMMARY_SQL, *([SUMMARY_DML] if after_dml else []))
+    monkeypatch.setattr(config, "_db", database)
+    for name, query in OLD_QUERIES.items():
+        columns, rows = database.fetchall(name, query)
+        expected = [dict(zip(columns, row)) for row in rows]
+        assert _normalize(getattr(config, name)()) == _normalize(expected), name
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from recipe_matrix import RecipeIngredientMatrix
+
+
+def _dense(matrix):
+    dense = np.zeros(matrix.shape, dtype=np.int64)
+    for row in range(matrix.shape[0]):
+        lo, hi = matrix.indptr[row], matrix.indptr[row + 1]
+        dense[row, matrix.indices[lo:hi]] = matrix.data[lo:hi]
+    return dense
+
+
+def _reference(rows, cols, n_rows, n_cols):
+    dense = np.zeros((n_rows, n_cols), dtype=np.int64)
+    for r, c in zip(rows, cols):
+        if r >= 0 and c >= 0:
+            dense[r, c] += 1
+    return dense
+
+
+@pytest.fixture
+def positions():
+    # Pasangan acak dengan duplikat, posisi -1 (NULL), baris kosong, dan kolom tak terpakai
+    rng = np.random.default_rng(7)
+    n_rows, n_cols = 40, 25
+    rows = rng.integers(-1, n_rows - 5, size=400)
+    cols = rng.integers(-1, n_cols - 3, size=400)
+    return rows, cols, n_rows, n_cols
+
+
+def test_from_positions_matches_dense_reference(positions):
+    rows, cols, n_rows, n_cols = positions
+    matrix = RecipeIngredientMatrix.from_positions(rows, cols, n_rows, n_cols)
+    reference = _reference(rows, cols, n_rows, n_cols)
+    np.testing.assert_array_equal(_dense(matrix), reference)
+    assert matrix.nnz == np.count_nonzero(reference)
+    for row in range(n_rows):
+        # Kolom per baris unik dan berurutan
+        np.testing.assert_array_equal(matrix.row(row), np.flatnonzero(reference[row]))
+    np.testing.assert_array_equal(matrix.row_degrees(), (reference > 0).sum(axis=1))
+    np.testing.assert_array_equal(matrix.row_degrees(weighted=True), reference.sum(axis=1))
+    np.testing.assert_array_equal(matrix.col_degrees(), (reference > 0).sum(axis=0))
+    np.testing.assert_array_equal(matrix.col_degrees(weighted=True), reference.sum(axis=0))
+
+
+@pytest.mark.parametrize("select", ["mask", "positions", "empty"])
+def test_select_rows_matches_dense_reference(positions, select):
+    rows, cols, n_rows, n_cols = positions
+    matrix = RecipeIngredientMatrix.from_positions(rows, cols, n_rows, n_cols)
+    reference = _reference(rows, cols, n_rows, n_cols)
+    chosen = {
+        "mask": np.arange(n_rows) % 3 == 0,
+        "positions": np.array([5, 0, 39, 5, 17]),
+        "empty": np.zeros(n_rows, dtype=bool),
+    }[select]
+    np.testing.assert_array_equal(_dense(matrix.select_rows(chosen)), reference[chosen])
+
+
+def test_transpose_matches_dense_reference(positions):
+    rows, cols, n_rows, n_cols = positions
+    matrix = RecipeIngredientMatrix.from_positions(rows, cols, n_rows, n_cols)
+    transposed = matrix.transpose()
+    assert transposed.shape == (n_cols, n_rows)
+    np.testing.assert_array_equal(_dense(transposed), _reference(rows, cols, n_rows, n_cols).T)
+    np.testing.assert_array_equal(_dense(transposed.transpose()), _dense(matrix))
+
+
+def test_empty_matrix():
+    matrix = RecipeIngredientMatrix.from_positions(np.array([-1]), np.array([3]), 0, 0)
+    assert matrix.shape == (0, 0) and matrix.nnz == 0
+    assert matrix.transpose().shape == (0, 0)
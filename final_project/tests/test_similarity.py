@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import config
+import similarity
+
+pytest.importorskip("pyarrow")
+
+PAIRS_SQL = """
+    CREATE TABLE recipe_ingredient_table (
+        recipe_ingredient_id serial PRIMARY KEY,
+        ingredient_id integer,
+        recipe_id integer
+    );
+    INSERT INTO recipe_ingredient_table (recipe_id, ingredient_id) VALUES
+        (1, 10), (1, 11), (1, 12), (2, 10), (2, 11), (2, 12), (2, 13),
+        (3, 20), (3, 21), (NULL, 10);
+"""
+
+
+@pytest.fixture
+def db(make_database, monkeypatch):
+    database = make_database(PAIRS_SQL)
+    monkeypatch.setattr(config, "_db", database)
+    return database
+
+
+def _run(db, sql):
+    with db.connection() as conn, conn.cursor() as cur:
+        cur.execute(sql)
+
+
+def _assert_matches_fresh_build(index):
+    fresh = similarity.build_index(num_perm=16, bands=4)
+    np.testing.assert_array_equal(index.recipe_ids, fresh.recipe_ids)
+    np.testing.assert_array_equal(index.signatures, fresh.signatures)
+    assert (index.watermark, index.row_count, index.checksum) == (fresh.watermark, fresh.row_count, fresh.checksum)
+
+
+def test_sync_picks_up_inserts_incrementally(db):
+    index = similarity.build_index(num_perm=16, bands=4)
+    assert index.sync() == 0
+    _run(db, "INSERT INTO recipe_ingredient_table (recipe_id, ingredient_id) VALUES (4, 20), (4, 21), (1, 13)")
+    assert index.sync() == 2
+    _assert_matches_fresh_build(index)
+    assert 4 in index.similar(3)["recipe_id"].tolist()
+
+
+@pytest.mark.parametrize("change", [
+    "DELETE FROM recipe_ingredient_table WHERE recipe_id = 3",
+    "UPDATE recipe_ingredient_table SET ingredient_id = 30 WHERE recipe_id = 1 AND ingredient_id = 12",
+    "UPDATE recipe_ingredient_table SET recipe_id = 2 WHERE recipe_id IS NULL",
+], ids=["delete", "update-ingredient", "update-recipe"])
+def test_sync_rebuilds_after_delete_or_update(db, change):
+    index = similarity.build_index(num_perm=16, bands=4)
+    _run(db, change)
+    assert index.sync() > 0
+    _assert_matches_fresh_build(index)
+    assert index.sync() == 0
+
+
+def test_deleted_recipe_leaves_buckets_and_cache(db, tmp_path):
+    path = tmp_path / "minhash.npz"
+    similarity.build_index(num_perm=16, bands=4).save(path)
+    _run(db, "DELETE FROM recipe_ingredient_table WHERE recipe_id = 1")
+    index = similarity.MinHashIndex.load(path)
+    index.sync()
+    index.save(path)
+    reloaded = similarity.MinHashIndex.load(path)
+    assert 1 not in reloaded.recipe_ids
+    assert reloaded.similar(2).empty
+    assert reloaded.sync() == 0
@@ -1,61 +1,90 @@
 # Import library
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 
 # Import fungsi dari config.py
 from config import *
-
-
-@st.cache_data
-def convert_df_to_csv(_df):
-    return _df.to_csv(index=False).encode('utf-8')
+from export import export_button
 
 # Set konfigurasi halaman dashboard
 st.set_page_config("Dashboard", page_icon="📊", layout="wide")  # Judul, ikon, tata letak lebar
 
 
+def load_keyset_page(key, fetch_page, page_size=PAGE_SIZE, reset_on=None):
+    # Paginasi berbasis keyset: session_state menyimpan tumpukan "key baris
+    # terakhir" tiap halaman, jadi satu rerun hanya mengambil satu halaman.
+    # `reset_on` dipakai untuk kembali ke halaman 1 kalau filter berubah.
+    stack_key = f"{key}_page_stack"
+    filter_key = f"{key}_page_filter"
+    if stack_key not in st.session_state or st.session_state.get(filter_key) != reset_on:
+        st.session_state[stack_key] = [None]
+        st.session_state[filter_key] = reset_on
+
+    # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    rows = fetch_page(st.session_state[stack_key][-1], page_size + 1)
+    has_next = len(rows) > page_size
+    return rows[:page_size], has_next
+
+
+def keyset_pager_controls(key, rows, has_next, row_key):
+    # Tombol prev/next di bawah tabel; `row_key` mengambil key keyset dari satu baris
+    stack = st.session_state[f"{key}_page_stack"]
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("⬅️ Sebelumnya", key=f"{key}_prev", disabled=len(stack) == 1):
+            stack.pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Halaman {len(stack)}")
+    with col_next:
+        if st.button("Berikutnya ➡️", key=f"{key}_next", disabled=not has_next):
+            stack.append(row_key(rows[-1]))
+            st.rerun()
+
+
 # Fungsi tampilkan tabel + export CSV
 def tabelCustomers_dan_export():
     try:
-        result_customers = view_customers()
+        total_customers = count_customers()
+        min_age, max_age = customer_age_bounds()
     except Exception as e:
         st.error(f"Gagal mengambil data pelanggan: {e}")
         return
 
-    df_customers = pd.DataFrame(result_customers, columns=[
-        "customer_id", "name", "email", "phone", "address", "birthdate",
-    ])
-
-    if not df_customers.empty:
-        # Hitung usia dari birthdate
-        df_customers['birthdate'] = pd.to_datetime(df_customers['birthdate'])
-        df_customers['Age'] = (datetime.now() - df_customers['birthdate']).dt.days // 365
-    else:
+    if min_age is None:
         st.info("Tidak ada data pelanggan untuk ditampilkan.")
         return
 
-    # Hitung jumlah pelanggan
-    total_customers = df_customers.shape[0]
-
-    # Tampilkan metrik
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric(label="📦 Total Pelanggan", value=total_customers, delta="Semua Data")
-
-    # Sidebar: Filter Rentang Usia
+    # Sidebar: Filter Rentang Usia (diteruskan ke SQL sebagai rentang birthdate)
     st.sidebar.header("Filter Rentang Usia")
-    min_age = int(df_customers['Age'].min())
-    max_age = int(df_customers['Age'].max())
     age_range = st.sidebar.slider(
         "Pilih Rentang Usia",
         min_value=min_age,
-        max_value=max_age,
+        max_value=max(max_age, min_age + 1),
         value=(min_age, max_age)
     )
 
-    # Terapkan filter usia
-    filtered_df = df_customers[df_customers['Age'].between(*age_range)]
+    try:
+        filtered_customers = count_customers(age_range)
+        result_customers, has_next = load_keyset_page(
+            "customers",
+            lambda after, limit: view_customers_page(after, limit, age_range=age_range),
+            reset_on=age_range,
+        )
+    except Exception as e:
+        st.error(f"Gagal mengambil data pelanggan: {e}")
+        return
+
+    filtered_df = pd.DataFrame(result_customers, columns=[
+        "customer_id", "name", "email", "phone", "address", "birthdate", "Age",
+    ])
+
+    # Tampilkan metrik
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="📦 Total Pelanggan", value=total_customers, delta="Semua Data")
+    with col2:
+        st.metric(label="🎯 Sesuai Filter Usia", value=filtered_customers)
 
     # Tampilkan tabel pelanggan
     st.markdown("### 📋 Tabel Data Pelanggan")
@@ -67,17 +96,22 @@ def tabelCustomers_dan_export():
     )
 
     st.dataframe(filtered_df[showdata], use_container_width=True)
-
-    csv = convert_df_to_csv(filtered_df[showdata])
-    st.download_button(
-        label="⬇️ Download Data Pelanggan sebagai CSV",
-        data=csv,
-        file_name='data_pelanggan.csv',
-        mime='text/csv'
+    keyset_pager_controls("customers", result_customers, has_next, row_key=lambda row: (row[1], row[0]))
+
+    # Ekspor semua pelanggan sesuai filter (bukan hanya halaman ini), dibuat saat diminta
+    export_columns = ['age' if col == 'Age' else col for col in showdata]
+    export_button(
+        "⬇️ Siapkan Data Pelanggan",
+        "data_pelanggan",
+        lambda fmt: export_customers(fmt, age_range=age_range, columns=export_columns),
+        key="export_customers",
     )
 
 # Sidebar untuk memilih tampilan
 st.sidebar.success("Pilih Tabel:")
+if st.sidebar.button("🔄 Muat Ulang Data"):
+    # Hasil query di-cache beberapa menit; tombol ini memaksa ambil data terbaru
+    invalidate_query_cache()
 if st.sidebar.checkbox("Tampilkan Pelanggan"):
     tabelCustomers_dan_export()
 
@@ -88,6 +122,8 @@ if st.sidebar.checkbox("Tampilkan Pelanggan"):
 def tabelProducts_dan_export():
     try:
         result_products = view_products()
+        total_products, total_stock, avg_price = products_summary()
+        result_top_stock = top_products_by_stock(10)
     except Exception as e:
         st.error(f"Gagal mengambil data produk: {e}")
         return
@@ -95,10 +131,7 @@ def tabelProducts_dan_export():
     df_products = pd.DataFrame(result_products, columns=[
         "product_id", "name", "description", "price", "stock"
     ])
-
-    total_products = df_products.shape[0]
-    total_stock = int(df_products['stock'].sum()) if not df_products.empty else 0
-    avg_price = float(df_products['price'].mean()) if not df_products.empty else 0.0
+    avg_price = to_money(avg_price)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -112,13 +145,12 @@ def tabelProducts_dan_export():
     st.dataframe(df_products, use_container_width=True)
 
     # Visual: top 10 produk berdasarkan stok
-    if not df_products.empty:
-        top_stock = df_products.sort_values('stock', ascending=False).head(10).set_index('name')
+    if result_top_stock:
+        top_stock = pd.DataFrame(result_top_stock, columns=["name", "stock"]).set_index('name')
         st.markdown("### 🔢 Top 10 Produk (Stok)")
         st.bar_chart(top_stock['stock'])
 
-    csv = convert_df_to_csv(df_products)
-    st.download_button("⬇️ Download Data Produk sebagai CSV", data=csv, file_name='data_products.csv', mime='text/csv')
+    export_button("⬇️ Siapkan Data Produk", "data_products", export_products, key="export_products")
 
 
 if st.sidebar.checkbox("Tampilkan Produk"):
@@ -130,7 +162,8 @@ if st.sidebar.checkbox("Tampilkan Produk"):
 # --------------------
 def tabelOrders_dan_export():
     try:
-        result_orders = view_orders_with_customers()
+        total_orders, total_revenue, avg_order = orders_summary()
+        result_orders, has_next = load_keyset_page("orders", view_orders_page)
     except Exception as e:
         st.error(f"Gagal mengambil data orders: {e}")
         return
@@ -139,32 +172,33 @@ def tabelOrders_dan_export():
         "order_id", "order_date", "total_amount", "customer_name", "phone"
     ])
 
-    if not df_orders.empty:
-        df_orders['order_date'] = pd.to_datetime(df_orders['order_date'])
-
-    total_orders = df_orders.shape[0]
-    total_revenue = float(df_orders['total_amount'].sum()) if not df_orders.empty else 0.0
-    avg_order = float(df_orders['total_amount'].mean()) if not df_orders.empty else 0.0
-
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric(label="🧾 Total Orders", value=total_orders)
     with col2:
-        st.metric(label="💰 Total Revenue", value=f"{total_revenue:,.2f}")
+        st.metric(label="💰 Total Revenue", value=f"{to_money(total_revenue):,.2f}")
     with col3:
-        st.metric(label="📈 Rata‑rata Order", value=f"{avg_order:,.2f}")
+        st.metric(label="📈 Rata‑rata Order", value=f"{to_money(avg_order):,.2f}")
 
     st.markdown("### 📅 Orders")
     st.dataframe(df_orders, use_container_width=True)
+    keyset_pager_controls("orders", result_orders, has_next, row_key=lambda row: (row[1], row[0]))
 
-    # Revenue over time (monthly)
-    if not df_orders.empty:
-        df_time = df_orders.set_index('order_date').resample('M')['total_amount'].sum()
-        st.markdown("### 📊 Pendapatan per Bulan")
-        st.line_chart(df_time)
+    # Revenue over time, dibaca dari tabel rollup
+    granularity = st.radio("Periode Pendapatan", ["Bulanan", "Harian"], horizontal=True)
+    try:
+        result_revenue = view_revenue_rollup('month' if granularity == "Bulanan" else 'day')
+    except Exception as e:
+        st.error(f"Gagal mengambil data pendapatan: {e}")
+        result_revenue = []
 
-    csv = convert_df_to_csv(df_orders)
-    st.download_button("⬇️ Download Data Orders sebagai CSV", data=csv, file_name='data_orders.csv', mime='text/csv')
+    if result_revenue:
+        df_time = pd.DataFrame(result_revenue, columns=["order_date", "order_count", "total_amount"])
+        df_time['total_amount'] = to_money(df_time['total_amount'])
+        st.markdown(f"### 📊 Pendapatan per {'Bulan' if granularity == 'Bulanan' else 'Hari'}")
+        st.line_chart(df_time.set_index('order_date')['total_amount'])
+
+    export_button("⬇️ Siapkan Data Orders", "data_orders", export_orders, key="export_orders")
 
 
 if st.sidebar.checkbox("Tampilkan Orders"):
@@ -174,42 +208,91 @@ if st.sidebar.checkbox("Tampilkan Orders"):
 # --------------------
 # Order Details
 # --------------------
+ORDER_DETAIL_COLUMNS = [
+    "order_detail_id", "order_id", "order_date", "customer_id", "customer_name",
+    "product_id", "product_name", "unit_price", "quantity", "subtotal", "order_total", "phone"
+]
+
 def tabelOrderDetails_dan_export():
     try:
-        result_od = view_order_details_with_info()
+        total_items, total_quantity, total_revenue = order_details_summary()
+        result_od, has_next = load_keyset_page("order_details", view_order_details_page)
+        result_top_qty = top_products_by_quantity(10)
+        result_top_revenue = top_products_by_revenue(10)
     except Exception as e:
         st.error(f"Gagal mengambil data order_details: {e}")
         return
 
-    df_od = pd.DataFrame(result_od, columns=[
-        "order_detail_id", "order_id", "order_date", "customer_id", "customer_name",
-        "product_id", "product_name", "unit_price", "quantity", "subtotal", "order_total", "phone"
-    ])
-
-    if not df_od.empty:
-        df_od['order_date'] = pd.to_datetime(df_od['order_date'])
-
-    total_items = df_od.shape[0]
-    total_revenue = float(df_od['subtotal'].sum()) if not df_od.empty else 0.0
+    df_od = pd.DataFrame(result_od, columns=ORDER_DETAIL_COLUMNS)
 
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         st.metric(label="🔢 Total Order Details", value=total_items)
     with col2:
-        st.metric(label="💵 Revenue (Detail)", value=f"{total_revenue:,.2f}")
+        st.metric(label="📦 Total Quantity", value=int(total_quantity))
+    with col3:
+        st.metric(label="💵 Revenue (Detail)", value=f"{to_money(total_revenue):,.2f}")
 
     st.markdown("### 🧾 Order Details")
     st.dataframe(df_od, use_container_width=True)
+    keyset_pager_controls("order_details", result_od, has_next, row_key=lambda row: (row[2], row[0]))
 
-    # Top products by quantity
-    if not df_od.empty:
-        top_products = df_od.groupby('product_name')['quantity'].sum().sort_values(ascending=False).head(10)
+    # Top products (agregasi GROUP BY ... LIMIT di database)
+    top_columns = ["product_name", "total_quantity", "total_revenue"]
+    if result_top_qty:
+        top_products = pd.DataFrame(result_top_qty, columns=top_columns).set_index('product_name')
         st.markdown("### 🔝 Top Produk berdasarkan Quantity")
-        st.bar_chart(top_products)
-
-    csv = convert_df_to_csv(df_od)
-    st.download_button("⬇️ Download Data Order Details sebagai CSV", data=csv, file_name='data_order_details.csv', mime='text/csv')
+        st.bar_chart(top_products['total_quantity'])
+    if result_top_revenue:
+        top_revenue = pd.DataFrame(result_top_revenue, columns=top_columns).set_index('product_name')
+        st.markdown("### 💰 Top Produk berdasarkan Revenue")
+        st.bar_chart(to_money(top_revenue['total_revenue']))
+
+    # File lengkap di-stream langsung dari database saat tombol ditekan
+    export_button(
+        "⬇️ Siapkan Data Order Details", "data_order_details", export_order_details, key="export_order_details"
+    )
 
 
 if st.sidebar.checkbox("Tampilkan Order Details"):
-    tabelOrderDetails_dan_export()
\ No newline at end of file
+    tabelOrderDetails_dan_export()
+
+# --------------------
+# Panel performa query (sidebar)
+# --------------------
+def panelPerformaQuery():
+    # Statistik dari instrumentasi di config.py: latency, jumlah baris, ukuran hasil,
+    # hit rate cache, dan rencana EXPLAIN untuk query lambat (kalau diaktifkan)
+    with st.sidebar.expander("⏱️ Performa Query"):
+        stats = query_stats()
+        if not stats:
+            st.caption("Belum ada query yang tercatat.")
+            return
+
+        df_stats = pd.DataFrame(stats).drop(columns=["histogram", "plan"])
+        st.dataframe(df_stats.round(1), use_container_width=True, hide_index=True)
+
+        cache = query_cache_stats()
+        hits = sum(q["hits"] for q in cache["queries"].values())
+        misses = sum(q["misses"] for q in cache["queries"].values())
+        hit_rate = hits / (hits + misses) if hits + misses else 0.0
+        st.caption(
+            f"Cache: {cache['entries']} entry, {cache['bytes'] / 1024 / 1024:.1f} MB, "
+            f"hit rate {hit_rate:.0%}"
+        )
+
+        for stat in stats:
+            if stat["plan"]:
+                st.markdown(f"**EXPLAIN `{stat['query']}`** ({stat['max_ms']:.0f} ms)")
+                st.code(stat["plan"], language="text")
+
+        st.download_button(
+            "⬇️ Export Statistik (JSON)", data=export_query_stats(),
+            file_name="query_stats.json", mime="application/json"
+        )
+        if st.button("Reset Statistik"):
+            reset_query_stats()
+            st.rerun()
+
+
+panelPerformaQuery()
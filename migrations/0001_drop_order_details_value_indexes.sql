@@ -0,0 +1,5 @@
+-- idx_order_details_quantity dan idx_order_details_price tidak dipakai oleh query
+-- dashboard (top-N produk dihitung dengan SUM per product_id, bukan filter/urut per
+-- baris), tetapi ikut diperbarui pada setiap INSERT/UPDATE order_details.
+DROP INDEX IF EXISTS idx_order_details_quantity;
+DROP INDEX IF EXISTS idx_order_details_price;
@@ -0,0 +1,6 @@
+-- Keyset pagination orders (view_orders_page) diurutkan dengan
+-- COALESCE(order_date, '-infinity') DESC, order_id DESC supaya order dengan
+-- order_date NULL tidak memutus paginasi. Index ini cocok persis dengan key
+-- tersebut sehingga setiap halaman cukup satu index scan mundur + LIMIT.
+CREATE INDEX IF NOT EXISTS idx_orders_keyset
+    ON orders ((COALESCE(order_date, '-infinity'::timestamp)), order_id);
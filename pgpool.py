@@ -0,0 +1,373 @@
+import io
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool
+
+from query_cache import estimate_size
+
+logger = logging.getLogger(__name__)
+
+# Pool koneksi + instrumentasi query PostgreSQL, dipakai bersama oleh config.py
+# (sales_db) dan final_project/config.py (multicultural_recipe):
+# - pool thread-safe yang baru dibuka saat query pertama; pemanggil menunggu
+#   giliran (semaphore) kalau semua koneksi sedang dipakai
+# - koneksi yang lama menganggur dicek dengan `SELECT 1` sebelum dipakai ulang
+# - query diulang sekali hanya kalau koneksinya putus (bukan karena timeout,
+#   query dibatalkan, atau error SQL)
+# - statistik per query: jumlah panggilan, error, histogram latency, baris, byte,
+#   dan (opsional) rencana EXPLAIN untuk query lambat
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def is_disconnect(exc, conn):
+    # True kalau `exc` berarti koneksinya sendiri rusak/putus (aman untuk diulang
+    # dengan koneksi lain). Statement timeout / pg_cancel_backend juga
+    # OperationalError, tetapi koneksinya masih hidup: jangan diulang.
+    if isinstance(exc, psycopg2.extensions.QueryCanceledError):
+        return False
+    return conn is not None and bool(conn.closed)
+
+
+class _HookedConnectionPool(pool.ThreadedConnectionPool):
+    # Pool yang memanggil `on_connect(conn)` untuk setiap koneksi baru (misal typecaster)
+    def __init__(self, minconn, maxconn, on_connect=None, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(minconn, maxconn, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        if self._on_connect is not None:
+            self._on_connect(conn)
+        return conn
+
+
+class QueryStats:
+    def __init__(self, explain=None, slow_query_ms=500.0, explain_slow=False):
+        # explain(query, params) -> teks rencana; dipanggil untuk query pertama yang
+        # lebih lambat dari `slow_query_ms` kalau `explain_slow` aktif
+        self.explain = explain
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._hooks = []
+
+    def add_hook(self, hook):
+        # hook(name, query, params, elapsed_ms, rows) dipanggil setelah setiap query sukses
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def record(self, name, query, params, elapsed_ms, rows=None, nbytes=None, error=None):
+        with self._lock:
+            stat = self._stats.setdefault(name, {
+                "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "rows": 0, "bytes": 0, "histogram": [0] * len(LATENCY_BUCKETS_MS), "plan": None,
+            })
+            stat["calls"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            stat["rows"] += rows or 0
+            stat["bytes"] += nbytes or 0
+            stat["histogram"][next(i for i, b in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= b)] += 1
+            if error is not None:
+                stat["errors"] += 1
+            capture_plan = (self.explain_slow and self.explain is not None and error is None
+                            and stat["plan"] is None and elapsed_ms >= self.slow_query_ms)
+        if capture_plan:
+            try:
+                plan = self.explain(query, params)
+            except psycopg2.Error as exc:
+                plan = f"EXPLAIN gagal: {exc}"
+            with self._lock:
+                stat["plan"] = plan
+        if error is None:
+            for hook in list(self._hooks):
+                hook(name, query, params, elapsed_ms, rows)
+
+    @staticmethod
+    def _percentile_ms(histogram, fraction):
+        # Perkiraan persentil dari histogram: batas atas bucket tempat persentil jatuh
+        total = sum(histogram)
+        if not total:
+            return 0.0
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+            seen += count
+            if seen >= fraction * total:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
+
+    def summary(self):
+        # Ringkasan statistik per query, diurutkan dari total waktu terbesar
+        with self._lock:
+            snapshot = {name: dict(stat, histogram=list(stat["histogram"])) for name, stat in self._stats.items()}
+        summary = []
+        for name, stat in snapshot.items():
+            summary.append({
+                "query": name,
+                "calls": stat["calls"],
+                "errors": stat["errors"],
+                "avg_ms": stat["total_ms"] / stat["calls"],
+                "p50_ms": self._percentile_ms(stat["histogram"], 0.5),
+                "p95_ms": self._percentile_ms(stat["histogram"], 0.95),
+                "max_ms": stat["max_ms"],
+                "total_ms": stat["total_ms"],
+                "rows": stat["rows"],
+                "bytes": stat["bytes"],
+                "histogram": dict(zip((str(b) for b in LATENCY_BUCKETS_MS), stat["histogram"])),
+                "plan": stat["plan"],
+            })
+        return sorted(summary, key=lambda item: item["total_ms"], reverse=True)
+
+    def export_json(self):
+        return json.dumps({"slow_query_ms": self.slow_query_ms, "queries": self.summary()}, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class Database:
+    def __init__(self, db_config, minconn=1, maxconn=10, healthcheck_seconds=30.0, on_connect=None,
+                 slow_query_ms=500.0, explain_slow=False):
+        # `db_config` dibaca saat pool dibuat (query pertama), jadi masih boleh
+        # diubah sebelum itu (misal dbname lain untuk benchmark)
+        self.db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.healthcheck_seconds = healthcheck_seconds
+        self.on_connect = on_connect
+        self.stats = QueryStats(self._explain, slow_query_ms, explain_slow)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool langsung error kalau pool habis; semaphore membuat
+        # pemanggil menunggu giliran.
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+
+    # -- pool ---------------------------------------------------------------
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = _HookedConnectionPool(self.minconn, self.maxconn, self.on_connect, **self.db_config)
+                    logger.info("Koneksi PostgreSQL berhasil (%s@%s)",
+                                self.db_config.get("dbname"), self.db_config.get("host"))
+        return self._pool
+
+    def _is_healthy(self, conn, verify=False):
+        # verify=True: selalu ping (dipakai setelah ada koneksi yang putus)
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if not verify and (last_used is None or time.monotonic() - last_used < self.healthcheck_seconds):
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _checkout(self, verify=False):
+        self._slots.acquire()
+        try:
+            # Koneksi rusak dibuang satu per satu; setelah server restart semua
+            # koneksi lama di pool bisa mati, jadi coba sampai dapat yang sehat
+            for _ in range(self.maxconn + 1):
+                conn = self._get_pool().getconn()
+                if self._is_healthy(conn, verify):
+                    return conn
+                self._last_used.pop(id(conn), None)
+                self._get_pool().putconn(conn, close=True)
+            raise psycopg2.OperationalError("Tidak ada koneksi PostgreSQL yang sehat di pool")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken=False):
+        try:
+            if broken or conn.closed:
+                self._last_used.pop(id(conn), None)
+                self._get_pool().putconn(conn, close=True)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._get_pool().putconn(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, verify=False):
+        # Pinjam satu koneksi dari pool. Commit kalau sukses, rollback kalau gagal
+        # supaya transaksi yang gagal tidak ikut terbawa ke pemakai berikutnya.
+        conn = self._checkout(verify)
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as exc:
+            # BaseException juga: generator streaming yang ditutup di tengah jalan
+            # (GeneratorExit) tetap harus di-rollback sebelum koneksi dikembalikan.
+            broken = isinstance(exc, psycopg2.Error) and is_disconnect(exc, conn)
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self._release(conn, broken=broken)
+
+    def close(self):
+        # Tutup semua koneksi di pool (misal saat proses dihentikan)
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    # -- eksekusi query -----------------------------------------------------
+
+    def _explain(self, query, params):
+        # Rencana eksekusi lengkap (query dijalankan ulang oleh ANALYZE)
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+            return "\n".join(row[0] for row in cur.fetchall())
+
+    def fetchall(self, name, query, params=None):
+        # Jalankan query; kembalikan (nama kolom, baris). Kalau koneksinya putus
+        # di tengah jalan, ulangi sekali dengan koneksi lain yang sudah diping.
+        start = time.perf_counter()
+        for attempt in range(2):
+            conn = None
+            try:
+                with self.connection(verify=attempt > 0) as conn, conn.cursor() as cur:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+                    columns = [desc[0] for desc in cur.description] if cur.description else []
+                break
+            except psycopg2.Error as exc:
+                if attempt or not is_disconnect(exc, conn):
+                    self.stats.record(name, query, params, (time.perf_counter() - start) * 1000, error=exc)
+                    raise
+                logger.warning("Koneksi PostgreSQL putus saat %s, diulang dengan koneksi baru", name)
+        self.stats.record(name, query, params, (time.perf_counter() - start) * 1000,
+                          rows=len(rows), nbytes=estimate_size(rows))
+        return columns, rows
+
+    def describe(self, query, params=None):
+        # Kolom hasil query tanpa mengambil baris (`LIMIT 0`): daftar cursor.description
+        # (nama, OID tipe, ..., precision, scale), misal untuk skema file ekspor.
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM ({query}) AS describe_q LIMIT 0", params)
+            return list(cur.description)
+
+    def stream(self, name, query, params=None, batch_size=5000):
+        # Generator (kolom, baris) per batch lewat named (server-side) cursor, jadi
+        # memori yang dipakai hanya sebesar satu batch. Koneksi dipinjam selama
+        # generator masih dibaca; waktunya termasuk waktu pemakai memproses tiap batch.
+        start = time.perf_counter()
+        total_rows = 0
+        total_bytes = 0
+        with self.connection() as conn:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    total_bytes += estimate_size(rows)
+                    yield [desc[0] for desc in cur.description], rows
+        self.stats.record(name, query, params, (time.perf_counter() - start) * 1000,
+                          rows=total_rows, nbytes=total_bytes)
+
+    def copy_csv(self, name, query, params=None, out=None):
+        # `COPY (query) TO STDOUT` sebagai CSV dengan header: Postgres langsung
+        # mengirim teks CSV tanpa tuple Python per baris. Ditulis ke `out`
+        # (file-like binary) atau dikembalikan sebagai bytes.
+        buf = out if out is not None else io.BytesIO()
+        offset = buf.tell()
+        start = time.perf_counter()
+        with self.connection() as conn, conn.cursor() as cur:
+            sql = cur.mogrify(query, params)
+            cur.copy_expert(b"COPY (" + sql + b") TO STDOUT WITH (FORMAT csv, HEADER true)", buf)
+            rows = max(cur.rowcount, 0)
+        self.stats.record(name, query, params, (time.perf_counter() - start) * 1000,
+                          rows=rows, nbytes=buf.tell() - offset)
+        if out is None:
+            return buf.getvalue()
+        return out
+
+    def fetch_frame(self, name, query, params=None, parse_dates=None, as_arrow=False):
+        # Hasil COPY langsung ke bentuk kolom: pyarrow.Table (as_arrow=True) atau
+        # pandas DataFrame. pandas/pyarrow di-import di sini supaya cold start murah.
+        buf = io.BytesIO(self.copy_csv(name, query, params))
+        return read_copy_csv(buf, parse_dates=parse_dates, as_arrow=as_arrow)
+
+
+def read_copy_csv(buf, parse_dates=None, as_arrow=False):
+    # Parse keluaran `COPY ... (FORMAT csv, HEADER true)`. COPY menulis NULL sebagai
+    # field kosong tanpa kutip dan string kosong sebagai "", jadi hanya field kosong
+    # tanpa kutip yang dianggap NULL (teks "NA"/"null" tetap teks), dan baris kosong
+    # (NULL pada hasil satu kolom) tidak dibuang. Kolom DATE menjadi datetime64 di
+    # pandas; kolom `parse_dates` dijadikan timestamp di kedua bentuk.
+    parse_dates = list(parse_dates or ())
+    try:
+        import pyarrow.csv as pa_csv
+    except ImportError:  # pyarrow opsional, fallback ke parser CSV pandas
+        pa_csv = None
+    if pa_csv is None:
+        if as_arrow:
+            raise RuntimeError("as_arrow=True membutuhkan paket pyarrow")
+        import pandas as pd
+
+        # pandas tidak bisa membedakan "" dari NULL; keduanya menjadi NaN
+        return pd.read_csv(buf, parse_dates=parse_dates, keep_default_na=False, na_values=[""],
+                           skip_blank_lines=False)
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    parse_options = pa_csv.ParseOptions(ignore_empty_lines=False)
+    convert_options = pa_csv.ConvertOptions(
+        null_values=[""],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+        timestamp_parsers=[pa_csv.ISO8601],
+    )
+    table = pa_csv.read_csv(buf, parse_options=parse_options, convert_options=convert_options)
+    for column in parse_dates:
+        index = table.schema.get_field_index(column)
+        if index >= 0 and not pa.types.is_timestamp(table.schema.field(index).type):
+            table = table.set_column(index, column, pc.cast(table.column(index), pa.timestamp("us")))
+    if as_arrow:
+        return table
+    return table.to_pandas(date_as_object=False)
+
+
+def caller_name(module_globals, depth=2, skip=()):
+    # Nama fungsi publik di modul `module_globals` yang memicu query (misal "view_customers").
+    # `skip`: helper publik (fetch_dataframe, export_query, ...) yang dilewati supaya
+    # query dicatat atas nama fungsi yang memanggil helper tersebut.
+    frame = sys._getframe(depth)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if frame.f_globals is module_globals and not name.startswith("_") and name not in skip:
+            return name
+        frame = frame.f_back
+    return "<query>"
@@ -0,0 +1,106 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# Cache hasil query di memori proses, dipakai bersama oleh semua sesi Streamlit.
+# - TTL per query (ditentukan di decorator)
+# - LRU dengan batas ukuran memori (perkiraan byte)
+# - counter hit/miss per query dan API invalidasi
+
+
+def estimate_size(value, sample=100):
+    # Perkiraan ukuran (byte) hasil query. Untuk list baris, hanya `sample`
+    # baris pertama yang diukur lalu diekstrapolasi supaya murah.
+    if isinstance(value, (list, tuple)):
+        size = sys.getsizeof(value)
+        if not value:
+            return size
+        head = value[:sample]
+        head_size = sum(estimate_size(item, sample) for item in head)
+        return size + head_size * len(value) // len(head)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, sample) + estimate_size(v, sample) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {}  # nama query -> {"hits", "misses"}
+        self.evictions = 0
+
+    def _count(self, name, field):
+        self._stats.setdefault(name, {"hits": 0, "misses": 0})[field] += 1
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key):
+        # Kembalikan (True, value) kalau ada dan belum kedaluwarsa, selain itu (False, None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count(key[0], "hits")
+                return True, entry[2]
+            if entry is not None:
+                self._drop(key)
+            self._count(key[0], "misses")
+            return False, None
+
+    def set(self, key, value, ttl):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # Hasil yang lebih besar dari seluruh cache tidak disimpan
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, name=None):
+        # Hapus semua entry (name=None) atau hanya entry milik satu fungsi query
+        with self._lock:
+            for key in [k for k in self._entries if name is None or k[0] == name]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "queries": {name: dict(counts) for name, counts in self._stats.items()},
+            }
+
+    def cached(self, ttl):
+        # Decorator: cache hasil fungsi berdasarkan nama + argumennya selama `ttl` detik.
+        # Hasil dipakai bersama antar sesi, jadi jangan diubah oleh pemanggil.
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (func.__name__, args, tuple(sorted(kwargs.items())))
+                found, value = self.get(key)
+                if found:
+                    return value
+                value = func(*args, **kwargs)
+                self.set(key, value, ttl)
+                return value
+
+            wrapper.invalidate = lambda: self.invalidate(func.__name__)
+            return wrapper
+        return decorator
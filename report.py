@@ -0,0 +1,197 @@
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from charts import CHART_KINDS, draw_chart, frame_digest
+from query_cache import QueryCache
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # pypdf opsional, tanpa pypdf halaman dirender serial di proses ini
+    PdfWriter = None
+
+# Laporan PDF multi-halaman untuk restaurant_app.py:
+# - chart digambar langsung (vektor) di halaman letter, tanpa PNG sementara + imshow
+# - halaman dirender paralel di process pool lalu digabung dengan pypdf (kalau terpasang);
+#   pool "spawn" baru dipakai setelah worker-nya siap (laporan pertama tetap serial) dan
+#   hanya dipertahankan kalau memang lebih cepat dari render serial
+# - bytes PDF di-cache berdasarkan hash isi DataFrame + opsi laporan
+
+PAGE_SIZE = (8.5, 11)
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_CACHE_TTL = float(os.environ.get("REPORT_CACHE_TTL", "3600"))
+
+STEPS = [
+    "1. Siapkan dataset menu (item, price, sold_month, rating, lat, lon).",
+    "2. Gunakan filter untuk memilih subset menu.",
+    "3. Pilih visualisasi lalu interpretasikan hasil.",
+    "4. Ekspor laporan PDF berisi grafik dan penjelasan.",
+]
+
+report_cache = QueryCache(max_bytes=int(os.environ.get("REPORT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+
+_executor = None
+_executor_lock = threading.Lock()
+_warmup = None  # future warm-up worker pool (None = belum dimulai)
+# Waktu render per halaman per mode (detik, sampel warm pertama); dipakai build_pdf_report(parallel=None)
+_page_seconds = {"serial": None, "parallel": None}
+
+
+def _get_executor():
+    # Pool dibuat sekali (saat laporan pertama) dan dipakai ulang; "spawn" karena server Streamlit multi-thread
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                import multiprocessing
+
+                _executor = ProcessPoolExecutor(REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor(wait=True):
+    global _executor, _warmup
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+        _warmup = None
+
+
+def _warm_worker():
+    # Dijalankan sekali di tiap worker: import matplotlib + backend PDF sebelum laporan pertama
+    from matplotlib.backends import backend_pdf  # noqa: F401
+    from matplotlib.figure import Figure  # noqa: F401
+
+
+def _pool_warm():
+    return _warmup is not None and all(future.done() for future in _warmup)
+
+
+def _start_warmup():
+    # Mulai warm-up pool di background (spawn + import ~1-2 s per worker) kalau belum,
+    # supaya render paralel berikutnya tidak menanggung cold start
+    global _warmup
+    executor = _get_executor()
+    with _executor_lock:
+        if _warmup is None:
+            _warmup = [executor.submit(_warm_worker) for _ in range(REPORT_WORKERS)]
+
+
+def _parallel_wins():
+    # None = belum bisa diputuskan (salah satu mode belum terukur dalam keadaan warm)
+    serial, parallel = _page_seconds["serial"], _page_seconds["parallel"]
+    if serial is None or parallel is None:
+        return None
+    return parallel < serial
+
+
+def _choose_parallel():
+    # parallel=None: serial sampai waktu serial (warm) terukur dan pool sudah siap, lalu paralel
+    # sekali untuk diukur; setelah itu mode yang lebih cepat per halaman. Kalau paralel kalah,
+    # pool dimatikan dan tidak dibuat lagi.
+    if REPORT_WORKERS <= 1 or PdfWriter is None:
+        return False
+    wins = _parallel_wins()
+    if wins is not None:
+        return wins
+    return _page_seconds["serial"] is not None and _pool_warm()
+
+
+def draw_page(page, df, fig, end=None):
+    # Isi satu halaman laporan ke `fig`: "cover", "steps", atau salah satu CHART_KINDS
+    # (end = tanggal terakhir simulasi tren, diteruskan ke draw_chart)
+    if page == "cover":
+        fig.text(0.5, 0.7, "Laporan Warung Nasi Padang", ha="center", fontsize=20, weight="bold")
+        fig.text(0.5, 0.62, "10 menu populer", ha="center", fontsize=12)
+        fig.text(0.1, 0.44, "\nLaporan ini berisi visualisasi (bar, pie, line, area)\ndan ringkasan data menu Warung Nasi Padang.", fontsize=10)
+    elif page == "steps":
+        fig.text(0.1, 0.9, "Langkah-langkah:", fontsize=14, weight="bold")
+        for n, step in enumerate(STEPS):
+            fig.text(0.1, 0.82 - 0.06 * n, step, fontsize=10)
+    else:
+        # Chart menempati bagian atas halaman; ruang bawah untuk label sumbu dan penjelasan
+        ax = fig.add_axes([0.12, 0.45, 0.8, 0.42])
+        title, explanation = draw_chart(page, df, ax, end=end)
+        fig.suptitle(title)
+        fig.text(0.1, 0.05, explanation, fontsize=10)
+
+
+def _new_page():
+    # Figure tanpa pyplot: tidak masuk registry figure global, cukup dilepas setelah disimpan
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=PAGE_SIZE)
+
+
+def render_page(page, df, end=None):
+    # Render satu halaman sebagai PDF satu halaman (dijalankan di proses worker)
+    buf = io.BytesIO()
+    fig = _new_page()
+    draw_page(page, df, fig, end)
+    fig.savefig(buf, format="pdf")
+    return buf.getvalue()
+
+
+def _render_serial(pages, df, end):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    buf = io.BytesIO()
+    with PdfPages(buf) as pdf:
+        for page in pages:
+            fig = _new_page()
+            draw_page(page, df, fig, end)
+            pdf.savefig(fig)
+    return buf.getvalue()
+
+
+def _render_parallel(pages, df, end):
+    rendered = list(_get_executor().map(render_page, pages, [df] * len(pages), [end] * len(pages)))
+    writer = PdfWriter()
+    for data in rendered:
+        writer.append(io.BytesIO(data))
+    # Font yang sama ter-embed di tiap halaman; simpan sekali saja
+    writer.compress_identical_objects()
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def build_pdf_report(df, kinds=tuple(CHART_KINDS), parallel=None, end=None):
+    # Bytes PDF berisi cover, langkah, dan satu halaman per chart di `kinds`.
+    # Hasil di-cache: DataFrame dengan isi yang sama + opsi yang sama langsung dikembalikan.
+    # parallel=None: pilih otomatis (lihat _choose_parallel); True/False memaksa mode tertentu
+    # end: tanggal terakhir simulasi tren (None = hari ini); ikut jadi kunci cache supaya
+    #      laporan yang di-cache kemarin tidak dipakai ulang dengan tanggal lama
+    kinds = tuple(kinds)
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    key = ("build_pdf_report", frame_digest(df), kinds, end)
+    found, pdf = report_cache.get(key)
+    if found:
+        return pdf
+
+    pages = ["cover", "steps", *kinds]
+    auto = parallel is None
+    parallel = _choose_parallel() if auto else parallel and PdfWriter is not None
+    mode = "parallel" if parallel else "serial"
+    # Pembanding = render pertama tiap mode yang tidak menanggung cold start (import matplotlib,
+    # spawn worker) dan tidak berebut CPU dengan warm-up pool; setelah itu keputusan tetap
+    warm = _pool_warm() if parallel else "matplotlib.figure" in sys.modules and _warmup is None
+    start = time.perf_counter()
+    pdf = _render_parallel(pages, df, end) if parallel else _render_serial(pages, df, end)
+    if warm and _page_seconds[mode] is None:
+        _page_seconds[mode] = (time.perf_counter() - start) / len(pages)
+    if auto and REPORT_WORKERS > 1 and PdfWriter is not None:
+        # Warm-up/shutdown pool dilakukan setelah laporan selesai, jadi tidak memperlambatnya
+        wins = _parallel_wins()
+        if wins is None and _page_seconds["serial"] is not None:
+            _start_warmup()
+        elif wins is False and _executor is not None:
+            shutdown_executor(wait=False)
+    report_cache.set(key, pdf, REPORT_CACHE_TTL)
+    return pdf
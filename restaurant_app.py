@@ -1,15 +1,14 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-import io
-import pydeck as pdk
+
+from charts import CHART_KINDS, chart_cache_stats, render_chart
+from export import build_export, export_button
+from report import build_pdf_report
 
 # Restaurant dashboard (Warung Nasi Padang)
 # - Membuat dataset contoh menu
 # - Menyediakan beberapa visualisasi (bar, pie, line, area) dan peta
-# - Menghasilkan laporan PDF multi-halaman dari grafik-grafik tersebut
+# - Menghasilkan laporan PDF multi-halaman dari grafik-grafik tersebut (lihat report.py)
 
 
 @st.cache_data
@@ -47,124 +46,22 @@ def make_menu_dataset():
     return df
 
 
-@st.cache_data
-def convert_df_to_csv(_df):
-   
-    # Konversi DataFrame ke CSV bytes (utf-8) untuk diunduh lewat Streamlit.
-
-    # Input: `_df` (pandas.DataFrame)
-    # Output: bytes CSV siap dipakai di `st.download_button`.
-   
-    return _df.to_csv(index=False).encode("utf-8")
-
-
-def create_chart(kind, df):
+def create_chart(kind, df, end=None):
     
-    # Buat matplotlib Figure untuk tipe chart tertentu berdasarkan `df`.
+    # Render chart tertentu berdasarkan `df` menjadi gambar PNG.
 
     # Parameter:
     # - kind: salah satu dari "Bar - Revenue", "Pie - Share", "Line - Top 3 Trend", atau default (area)
     # - df: DataFrame yang berisi kolom minimal `item`, `revenue`, dan/atau `sold_month`
+    # - end: tanggal terakhir simulasi tren (None = hari ini)
 
-    # Mengembalikan (fig, title, explanation) — objek figure, judul, dan teks penjelasan singkat.
-    
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    if kind == "Bar - Revenue":
-        ax.bar(df["item"], df["revenue"], color="#2b8cbe")
-        ax.set_ylabel("Revenue (IDR)")
-        ax.set_xticklabels(df["item"], rotation=45, ha="right")
-        title = "Revenue per Menu"
-        explanation = "Bar chart menunjukkan kontribusi pendapatan tiap menu."
-    elif kind == "Pie - Share":
-        ax.pie(df["revenue"], labels=df["item"], autopct="%1.1f%%")
-        title = "Komposisi Revenue"
-        explanation = "Pie chart menunjukkan persentase kontribusi pendapatan tiap menu."
-    elif kind == "Line - Top 3 Trend":
-        top3 = df.sort_values("revenue", ascending=False).head(3)["item"].tolist()
-        days = pd.date_range(end=pd.Timestamp.today(), periods=14)
-        sim = pd.DataFrame(index=days)
-        for it in top3:
-            base = int(df.loc[df["item"] == it, "sold_month"].values[0] / 14)
-            sim[it] = np.clip(base + np.random.randint(-2, 5, size=len(days)).cumsum(), 0, None)
-        for col in sim.columns:
-            ax.plot(sim.index, sim[col], marker="o", label=col)
-        ax.set_ylabel("Simulated Daily Sales")
-        ax.legend()
-        title = "Simulasi Tren Harian - Top 3"
-        explanation = "Line chart simulasi untuk tiga menu teratas berdasarkan revenue."
-    else:
-        ax.fill_between(df["item"], df["sold_month"], color="#fb9a99", alpha=0.6)
-        ax.plot(df["item"], df["sold_month"], marker="o", color="#fb9a99")
-        ax.set_ylabel("Jumlah Terjual (bulan)")
-        ax.set_xticklabels(df["item"], rotation=45, ha="right")
-        title = "Volume Orders per Menu"
-        explanation = "Area chart menunjukkan volume pesanan per menu (bulanan)."
-
-    fig.suptitle(title)
-    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
-    return fig, title, explanation
-
-
-def build_pdf_report(df):
-    
-    # Bangun file PDF (bytes) berisi cover, langkah, dan tiap chart sebagai halaman.
-
-    # Alur:
-    # - Buat `PdfPages` pada buffer memori
-    # - Tambahkan halaman cover (teks)
-    # - Tambahkan halaman instruksi/langkah
-    # - Untuk setiap jenis chart: render chart ke PNG sementara, lalu masukkan ke halaman PDF
-
-    # Kembalian: bytes PDF siap diunduh.
-  
-    buf = io.BytesIO()
-    with PdfPages(buf) as pdf:
-        # Cover
-        fig = plt.figure(figsize=(8.5, 11))
-        fig.clf()
-        fig.text(0.5, 0.7, "Laporan Warung Nasi Padang", ha="center", fontsize=20, weight="bold")
-        fig.text(0.5, 0.62, "10 menu populer", ha="center", fontsize=12)
-        fig.text(0.1, 0.44, "\nLaporan ini berisi visualisasi (bar, pie, line, area)\ndan ringkasan data menu Warung Nasi Padang.", fontsize=10)
-        pdf.savefig(fig)
-        plt.close(fig)
-
-        # Steps
-        fig = plt.figure(figsize=(8.5, 11))
-        fig.clf()
-        steps = [
-            "1. Siapkan dataset menu (item, price, sold_month, rating, lat, lon).",
-            "2. Gunakan filter untuk memilih subset menu.",
-            "3. Pilih visualisasi lalu interpretasikan hasil.",
-            "4. Ekspor laporan PDF berisi grafik dan penjelasan.",
-        ]
-        fig.text(0.1, 0.9, "Langkah-langkah:", fontsize=14, weight="bold")
-        y = 0.82
-        for s in steps:
-            fig.text(0.1, y, s, fontsize=10)
-            y -= 0.06
-        pdf.savefig(fig)
-        plt.close(fig)
-
-        # Charts
-        kinds = ["Bar - Revenue", "Pie - Share", "Line - Top 3 Trend", "Area - Orders"]
-        for k in kinds:
-            fig, title, explanation = create_chart(k, df)
-            tmp = io.BytesIO()
-            fig.savefig(tmp, format="png", bbox_inches='tight')
-            plt.close(fig)
-            tmp.seek(0)
-            img = plt.imread(tmp)
-            fig2 = plt.figure(figsize=(8.5, 11))
-            ax = fig2.add_subplot(111)
-            ax.axis('off')
-            ax.imshow(img)
-            fig2.text(0.1, 0.05, explanation, fontsize=10)
-            fig2.suptitle(title)
-            pdf.savefig(fig2)
-            plt.close(fig2)
-
-    buf.seek(0)
-    return buf.getvalue()
+    # Mengembalikan (png, title, explanation) — bytes gambar, judul, dan teks penjelasan singkat.
+    # Gambar di-cache per jenis chart + isi `df` + tanggal (lihat charts.render_chart), jadi filter
+    # yang menghasilkan subset yang sama tidak menggambar ulang dan tidak membuat figure baru,
+    # sedangkan simulasi tren tetap berakhir di hari ini setelah tanggal berganti.
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    png, (title, explanation) = render_chart(kind, df, end=end)
+    return png, title, explanation
 
 
 def main():
@@ -186,6 +83,8 @@ def main():
 
     # Load dataset (cached)
     df = make_menu_dataset()
+    # Tanggal akhir simulasi tren untuk chart dan PDF (ikut jadi kunci cache keduanya)
+    today = pd.Timestamp.today().normalize()
 
     # --- Metrics: ringkasan cepat
     total_revenue = df["revenue"].sum()
@@ -209,8 +108,8 @@ def main():
         st.subheader("Daftar Menu")
         # Tampilkan tabel yang sudah diformat
         st.dataframe(df.style.format({"price": "Rp {:,.0f}", "revenue": "Rp {:,.0f}"}))
-        csv = convert_df_to_csv(df)
-        st.download_button("⬇️ Download CSV", data=csv, file_name="menu_padang.csv", mime="text/csv")
+        # File ekspor hanya dibuat saat tombol ditekan
+        export_button("⬇️ Siapkan File", "menu_padang", lambda fmt: build_export([df], fmt), key="export_menu")
 
         # Filter untuk mempermudah analisis subset
         st.subheader("Filter")
@@ -222,7 +121,7 @@ def main():
 
     with right:
         st.subheader("Visualisasi")
-        chart_choice = st.selectbox("Pilih chart", ["Bar - Revenue", "Pie - Share", "Line - Top 3 Trend", "Area - Orders", "Map"])
+        chart_choice = st.selectbox("Pilih chart", [*CHART_KINDS, "Map"])
 
         # Terapkan filter
         filtered = df[(df["price"] >= price_range[0]) & (df["price"] <= price_range[1]) & (df["sold_month"] >= sold_filter)]
@@ -231,7 +130,9 @@ def main():
             st.info("Tidak ada data sesuai filter.")
         else:
             if chart_choice == "Map":
-                # Map: gunakan pydeck untuk peta interaktif
+                # Map: gunakan pydeck untuk peta interaktif (di-import hanya kalau peta dipilih)
+                import pydeck as pdk
+
                 st.markdown("**Peta lokasi (Balikpapan)**")
                 mid_lat = filtered["lat"].mean()
                 mid_lon = filtered["lon"].mean()
@@ -253,11 +154,13 @@ def main():
                 st.pydeck_chart(deck)
                 st.caption("Klik titik untuk melihat nama menu dan revenue (tooltip).")
             else:
-                # Non-map charts: render matplotlib figure yang dikembalikan create_chart
-                fig, title, explanation = create_chart(chart_choice, filtered)
-                st.pyplot(fig)
+                # Non-map charts: gambar PNG dari create_chart (di-cache, tanpa figure pyplot)
+                png, title, explanation = create_chart(chart_choice, filtered, end=today)
+                st.image(png, use_container_width=True)
                 st.markdown(f"**{title}**")
                 st.write(explanation)
+                stats = chart_cache_stats()
+                st.caption(f"Cache chart: {stats['entries']} gambar, hit rate {stats['hit_rate']:.0%}")
 
     # Footer / about
     st.markdown("---")
@@ -276,7 +179,7 @@ def main():
     st.markdown("## Ekspor Laporan PDF")
     if st.button("Generate PDF Report"):
         with st.spinner("Membuat PDF…"):
-            pdf = build_pdf_report(df)
+            pdf = build_pdf_report(df, end=today)
             st.success("Selesai — unduh laporan")
             st.download_button("Download PDF", data=pdf, file_name="report_warung_padang.pdf", mime="application/pdf")
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modul root repo (pgpool.py, query_cache.py, charts.py, ...) di-import langsung oleh test
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from charts import draw_chart, simulate_trend
+
+MENU = pd.DataFrame({
+    "item": ["Rendang", "Ayam Pop", "Gulai Ikan", "Sayur Nangka"],
+    "revenue": [900_000, 700_000, 400_000, 150_000],
+    "sold_month": [120, 95, 60, 30],
+})
+END = "2024-05-31"
+
+
+def test_simulate_trend_is_deterministic():
+    first = simulate_trend(MENU, end=END)
+    pd.testing.assert_frame_equal(first, simulate_trend(MENU.sample(frac=1, random_state=1), end=END))
+    assert first.columns.tolist() == ["Rendang", "Ayam Pop", "Gulai Ikan"]
+    assert first.shape == (14, 3)
+    assert first.index[-1] == pd.Timestamp(END)
+    assert (first.to_numpy() >= 0).all()
+
+    seeded = simulate_trend(MENU, seed=42, end=END)
+    pd.testing.assert_frame_equal(seeded, simulate_trend(MENU, seed=42, end=END))
+    assert not seeded.equals(simulate_trend(MENU, seed=43, end=END))
+
+
+def test_simulate_trend_depends_on_data():
+    changed = MENU.assign(sold_month=MENU["sold_month"] + 1)
+    assert not simulate_trend(MENU, end=END).equals(simulate_trend(changed, end=END))
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_simulate_trend_rejects_empty_top_k(top_k):
+    with pytest.raises(ValueError):
+        simulate_trend(MENU, top_k=top_k, end=END)
+
+
+def test_trend_chart_without_menu_draws_no_lines():
+    figure = pytest.importorskip("matplotlib.figure")
+    ax = figure.Figure().add_subplot()
+    title, _ = draw_chart("Line - Top 3 Trend", MENU.iloc[:0], ax, end=END)
+    assert title == "Simulasi Tren Harian - Top 3"
+    assert not ax.lines and ax.get_legend() is None
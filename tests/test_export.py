@@ -0,0 +1,43 @@
+import io
+
+import pandas as pd
+import pytest
+
+from export import build_export, write_parquet
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _read(data):
+    return pq.read_table(io.BytesIO(data))
+
+
+def test_parquet_column_null_in_first_chunk():
+    frames = [
+        pd.DataFrame({"id": [1, 2], "note": [None, None]}),
+        pd.DataFrame({"id": [3, None], "note": ["x", None]}),
+    ]
+    table = _read(build_export(frames, "parquet"))
+    assert table.num_rows == 4
+    assert table.column("note").to_pylist() == [None, None, "x", None]
+    assert table.column("id").to_pylist() == [1, 2, 3, None]
+
+
+def test_parquet_without_rows_keeps_schema():
+    schema = pa.schema([("id", pa.int64()), ("name", pa.string())])
+    out = io.BytesIO()
+    write_parquet([], out, schema=schema)
+    table = _read(out.getvalue())
+    assert table.num_rows == 0
+    assert table.schema.equals(schema)
+
+
+def test_parquet_casts_chunks_to_given_schema():
+    schema = pa.schema([("id", pa.int64()), ("name", pa.string())])
+    out = io.BytesIO()
+    write_parquet([pd.DataFrame({"id": [1], "name": [None]}), pd.DataFrame({"id": [2], "name": ["b"]})],
+                  out, schema=schema)
+    table = _read(out.getvalue())
+    assert table.schema.equals(schema)
+    assert table.column("name").to_pylist() == [None, "b"]
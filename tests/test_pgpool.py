@@ -0,0 +1,69 @@
+import io
+import os
+
+import pandas as pd
+import psycopg2
+import pytest
+
+from pgpool import Database, read_copy_csv
+
+pa = pytest.importorskip("pyarrow")
+
+# Keluaran `COPY ... TO STDOUT WITH (FORMAT csv, HEADER true)`: NULL = field kosong
+# tanpa kutip, string kosong = "".
+COPY_CSV = (
+    b"name,note,order_day,created_at,qty\n"
+    b'Nasi Goreng,"",2024-01-02,2024-01-02 10:00:00,3\n'
+    b",NA,,,\n"
+)
+
+
+def test_read_copy_csv_keeps_null_strings_and_dates():
+    df = read_copy_csv(io.BytesIO(COPY_CSV))
+    assert pd.isna(df.loc[1, "name"])
+    assert df.loc[0, "note"] == ""
+    assert df.loc[1, "note"] == "NA"
+    assert pd.api.types.is_datetime64_any_dtype(df["order_day"])
+    assert pd.api.types.is_datetime64_any_dtype(df["created_at"])
+    assert df.loc[0, "order_day"] == pd.Timestamp("2024-01-02")
+    assert pd.isna(df.loc[1, "order_day"])
+
+
+def test_read_copy_csv_parse_dates_on_arrow_table():
+    buf = io.BytesIO(b"day\n2024-01-02\n\n")
+    table = read_copy_csv(buf, parse_dates=["day"], as_arrow=True)
+    assert pa.types.is_timestamp(table.schema.field("day").type)
+    assert table.column("day").null_count == 1
+
+
+@pytest.fixture(scope="module")
+def db():
+    config = {
+        "host": os.environ.get("PGHOST", "localhost"),
+        "port": os.environ.get("PGPORT", "5432"),
+        "user": os.environ.get("PGUSER", "postgres"),
+        "password": os.environ.get("PGPASSWORD", ""),
+        "dbname": os.environ.get("PGDATABASE", "postgres"),
+    }
+    try:
+        psycopg2.connect(**config).close()
+    except psycopg2.OperationalError as exc:
+        pytest.skip(f"PostgreSQL tidak tersedia: {exc}")
+    database = Database(config, 1, 2)
+    yield database
+    database.close()
+
+
+def test_fetch_frame_null_text_and_date_column(db):
+    df = db.fetch_frame(
+        "test",
+        "SELECT * FROM (VALUES ('a'::text, DATE '2024-01-02', '2024-01-02'::text),"
+        " (NULL, NULL, NULL), ('', DATE '2024-03-04', '2024-03-04')) AS t(label, day, day_text)",
+        parse_dates=["day_text"],
+    )
+    assert df["label"].tolist()[0] == "a"
+    assert pd.isna(df.loc[1, "label"])
+    assert df.loc[2, "label"] == ""
+    assert pd.api.types.is_datetime64_any_dtype(df["day"])
+    assert pd.api.types.is_datetime64_any_dtype(df["day_text"])
+    assert df.loc[2, "day"] == pd.Timestamp("2024-03-04")
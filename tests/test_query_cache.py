@@ -0,0 +1,83 @@
+import pytest
+
+import query_cache
+from query_cache import QueryCache, estimate_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(query_cache.time, "monotonic", fake)
+    return fake
+
+
+def _value(n):
+    # Nilai dengan ukuran (perkiraan) yang sama untuk setiap n
+    return "x" * n
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = QueryCache()
+    cache.set(("q", (), ()), [1, 2], ttl=10)
+    assert cache.get(("q", (), ())) == (True, [1, 2])
+    clock.now += 10
+    assert cache.get(("q", (), ())) == (False, None)
+    stats = cache.stats()
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+    assert stats["queries"]["q"] == {"hits": 1, "misses": 1}
+
+
+def test_lru_eviction_is_bounded_by_bytes(clock):
+    size = estimate_size(_value(1000))
+    cache = QueryCache(max_bytes=3 * size)
+    for name in ("a", "b", "c"):
+        cache.set((name, (), ()), _value(1000), ttl=60)
+    # "a" dipakai lagi -> "b" yang paling lama tidak dipakai
+    assert cache.get(("a", (), ()))[0]
+    cache.set(("d", (), ()), _value(1000), ttl=60)
+    assert not cache.get(("b", (), ()))[0]
+    assert all(cache.get((name, (), ()))[0] for name in ("a", "c", "d"))
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 3 * size <= stats["max_bytes"]
+
+    # Satu entry besar bisa menggusur beberapa entry sekaligus
+    cache.set(("big", (), ()), _value(2000), ttl=60)
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.get(("big", (), ()))[0]
+
+
+def test_oversized_value_and_overwrite_keep_byte_count(clock):
+    cache = QueryCache(max_bytes=estimate_size(_value(100)))
+    cache.set(("q", (1,), ()), _value(10_000), ttl=60)
+    assert cache.stats()["entries"] == 0
+    cache.set(("q", (1,), ()), _value(50), ttl=60)
+    cache.set(("q", (1,), ()), _value(60), ttl=60)
+    assert cache.stats()["bytes"] == estimate_size(_value(60))
+
+
+def test_cached_decorator_and_invalidate(clock):
+    cache = QueryCache()
+    calls = []
+
+    @cache.cached(ttl=5)
+    def view_items(limit, offset=0):
+        calls.append((limit, offset))
+        return [limit, offset]
+
+    assert view_items(10) == view_items(10) == [10, 0]
+    assert view_items(10, offset=5) == [10, 5]
+    assert calls == [(10, 0), (10, 5)]
+    view_items.invalidate()
+    view_items(10)
+    clock.now += 5
+    view_items(10)
+    assert calls == [(10, 0), (10, 5), (10, 0), (10, 0)]
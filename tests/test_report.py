@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+import report
+
+MENU = pd.DataFrame({
+    "item": ["Rendang", "Ayam Pop", "Gulai Ikan"],
+    "revenue": [900_000, 700_000, 400_000],
+    "sold_month": [120, 95, 60],
+})
+
+
+@pytest.fixture
+def auto_mode(monkeypatch):
+    monkeypatch.setattr(report, "REPORT_WORKERS", 4)
+    monkeypatch.setattr(report, "PdfWriter", object())
+    monkeypatch.setattr(report, "_page_seconds", {"serial": None, "parallel": None})
+    monkeypatch.setattr(report, "_warmup", None)
+    return report._page_seconds
+
+
+def test_cold_start_renders_serially(auto_mode):
+    assert report._choose_parallel() is False
+    auto_mode["serial"] = 0.1
+    # Pool belum di-warm-up: tetap serial
+    assert report._choose_parallel() is False
+
+
+@pytest.mark.parametrize("parallel_seconds, expected", [(0.05, True), (0.1, False), (0.2, False)])
+def test_parallel_only_kept_when_faster(auto_mode, parallel_seconds, expected):
+    auto_mode.update(serial=0.1, parallel=parallel_seconds)
+    assert report._choose_parallel() is expected
+
+
+def test_single_worker_never_parallel(auto_mode, monkeypatch):
+    monkeypatch.setattr(report, "REPORT_WORKERS", 1)
+    auto_mode.update(serial=0.1, parallel=0.01)
+    assert report._choose_parallel() is False
+
+
+def test_serial_report_is_pdf():
+    pytest.importorskip("matplotlib")
+    pdf = report.build_pdf_report(MENU, parallel=False, end="2024-05-31")
+    assert pdf.startswith(b"%PDF")
+    assert report.build_pdf_report(MENU, parallel=False, end="2024-05-31") is pdf